@@ -5,12 +5,20 @@ Handles authentication and communication with CubeCoders AMP API
 
 import requests
 import logging
+import time
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
 import os
 
-logging.basicConfig(level=logging.INFO)
+from cache import TTLCache
+from logging_config import get_request_id
+from metrics import registry, SIZE_BUCKETS
+from config import AMP_SLOW_CALL_MS, AMP_INSTANCES_CACHE_TTL
+
 logger = logging.getLogger(__name__)
+# Status and list polling, logged on every dashboard refresh; sampled by
+# default (LOG_SAMPLE_RATES) while instance actions on ``logger`` are kept
+poll_logger = logging.getLogger(f"{__name__}.poll")
 
 
 class AMPAPIError(Exception):
@@ -27,11 +35,19 @@ class AMPClient:
     server control, and status monitoring.
     """
     
-    def __init__(self, base_url: str, username: str, password: str, timeout: int = 30):
+    def __init__(
+        self,
+        base_url: str,
+        username: str,
+        password: str,
+        timeout: int = 30,
+        slow_call_ms: float = 1000
+    ):
         self.base_url = base_url.rstrip('/')
         self.username = username
         self.password = password
         self.timeout = timeout
+        self.slow_call_ms = slow_call_ms
         self.session_id: Optional[str] = None
         self.session_expiry: Optional[datetime] = None
         
@@ -58,9 +74,17 @@ class AMPClient:
             AMPAPIError: If request fails or returns error response
         """
         url = f"{self.base_url}/API/{endpoint}"
+        started = time.perf_counter()
+        response = None
+        error_kind = None
+        error_title = ""
         
         try:
-            response = self.session.post(url, json=data, timeout=self.timeout)
+            # Forward our request ID so AMP-side logs can be matched to API logs
+            response = self.session.post(
+                url, json=data, timeout=self.timeout,
+                headers={'X-Request-ID': get_request_id()}
+            )
             response.raise_for_status()
             
             result = response.json()
@@ -68,20 +92,55 @@ class AMPClient:
             # Check for AMP-specific errors
             if isinstance(result, dict):
                 if result.get('Title') == 'Unauthorized Access':
+                    error_kind, error_title = 'amp', result['Title']
                     raise AMPAPIError(f"Unauthorized: {result.get('Message', 'Unknown error')}")
                 elif 'Title' in result and result['Title'] not in ['Success', '']:
+                    error_kind, error_title = 'amp', result['Title']
                     raise AMPAPIError(f"{result.get('Title')}: {result.get('Message', 'Unknown error')}")
             
             return result
             
+        except AMPAPIError:
+            raise
         except requests.exceptions.Timeout:
+            error_kind = 'timeout'
             raise AMPAPIError(f"Request timeout after {self.timeout} seconds")
         except requests.exceptions.ConnectionError:
+            error_kind = 'connection'
             raise AMPAPIError(f"Failed to connect to AMP server at {self.base_url}")
         except requests.exceptions.HTTPError as e:
+            error_kind = 'http'
             raise AMPAPIError(f"HTTP error: {e}")
         except Exception as e:
+            error_kind = 'unexpected'
             raise AMPAPIError(f"Unexpected error: {str(e)}")
+        finally:
+            self._record_call(endpoint, time.perf_counter() - started, response, error_kind, error_title)
+    
+    def _record_call(
+        self,
+        endpoint: str,
+        elapsed: float,
+        response: Optional[requests.Response],
+        error_kind: Optional[str],
+        error_title: str
+    ):
+        """Record latency, payload sizes and errors for one AMP call, labelled by module/method."""
+        registry.inc("amp_requests_total", endpoint=endpoint)
+        registry.observe("amp_request_duration_seconds", elapsed, endpoint=endpoint)
+        if response is not None:
+            request_body = response.request.body or b""
+            registry.observe("amp_request_bytes", len(request_body), buckets=SIZE_BUCKETS, endpoint=endpoint)
+            registry.observe("amp_response_bytes", len(response.content), buckets=SIZE_BUCKETS, endpoint=endpoint)
+        if error_kind:
+            registry.inc("amp_errors_total", endpoint=endpoint, kind=error_kind, title=error_title)
+        
+        elapsed_ms = elapsed * 1000
+        if elapsed_ms >= self.slow_call_ms:
+            logger.warning(
+                "Slow AMP call %s took %.0f ms", endpoint, elapsed_ms,
+                extra={"amp_endpoint": endpoint, "duration_ms": round(elapsed_ms, 2), "error_kind": error_kind}
+            )
     
     def login(self) -> bool:
         """
@@ -93,7 +152,7 @@ class AMPClient:
         Raises:
             AMPAPIError: If login fails
         """
-        logger.info(f"Logging in to AMP as {self.username}")
+        logger.info("Logging in to AMP as %s", self.username)
         
         result = self._make_request('Core/Login', {
             'username': self.username,
@@ -114,7 +173,7 @@ class AMPClient:
     def _ensure_authenticated(self):
         """Ensure we have a valid session, login if necessary."""
         if not self.session_id or (self.session_expiry and datetime.now() >= self.session_expiry):
-            logger.info("Session expired or not established, logging in...")
+            logger.debug("Session expired or not established, logging in...")
             self.login()
     
     def _api_call(self, module: str, method: str, params: Optional[Dict[str, Any]] = None) -> Any:
@@ -146,7 +205,7 @@ class AMPClient:
         Returns:
             List of instance dictionaries containing instance details
         """
-        logger.info("Fetching instance list from AMP")
+        poll_logger.debug("Fetching instance list from AMP")
         result = self._api_call('ADSModule', 'GetInstances')
         
         instances = []
@@ -155,7 +214,7 @@ class AMPClient:
                 if 'AvailableInstances' in target:
                     instances.extend(target['AvailableInstances'])
         
-        logger.info(f"Found {len(instances)} instances")
+        poll_logger.debug("Found %s instances", len(instances))
         return instances
     
     def get_instance_status(self, instance_id: str) -> Dict[str, Any]:
@@ -168,7 +227,7 @@ class AMPClient:
         Returns:
             Status dictionary with metrics and state information
         """
-        logger.info(f"Getting status for instance {instance_id}")
+        poll_logger.debug("Getting status for instance %s", instance_id)
         return self._api_call('Core', 'GetStatus', {'InstanceId': instance_id})
     
     def start_instance(self, instance_id: str) -> Dict[str, Any]:
@@ -181,7 +240,7 @@ class AMPClient:
         Returns:
             Operation result
         """
-        logger.info(f"Starting instance {instance_id}")
+        logger.info("Starting instance %s", instance_id)
         return self._api_call('Core', 'Start', {'InstanceId': instance_id})
     
     def stop_instance(self, instance_id: str) -> Dict[str, Any]:
@@ -194,7 +253,7 @@ class AMPClient:
         Returns:
             Operation result
         """
-        logger.info(f"Stopping instance {instance_id}")
+        logger.info("Stopping instance %s", instance_id)
         return self._api_call('Core', 'Stop', {'InstanceId': instance_id})
     
     def restart_instance(self, instance_id: str) -> Dict[str, Any]:
@@ -207,7 +266,7 @@ class AMPClient:
         Returns:
             Operation result
         """
-        logger.info(f"Restarting instance {instance_id}")
+        logger.info("Restarting instance %s", instance_id)
         return self._api_call('Core', 'Restart', {'InstanceId': instance_id})
     
     def kill_instance(self, instance_id: str) -> Dict[str, Any]:
@@ -220,7 +279,7 @@ class AMPClient:
         Returns:
             Operation result
         """
-        logger.info(f"Force killing instance {instance_id}")
+        logger.info("Force killing instance %s", instance_id)
         return self._api_call('Core', 'Kill', {'InstanceId': instance_id})
     
     # ============= Console Management Methods =============
@@ -236,7 +295,7 @@ class AMPClient:
         Returns:
             Command execution result
         """
-        logger.info(f"Sending console command to {instance_id}: {command}")
+        logger.info("Sending console command to %s: %s", instance_id, command)
         return self._api_call('Core', 'SendConsoleMessage', {
             'InstanceId': instance_id,
             'message': command
@@ -252,7 +311,7 @@ class AMPClient:
         Returns:
             List of console entries
         """
-        logger.info(f"Getting console output for {instance_id}")
+        poll_logger.debug("Getting console output for %s", instance_id)
         result = self._api_call('Core', 'GetUpdates', {'InstanceId': instance_id})
         return result.get('ConsoleEntries', [])
     
@@ -277,7 +336,7 @@ class AMPClient:
             if not ads_instances:
                 raise AMPAPIError("No ADS instance found. Cannot fetch applications.")
             instance_id = ads_instances[0].get('InstanceID')
-            logger.info(f"Using ADS instance: {instance_id}")
+            logger.info("Using ADS instance: %s", instance_id)
         
         return self._api_call('ADSModule', 'GetApplicationEndpoints', {'InstanceId': instance_id})
     
@@ -306,7 +365,7 @@ class AMPClient:
         Returns:
             Creation result with instance details
         """
-        logger.info(f"Creating instance: {instance_name} ({module})")
+        logger.info("Creating instance: %s (%s)", instance_name, module)
         
         return self._api_call('ADSModule', 'CreateInstance', {
             'Module': module,
@@ -328,7 +387,7 @@ class AMPClient:
         Returns:
             Deletion result
         """
-        logger.info(f"Deleting instance {instance_id}")
+        logger.info("Deleting instance %s", instance_id)
         return self._api_call('ADSModule', 'DeleteInstance', {'InstanceId': instance_id})
     
     # ============= Utility Methods =============
@@ -340,7 +399,7 @@ class AMPClient:
                 self._api_call('Core', 'Logout')
                 logger.info("Logged out from AMP successfully")
             except Exception as e:
-                logger.warning(f"Logout failed: {e}")
+                logger.warning("Logout failed: %s", e)
             finally:
                 self.session_id = None
                 self.session_expiry = None
@@ -349,6 +408,9 @@ class AMPClient:
 # Singleton instance
 _amp_client: Optional[AMPClient] = None
 
+# Serialized GET /amp/instances responses; start/stop/create/delete invalidate it
+instances_cache = TTLCache("amp_instances", ttl=AMP_INSTANCES_CACHE_TTL)
+
 
 def get_amp_client() -> AMPClient:
     """Get or create the global AMP client instance."""
@@ -360,11 +422,11 @@ def get_amp_client() -> AMPClient:
         password = os.getenv('AMP_PASSWORD', 'emergent.sh')
         timeout = int(os.getenv('AMP_API_TIMEOUT', '30'))
         
-        _amp_client = AMPClient(base_url, username, password, timeout)
+        _amp_client = AMPClient(base_url, username, password, timeout, AMP_SLOW_CALL_MS)
         try:
             _amp_client.login()
         except AMPAPIError as e:
-            logger.error(f"Failed to initialize AMP client: {e}")
+            logger.error("Failed to initialize AMP client: %s", e)
             raise
     
     return _amp_client
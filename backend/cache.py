@@ -0,0 +1,114 @@
+"""
+In-process caches.
+
+``TTLCache`` is a small dict-backed cache with per-entry expiry and an
+optional LRU size bound. Hits, misses and loads are counted in the metrics
+registry under the cache's name, so hit rates show up in ``/api/metrics``.
+Caches are per worker process; writers invalidate them explicitly.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from metrics import registry
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Per-process cache with expiry.
+
+    Args:
+        name: Label used for metrics
+        ttl: Seconds an entry stays fresh
+        maxsize: Maximum number of entries (least recently used evicted), or None
+    """
+
+    def __init__(self, name: str, ttl: float, maxsize: Optional[int] = None):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._loading: Dict[Hashable, asyncio.Future] = {}
+        # Bumped on every invalidation so loads that started earlier are not stored
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at, _ = entry
+            if expires_at > time.monotonic():
+                if self.maxsize is not None:
+                    self._entries.move_to_end(key)
+                registry.inc("cache_requests_total", cache=self.name, result="hit")
+                return value
+            del self._entries[key]
+        registry.inc("cache_requests_total", cache=self.name, result="miss")
+        return default
+
+    def age(self, key: Hashable) -> Optional[float]:
+        """Seconds since a fresh entry was stored, or None; not counted as a request."""
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is None or entry[1] <= now:
+            return None
+        return now - entry[2]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        now = time.monotonic()
+        self._entries[key] = (value, now + (self.ttl if ttl is None else ttl), now)
+        self._entries.move_to_end(key)
+        if self.maxsize is not None:
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                registry.inc("cache_evictions_total", cache=self.name)
+
+    def invalidate(self, key: Hashable = _MISSING):
+        """Drop one key, or every entry when called without a key."""
+        self._generation += 1
+        if key is _MISSING:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+        registry.inc("cache_invalidations_total", cache=self.name)
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value or await ``loader()`` to fill it.
+
+        Concurrent misses for the same key share a single load.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        pending = self._loading.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        generation = self._generation
+        try:
+            registry.inc("cache_loads_total", cache=self.name)
+            value = await loader()
+            if generation == self._generation:
+                self.set(key, value)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody may be awaiting the future; avoid "exception never retrieved"
+            future.exception()
+            raise
+        finally:
+            del self._loading[key]
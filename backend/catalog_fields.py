@@ -0,0 +1,97 @@
+"""
+Parsing of catalog display strings into numeric fields.
+
+Game servers and pricing plans keep their display strings ("R$ 15,90",
+"2GB", "10GB SSD", "2-100") and also store normalized numbers so Mongo can
+filter and sort on them directly. Names also get a normalized form and
+trigrams so search can match prefixes and tolerate typos.
+"""
+
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+_PRICE_RE = re.compile(r"(\d{1,3}(?:\.\d{3})+|\d+)(?:,(\d{1,2}))?")
+_SIZE_RE = re.compile(r"(\d+(?:[.,]\d+)?)\s*(MB|GB|TB)", re.IGNORECASE)
+_PLAYERS_RE = re.compile(r"(\d+)\s*(?:-\s*(\d+))?")
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+_MB_PER_UNIT = {"MB": 1, "GB": 1024, "TB": 1024 * 1024}
+
+
+def parse_price_cents(value: str) -> Optional[int]:
+    """"R$ 1.234,50" -> 123450 (Brazilian thousands/decimal separators)"""
+    match = _PRICE_RE.search(value or "")
+    if not match:
+        return None
+    reais = int(match.group(1).replace(".", ""))
+    cents = int((match.group(2) or "0").ljust(2, "0"))
+    return reais * 100 + cents
+
+
+def parse_size_mb(value: str) -> Optional[int]:
+    """"2GB" -> 2048, "512 MB" -> 512"""
+    match = _SIZE_RE.search(value or "")
+    if not match:
+        return None
+    amount = float(match.group(1).replace(",", "."))
+    return int(amount * _MB_PER_UNIT[match.group(2).upper()])
+
+
+def parse_size_gb(value: str) -> Optional[int]:
+    """"10GB SSD" -> 10, "1TB" -> 1024"""
+    size_mb = parse_size_mb(value)
+    return None if size_mb is None else size_mb // 1024
+
+
+def parse_player_range(value: str) -> Tuple[Optional[int], Optional[int]]:
+    """"2-100" -> (2, 100), "64" -> (64, 64)"""
+    match = _PLAYERS_RE.search(value or "")
+    if not match:
+        return None, None
+    low = int(match.group(1))
+    high = int(match.group(2)) if match.group(2) else low
+    return low, high
+
+
+def game_server_numeric_fields(doc: Dict[str, Any]) -> Dict[str, Optional[int]]:
+    """Numeric fields derived from a game server's display strings"""
+    players_min, players_max = parse_player_range(doc.get("players", ""))
+    return {
+        "price_cents": parse_price_cents(doc.get("price", "")),
+        "ram_mb": parse_size_mb(doc.get("ram", "")),
+        "storage_gb": parse_size_gb(doc.get("storage", "")),
+        "players_min": players_min,
+        "players_max": players_max,
+    }
+
+
+def pricing_plan_numeric_fields(doc: Dict[str, Any]) -> Dict[str, Optional[int]]:
+    """Numeric fields derived from a pricing plan's display strings"""
+    return {"price_cents": parse_price_cents(doc.get("price", ""))}
+
+
+def normalize_name(value: str) -> str:
+    """Lowercase, accent-free, single-spaced form used for prefix matching"""
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(_NON_WORD_RE.sub(" ", stripped.lower()).split())
+
+
+def name_trigrams(value: str) -> List[str]:
+    """Padded per-word trigrams ("  m", " mi", "min", ...) for typo-tolerant matching"""
+    trigrams = set()
+    for word in normalize_name(value).split():
+        padded = f"  {word} "
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return sorted(trigrams)
+
+
+def search_fields(name: str) -> Dict[str, Any]:
+    """Fields stored next to a catalog document's name for GET /api/search"""
+    return {"search_name": normalize_name(name), "name_trigrams": name_trigrams(name)}
+
+
+def with_search_fields(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a catalog document ready to be written, with its search fields"""
+    return {**doc, **search_fields(doc["name"])}
@@ -0,0 +1,259 @@
+"""
+Streaming NDJSON import and export of the game server catalog.
+
+One JSON object per line, keyed on the server name (see GameServerImport).
+A line carrying every GameServerCreate field is upserted: new servers get
+the same name-derived id seed.py would give them, existing ones have the
+supplied fields replaced. A line with only some fields patches the server
+of that name and never creates one, which is how one-off fixes such as
+``data/server_images.ndjson`` are shipped instead of ad-hoc scripts.
+
+Both directions stream: imports read the input in chunks and apply it in
+unordered ``bulk_write`` batches, exports walk a cursor in batches, so
+memory stays constant whatever the catalog size. Every import batch is
+reported with its counts and throughput once it is written.
+
+Usage:
+    python catalog_io.py export > servers.ndjson
+    python catalog_io.py import data/server_images.ndjson
+    python catalog_io.py import servers.ndjson --batch-size 5000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from datetime import datetime
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Tuple
+
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from catalog_fields import game_server_numeric_fields, search_fields
+from models import GameServerCreate, GameServerImport
+from seed import natural_id
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+DEFAULT_BATCH_SIZE = 1000
+MAX_BATCH_SIZE = 10000
+# Longest accepted input line; bounds the read buffer
+MAX_LINE_BYTES = 64 * 1024
+# Per-batch error details kept in a report; the rest are only counted
+MAX_REPORTED_ERRORS = 20
+READ_CHUNK_SIZE = 64 * 1024
+
+EXPORT_FIELDS = ("name", "players", "price", "ram", "storage", "status", "image")
+_FULL_RECORD_FIELDS = frozenset(GameServerCreate.model_fields)
+# Display string -> numeric fields derived from it
+_DERIVED_FIELDS = {
+    "players": ("players_min", "players_max"),
+    "price": ("price_cents",),
+    "ram": ("ram_mb",),
+    "storage": ("storage_gb",),
+}
+
+
+def import_operation(record: GameServerImport) -> UpdateOne:
+    """The write for one import line: an upsert for full records, a patch otherwise"""
+    fields = record.model_dump(exclude_none=True)
+    numeric = game_server_numeric_fields(fields)
+    for source, derived in _DERIVED_FIELDS.items():
+        if source in fields:
+            fields.update({name: numeric[name] for name in derived})
+    now = datetime.utcnow()
+    update: Dict[str, Any] = {"$set": {**fields, **search_fields(record.name), "updated_at": now}}
+
+    if not _FULL_RECORD_FIELDS <= fields.keys():
+        return UpdateOne({"name": record.name}, update)
+    update["$setOnInsert"] = {"id": natural_id("game_servers", fields), "created_at": now}
+    if "status" not in fields:
+        update["$setOnInsert"]["status"] = "online"
+    return UpdateOne({"name": record.name}, update, upsert=True)
+
+
+def parse_line(raw: bytes) -> GameServerImport:
+    """Decode and validate one NDJSON line; raises ValueError"""
+    try:
+        return GameServerImport.model_validate_json(raw)
+    except ValidationError as e:
+        errors = "; ".join(
+            f"{'.'.join(str(part) for part in error['loc']) or 'line'}: {error['msg']}"
+            for error in e.errors()
+        )
+        raise ValueError(errors)
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    """(line number, line) for each non-blank line of a chunked byte stream"""
+    buffer = b""
+    number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        if len(buffer) > MAX_LINE_BYTES:
+            raise ValueError(f"Line {number + len(lines) + 1} is longer than {MAX_LINE_BYTES} bytes")
+        for line in lines:
+            number += 1
+            if line.strip():
+                yield number, line
+    if buffer.strip():
+        yield number + 1, buffer
+
+
+async def read_chunks(stream, size: int = READ_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Chunks of a binary file object, for feeding files to import_servers"""
+    while True:
+        chunk = stream.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def _write_batch(collection, batch: List[Tuple[int, UpdateOne]], report: Dict[str, Any]):
+    """Apply one batch and add its counts to the report"""
+    try:
+        result = (await collection.bulk_write([op for _, op in batch], ordered=False)).bulk_api_result
+    except BulkWriteError as e:
+        result = e.details
+        for error in result["writeErrors"]:
+            _add_error(report, batch[error["index"]][0], error["errmsg"])
+    upserted = result["nUpserted"]
+    matched = result["nMatched"]
+    report["inserted"] += upserted
+    report["updated"] += result["nModified"]
+    report["unchanged"] += matched - result["nModified"]
+    # Patches that matched no server; failed writes are already counted as errors
+    report["missing"] += len(batch) - upserted - matched - len(result.get("writeErrors", []))
+
+
+def _add_error(report: Dict[str, Any], line: int, message: str):
+    report["errors"] += 1
+    if len(report["error_details"]) < MAX_REPORTED_ERRORS:
+        report["error_details"].append({"line": line, "error": message})
+
+
+def _new_report(batch: int) -> Dict[str, Any]:
+    return {
+        "batch": batch, "lines": 0, "inserted": 0, "updated": 0, "unchanged": 0,
+        "missing": 0, "errors": 0, "error_details": [],
+    }
+
+
+async def import_servers(db, chunks: AsyncIterable[bytes],
+                         batch_size: int = DEFAULT_BATCH_SIZE) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Apply an NDJSON stream to game_servers, yielding a report per batch.
+
+    Invalid lines are reported and skipped. The last report has
+    ``"summary": true`` and the totals of the whole import.
+    """
+    totals = _new_report(0)
+    started = time.perf_counter()
+    batch: List[Tuple[int, UpdateOne]] = []
+    report = _new_report(1)
+
+    async def flush():
+        nonlocal batch, report
+        batch_started = time.perf_counter()
+        if batch:
+            await _write_batch(db.game_servers, batch, report)
+        elapsed = time.perf_counter() - batch_started
+        report["seconds"] = round(elapsed, 4)
+        report["docs_per_second"] = round(len(batch) / max(elapsed, 1e-9))
+        logger.info(
+            "game_servers import batch %s: %s lines (%s new, %s updated, %s missing, %s errors) "
+            "in %.3fs, %.0f docs/s",
+            report["batch"], report["lines"], report["inserted"], report["updated"],
+            report["missing"], report["errors"], elapsed, report["docs_per_second"]
+        )
+        for key in ("lines", "inserted", "updated", "unchanged", "missing", "errors"):
+            totals[key] += report[key]
+        finished = report
+        batch = []
+        report = _new_report(finished["batch"] + 1)
+        return finished
+
+    async for number, raw in iter_lines(chunks):
+        report["lines"] += 1
+        try:
+            batch.append((number, import_operation(parse_line(raw))))
+        except ValueError as e:
+            _add_error(report, number, str(e))
+        if report["lines"] == batch_size:
+            yield await flush()
+    if report["lines"]:
+        yield await flush()
+
+    elapsed = time.perf_counter() - started
+    totals.pop("error_details")
+    totals.pop("batch")
+    totals.update({
+        "summary": True,
+        "batches": report["batch"] - 1,
+        "seconds": round(elapsed, 4),
+        "docs_per_second": round(totals["lines"] / max(elapsed, 1e-9)),
+    })
+    yield totals
+
+
+async def export_servers(db, batch_size: int = DEFAULT_BATCH_SIZE) -> AsyncIterator[bytes]:
+    """The catalog as NDJSON in name order, one chunk per cursor batch"""
+    cursor = db.game_servers.find(
+        {}, {"_id": 0, **{field: 1 for field in EXPORT_FIELDS}}
+    ).sort([("name", 1), ("id", 1)]).batch_size(batch_size)
+    lines: List[bytes] = []
+    async for doc in cursor:
+        lines.append(ndjson_line(doc))
+        if len(lines) == batch_size:
+            yield b"".join(lines)
+            lines = []
+    if lines:
+        yield b"".join(lines)
+
+
+def ndjson_line(doc: Dict[str, Any]) -> bytes:
+    return json.dumps(doc, ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+
+
+async def _main(args):
+    from database import mongo
+
+    db = mongo.connect()
+    try:
+        if args.command == "export":
+            out = open(args.output, "wb") if args.output != "-" else sys.stdout.buffer
+            try:
+                async for chunk in export_servers(db, args.batch_size):
+                    out.write(chunk)
+            finally:
+                if out is not sys.stdout.buffer:
+                    out.close()
+        else:
+            source = open(args.input, "rb") if args.input != "-" else sys.stdin.buffer
+            try:
+                async for report in import_servers(db, read_chunks(source), args.batch_size):
+                    sys.stdout.write(ndjson_line(report).decode())
+            finally:
+                if source is not sys.stdin.buffer:
+                    source.close()
+    finally:
+        mongo.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import or export the game server catalog as NDJSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="write the catalog as NDJSON")
+    export_parser.add_argument("output", nargs="?", default="-", help="file to write (default: stdout)")
+    import_parser = commands.add_parser("import", help="apply an NDJSON file to the catalog")
+    import_parser.add_argument("input", nargs="?", default="-", help="file to read (default: stdin)")
+    for sub in (export_parser, import_parser):
+        sub.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="documents per batch")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(args))
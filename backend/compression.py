@@ -0,0 +1,210 @@
+"""
+Negotiated response compression middleware.
+
+Picks an encoding from the client's ``Accept-Encoding`` header in server
+preference order, compresses only responses above a size threshold and
+leaves Server-Sent Events, WebSockets and already-encoded bodies untouched.
+Bytes in/out and compression CPU time are recorded per route.
+"""
+
+import time
+import zlib
+from typing import Dict, Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from metrics import registry, route_label
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+SUPPORTED_ENCODINGS = ("br", "gzip")
+
+# Never compressed: streaming channels and formats that are already compressed
+EXCLUDED_CONTENT_TYPES = ("text/event-stream", "image/", "video/", "audio/", "application/zip")
+
+
+def parse_accept_encoding(value: str) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into a {coding: qvalue} mapping."""
+    accepted = {}
+    for part in value.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+class _Compressor:
+    """Incremental compressor with a uniform interface for gzip and brotli."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            out = self._brotli.process(data)
+            return out + (self._brotli.finish() if final else self._brotli.flush())
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing HTTP responses with gzip or brotli.
+
+    Args:
+        app: Wrapped ASGI application
+        minimum_size: Responses smaller than this many bytes are sent as-is
+        algorithms: Encodings in server preference order ("br", "gzip")
+        gzip_level: zlib compression level for gzip
+        brotli_quality: Brotli quality (0-11); low values keep CPU cost down
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        algorithms: Sequence[str] = SUPPORTED_ENCODINGS,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.algorithms = [
+            algorithm for algorithm in algorithms
+            if algorithm in SUPPORTED_ENCODINGS and (algorithm != "br" or brotli is not None)
+        ]
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def negotiate(self, accept_encoding: str) -> Optional[str]:
+        """Return the preferred encoding the client accepts, if any."""
+        if not accept_encoding:
+            return None
+        accepted = parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        for algorithm in self.algorithms:
+            if accepted.get(algorithm, wildcard) > 0:
+                return algorithm
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, scope, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Per-request send wrapper deciding whether and how to compress."""
+
+    def __init__(self, middleware: CompressionMiddleware, scope, encoding: str, send):
+        self.middleware = middleware
+        self.scope = scope
+        self.encoding = encoding
+        self._send = send
+        self.start_message = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+
+    async def send(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Hold the headers back until the first body chunk decides the encoding
+            self.start_message = message
+            return
+        if message_type != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            skip_reason = self._skip_reason(body, more_body)
+            start_message, self.start_message = self.start_message, None
+            if skip_reason:
+                self.passthrough = True
+                registry.inc(
+                    "http_compression_skipped_total",
+                    route=route_label(self.scope), reason=skip_reason
+                )
+                await self._send(start_message)
+                await self._send(message)
+                return
+
+            self.compressor = _Compressor(
+                self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality
+            )
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                # The encoded bytes differ from what the strong tag describes
+                headers["ETag"] = "W/" + etag
+            if more_body:
+                del headers["Content-Length"]
+                message = {**message, "body": self._compress(body, final=False)}
+            else:
+                message = {**message, "body": self._compress(body, final=True)}
+                headers["Content-Length"] = str(len(message["body"]))
+            await self._send(start_message)
+            await self._send(message)
+        else:
+            await self._send({**message, "body": self._compress(body, final=not more_body)})
+
+        if not more_body:
+            self._record()
+
+    def _skip_reason(self, body: bytes, more_body: bool) -> Optional[str]:
+        headers = Headers(raw=self.start_message["headers"])
+        if "content-encoding" in headers:
+            return "already_encoded"
+        content_type = headers.get("content-type", "")
+        if any(content_type.startswith(excluded) for excluded in EXCLUDED_CONTENT_TYPES):
+            return "content_type"
+        if not more_body and len(body) < self.middleware.minimum_size:
+            return "below_minimum_size"
+        return None
+
+    def _compress(self, data: bytes, final: bool) -> bytes:
+        started = time.thread_time()
+        compressed = self.compressor.compress(data, final)
+        self.cpu_seconds += time.thread_time() - started
+        self.bytes_in += len(data)
+        self.bytes_out += len(compressed)
+        return compressed
+
+    def _record(self):
+        labels = {"route": route_label(self.scope), "encoding": self.encoding}
+        registry.inc("http_compression_responses_total", **labels)
+        registry.inc("http_compression_bytes_in_total", self.bytes_in, **labels)
+        registry.inc("http_compression_bytes_out_total", self.bytes_out, **labels)
+        registry.inc("http_compression_bytes_saved_total", self.bytes_in - self.bytes_out, **labels)
+        registry.inc("http_compression_cpu_seconds_total", self.cpu_seconds, **labels)
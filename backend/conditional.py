@@ -0,0 +1,88 @@
+"""
+Conditional GET support.
+
+Cached response bodies are stored as ``CachedBody``: the bytes plus a
+strong ETag (a hash of the bytes, so every worker derives the same tag for
+the same content) and the time they were built. Routes look the entry up in
+their cache first and, when the client's ``If-None-Match`` (or, without it,
+``If-Modified-Since``) matches, answer 304 without loading anything from
+MongoDB or AMP.
+
+Per route template, ``http_conditional_requests_total{route,result}`` counts
+``not_modified`` / ``modified`` / ``unconditional`` answers and
+``http_not_modified_bytes_saved_total{route}`` the body bytes not sent.
+"""
+
+import hashlib
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import NamedTuple
+
+from fastapi import Request, Response
+
+from metrics import registry, route_label
+
+# Clients may reuse a stored copy but must revalidate it first
+CACHE_CONTROL = "no-cache"
+
+
+class CachedBody(NamedTuple):
+    body: bytes
+    etag: str
+    last_modified: str
+    built_at: float
+
+
+def cached_body(body: bytes) -> CachedBody:
+    """Wrap serialized bytes with their validators"""
+    now = time.time()
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    return CachedBody(body, etag, formatdate(now, usegmt=True), now)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires (RFC 9110 13.1.2)"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def _not_modified_since(if_modified_since: str, built_at: float) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+    # HTTP dates have one-second resolution
+    return int(built_at) <= since
+
+
+def is_not_modified(request: Request, entry: CachedBody) -> bool:
+    """Whether the request's validators match the cached entry"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, entry.etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        return _not_modified_since(if_modified_since, entry.built_at)
+    return False
+
+
+def conditional_response(request: Request, entry: CachedBody, media_type: str = "application/json") -> Response:
+    """200 with validators, or 304 when the client's copy is current"""
+    route = route_label(request.scope)
+    headers = {"ETag": entry.etag, "Last-Modified": entry.last_modified, "Cache-Control": CACHE_CONTROL}
+    if is_not_modified(request, entry):
+        registry.inc("http_conditional_requests_total", route=route, result="not_modified")
+        registry.inc("http_not_modified_bytes_saved_total", len(entry.body), route=route)
+        return Response(status_code=304, headers=headers)
+
+    conditional = "if-none-match" in request.headers or "if-modified-since" in request.headers
+    registry.inc("http_conditional_requests_total", route=route, result="modified" if conditional else "unconditional")
+    return Response(content=entry.body, media_type=media_type, headers=headers)
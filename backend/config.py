@@ -9,8 +9,58 @@ load_dotenv(ROOT_DIR / '.env')
 # Database
 MONGO_URL = os.environ.get('MONGO_URL', "mongodb://localhost:27017")
 DB_NAME = os.environ.get('DB_NAME', "test_database")
+# Connection pool (per worker process); size maxPoolSize for workers x concurrency
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '0'))
+MONGO_MAX_IDLE_TIME_MS = int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', '60000'))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '5000'))
+# 0 waits for a free pooled connection indefinitely
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', '0'))
+# Startup does no data work by default: run `python migrations.py` and `python seed.py` on deploy.
+# Set to true to also apply pending migrations at startup (single-worker dev setups).
+RUN_MIGRATIONS_ON_STARTUP = os.environ.get('RUN_MIGRATIONS_ON_STARTUP', 'false').lower() == 'true'
+# Commands slower than this are logged with their filter shape
+MONGO_SLOW_QUERY_MS = float(os.environ.get('MONGO_SLOW_QUERY_MS', '100'))
+# Dev mode: explain each new read shape once and warn about collection scans
+MONGO_DETECT_COLLSCANS = os.environ.get('MONGO_DETECT_COLLSCANS', 'false').lower() == 'true'
+
+# Caching (seconds)
+DASHBOARD_STATS_CACHE_TTL = float(os.environ.get('DASHBOARD_STATS_CACHE_TTL', '30'))
+# Serialized /servers, /pricing-plans and /testimonials responses
+CATALOG_CACHE_TTL = float(os.environ.get('CATALOG_CACHE_TTL', '300'))
+# Evict caches in every worker from MongoDB change streams (needs a replica set;
+# without one the bus stops and caches expire by TTL). With it, TTLs can be long.
+CACHE_INVALIDATION_BUS = os.environ.get('CACHE_INVALIDATION_BUS', 'true').lower() == 'true'
+# Users resolved from JWTs by get_current_user (per worker, evicted on writes through auth routes
+# and the invalidation bus); the TTL bounds staleness for writes made elsewhere without the bus
+USER_CACHE_TTL = float(os.environ.get('USER_CACHE_TTL', '60'))
+USER_CACHE_MAX_SIZE = int(os.environ.get('USER_CACHE_MAX_SIZE', '10000'))
+# Approved testimonials kept in the materialized public feed (newest first)
+TESTIMONIAL_FEED_SIZE = int(os.environ.get('TESTIMONIAL_FEED_SIZE', '50'))
+
+# Support requests are inserted in batches by a write-behind buffer
+SUPPORT_BUFFER_BATCH_SIZE = int(os.environ.get('SUPPORT_BUFFER_BATCH_SIZE', '100'))
+SUPPORT_BUFFER_FLUSH_MS = float(os.environ.get('SUPPORT_BUFFER_FLUSH_MS', '200'))
+# Queued requests before POST /support/contact answers 503
+SUPPORT_BUFFER_MAX_PENDING = int(os.environ.get('SUPPORT_BUFFER_MAX_PENDING', '10000'))
+# Refused inserts of one request (invalid, too large) before it is dropped and logged
+SUPPORT_BUFFER_MAX_ATTEMPTS = int(os.environ.get('SUPPORT_BUFFER_MAX_ATTEMPTS', '3'))
+
+# Rate limiting of auth and public write routes (see rate_limit.py for the default limits)
+RATE_LIMITING = os.environ.get('RATE_LIMITING', 'true').lower() == 'true'
+# "memory" (per worker process) or "mongo" (shared by every worker, one round trip per check)
+RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')
+# Overrides as "<rule>.ip|key=<requests>/<seconds>" or "off", e.g. "login.key=10/60,testimonials.ip=off"
+RATE_LIMITS = os.environ.get('RATE_LIMITS', '')
+# Proxies in front of the app that append to X-Forwarded-For; the client IP is the entry
+# this many hops from the right (0: ignore the header, use the peer address)
+RATE_LIMIT_TRUSTED_PROXIES = int(os.environ.get('RATE_LIMIT_TRUSTED_PROXIES', '0'))
 
 # Security
+# bcrypt runs on its own thread pool: threads, and operations that may wait for one before a 503
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_QUEUE = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', '32'))
 JWT_SECRET = os.environ.get('JWT_SECRET', 'mystic-host-secret-key-2024')
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 24
@@ -23,3 +73,24 @@ GOOGLE_CLIENT_SECRET = os.environ.get('GOOGLE_CLIENT_SECRET')
 AMP_BASE_URL = os.environ.get('AMP_BASE_URL')
 AMP_USERNAME = os.environ.get('AMP_USERNAME')
 AMP_PASSWORD = os.environ.get('AMP_PASSWORD')
+# AMP calls slower than this are logged with a warning
+AMP_SLOW_CALL_MS = float(os.environ.get('AMP_SLOW_CALL_MS', '1000'))
+# Seconds the instance list is reused (and revalidated with ETags) between AMP calls
+AMP_INSTANCES_CACHE_TTL = float(os.environ.get('AMP_INSTANCES_CACHE_TTL', '5'))
+
+# Response compression
+COMPRESSION_ALGORITHMS = [
+    algorithm.strip()
+    for algorithm in os.environ.get('COMPRESSION_ALGORITHMS', 'br,gzip').split(',')
+    if algorithm.strip()
+]
+COMPRESSION_MINIMUM_SIZE = int(os.environ.get('COMPRESSION_MINIMUM_SIZE', '1024'))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', '6'))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', '4'))
+
+# Logging
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')  # "json" or "text"
+# Fraction of DEBUG/INFO records kept per logger, e.g. "amp_client.poll=0.1,access=0.5".
+# Only AMP status polling is sampled by default; instance actions always log.
+LOG_SAMPLE_RATES = os.environ.get('LOG_SAMPLE_RATES', 'amp_client.poll=0.1')
@@ -1,179 +1,201 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from models import GameServer, PricingPlan, Testimonial, SupportRequest
-from dotenv import load_dotenv
-from pathlib import Path
-import os
-from datetime import datetime
+from pymongo import monitoring
+import threading
+import time
+import logging
+from typing import Optional
 
-# Load environment variables
-ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
+from cache import TTLCache
+from metrics import registry
+from mongo_monitoring import CommandMetricsListener
+from invalidation import invalidation_bus
+from write_buffer import WriteBehindBuffer
+from config import (
+    MONGO_URL, DB_NAME, DASHBOARD_STATS_CACHE_TTL, CATALOG_CACHE_TTL,
+    MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_MAX_IDLE_TIME_MS,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS, MONGO_CONNECT_TIMEOUT_MS, MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    SUPPORT_BUFFER_BATCH_SIZE, SUPPORT_BUFFER_FLUSH_MS, SUPPORT_BUFFER_MAX_PENDING, SUPPORT_BUFFER_MAX_ATTEMPTS,
+    USER_CACHE_TTL, USER_CACHE_MAX_SIZE
+)
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+logger = logging.getLogger(__name__)
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """
+    Record connection pool checkout wait times and pool usage.
+
+    Motor runs each operation on an executor thread and pymongo checks the
+    connection out synchronously on that thread, so a thread-local start
+    time pairs each "checkout started" event with its outcome.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._checked_out = 0
+
+    def _wait_time(self) -> float:
+        started = getattr(self._local, "started", None)
+        self._local.started = None
+        return time.perf_counter() - started if started is not None else 0.0
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        registry.observe("mongo_pool_checkout_wait_seconds", self._wait_time())
+        with self._lock:
+            self._checked_out += 1
+            registry.set_gauge("mongo_pool_checked_out", self._checked_out)
+
+    def connection_check_out_failed(self, event):
+        registry.observe("mongo_pool_checkout_wait_seconds", self._wait_time())
+        registry.inc("mongo_pool_checkout_failures_total", reason=event.reason)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self._checked_out -= 1
+            registry.set_gauge("mongo_pool_checked_out", self._checked_out)
+
+    def connection_created(self, event):
+        registry.inc("mongo_pool_connections_created_total")
+
+    def connection_closed(self, event):
+        registry.inc("mongo_pool_connections_closed_total", reason=event.reason)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        registry.inc("mongo_pool_cleared_total")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+
+def create_client(url: str = MONGO_URL, **overrides) -> AsyncIOMotorClient:
+    """Create a Motor client with the pool settings from config.py"""
+    options = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "event_listeners": [PoolMetricsListener(), CommandMetricsListener()],
+    }
+    if MONGO_WAIT_QUEUE_TIMEOUT_MS:
+        options["waitQueueTimeoutMS"] = MONGO_WAIT_QUEUE_TIMEOUT_MS
+    options.update(overrides)
+    return AsyncIOMotorClient(url, **options)
+
+
+class MongoConnection:
+    """
+    Owner of the process-wide Motor client.
+
+    The app lifespan calls ``connect()`` on startup and ``close()`` on
+    shutdown. Scripts and tests that never run the lifespan get a client on
+    first use.
+    """
+
+    def __init__(self):
+        self.client: Optional[AsyncIOMotorClient] = None
+        self.database = None
+
+    def connect(self, url: str = MONGO_URL, db_name: str = DB_NAME, **overrides):
+        if self.client is None:
+            self.client = create_client(url, **overrides)
+            self.database = self.client[db_name]
+            logger.info("MongoDB client created (maxPoolSize=%s)", self.client.options.pool_options.max_pool_size)
+        return self.database
+
+    def close(self):
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+            self.database = None
+
+
+mongo = MongoConnection()
+
+
+class _DatabaseProxy:
+    """Module-level ``db`` that resolves to the shared client's database."""
+
+    def _database(self):
+        return mongo.database if mongo.database is not None else mongo.connect()
+
+    def __getattr__(self, name):
+        return getattr(self._database(), name)
+
+    def __getitem__(self, name):
+        return self._database()[name]
+
+
+# Use this everywhere instead of creating clients
+db = _DatabaseProxy()
+
+# Dashboard stats are recomputed at most once per TTL, or after a server write
+dashboard_stats_cache = TTLCache("dashboard_stats", ttl=DASHBOARD_STATS_CACHE_TTL)
+
+# Pre-serialized catalog responses keyed by collection name; writers invalidate their key
+catalog_cache = TTLCache("catalog", ttl=CATALOG_CACHE_TTL)
+
+# Authenticated users by id (User objects, or None for a deleted user); auth writers invalidate their key
+user_cache = TTLCache("users", ttl=USER_CACHE_TTL, maxsize=USER_CACHE_MAX_SIZE)
+
+# Contact form submissions, inserted in batches; started and drained by the app lifespan
+support_requests_buffer = WriteBehindBuffer(
+    db, "support_requests",
+    batch_size=SUPPORT_BUFFER_BATCH_SIZE,
+    flush_interval_ms=SUPPORT_BUFFER_FLUSH_MS,
+    max_pending=SUPPORT_BUFFER_MAX_PENDING,
+    max_attempts=SUPPORT_BUFFER_MAX_ATTEMPTS,
+)
 
 class Database:
     @staticmethod
-    async def initialize_data():
-        """Initialize database with sample data if collections are empty"""
-        
-        # Initialize Game Servers
-        servers_count = await db.game_servers.count_documents({})
-        if servers_count == 0:
-            initial_servers = [
-                {
-                    "name": "Minecraft Java",
-                    "players": "2-100",
-                    "price": "R$ 15,90",
-                    "ram": "2GB",
-                    "storage": "10GB SSD",
-                    "status": "online",
-                    "image": "https://assets.nintendo.com/image/upload/ar_16:9,c_lpad,w_600/v1/ncom/en_US/games/switch/m/minecraft-switch/hero",
-                    "created_at": datetime.utcnow(),
-                    "updated_at": datetime.utcnow()
-                },
-                {
-                    "name": "Counter-Strike 2",
-                    "players": "2-64",
-                    "price": "R$ 24,90",
-                    "ram": "4GB",
-                    "storage": "15GB SSD",
-                    "status": "online",
-                    "image": "https://cdn.cloudflare.steamstatic.com/steam/apps/730/header.jpg",
-                    "created_at": datetime.utcnow(),
-                    "updated_at": datetime.utcnow()
-                },
-                {
-                    "name": "Rust",
-                    "players": "2-200",
-                    "price": "R$ 39,90",
-                    "ram": "8GB",
-                    "storage": "25GB SSD",
-                    "status": "online",
-                    "image": "https://cdn.cloudflare.steamstatic.com/steam/apps/252490/header.jpg",
-                    "created_at": datetime.utcnow(),
-                    "updated_at": datetime.utcnow()
-                },
-                {
-                    "name": "ARK Survival",
-                    "players": "2-50",
-                    "price": "R$ 29,90",
-                    "ram": "6GB",
-                    "storage": "20GB SSD",
-                    "status": "maintenance",
-                    "image": "https://cdn.cloudflare.steamstatic.com/steam/apps/346110/header.jpg",
-                    "created_at": datetime.utcnow(),
-                    "updated_at": datetime.utcnow()
-                }
-            ]
-            
-            for server_data in initial_servers:
-                server = GameServer(**server_data)
-                await db.game_servers.insert_one(server.dict())
-        
-        # Initialize Pricing Plans
-        plans_count = await db.pricing_plans.count_documents({})
-        if plans_count == 0:
-            initial_plans = [
-                {
-                    "name": "Apprentice",
-                    "price": "R$ 19,90",
-                    "period": "/mês",
-                    "description": "Perfeito para começar sua jornada",
-                    "features": [
-                        "2GB RAM",
-                        "15GB SSD",
-                        "Até 20 jogadores",
-                        "Suporte básico",
-                        "Backup diário"
-                    ],
-                    "popular": False,
-                    "created_at": datetime.utcnow()
-                },
-                {
-                    "name": "Sorcerer",
-                    "price": "R$ 39,90",
-                    "period": "/mês",
-                    "description": "Para comunidades em crescimento",
-                    "features": [
-                        "4GB RAM",
-                        "30GB SSD",
-                        "Até 50 jogadores",
-                        "Suporte prioritário",
-                        "Backup a cada 6h",
-                        "DDoS Protection"
-                    ],
-                    "popular": True,
-                    "created_at": datetime.utcnow()
-                },
-                {
-                    "name": "Archmage",
-                    "price": "R$ 79,90",
-                    "period": "/mês",
-                    "description": "Máximo poder para grandes servidores",
-                    "features": [
-                        "8GB RAM",
-                        "60GB SSD",
-                        "Jogadores ilimitados",
-                        "Suporte dedicado 24/7",
-                        "Backup em tempo real",
-                        "DDoS Protection Premium",
-                        "CPU dedicado"
-                    ],
-                    "popular": False,
-                    "created_at": datetime.utcnow()
-                }
-            ]
-            
-            for plan_data in initial_plans:
-                plan = PricingPlan(**plan_data)
-                await db.pricing_plans.insert_one(plan.dict())
-        
-        # Initialize Testimonials
-        testimonials_count = await db.testimonials.count_documents({})
-        if testimonials_count == 0:
-            initial_testimonials = [
-                {
-                    "name": "Pedro Silva",
-                    "role": "Admin do servidor MineCraft Brasil",
-                    "content": "O Mystic Host transformou completamente nossa experiência. Performance impecável e suporte incrível!",
-                    "avatar": "https://images.unsplash.com/photo-1472099645785-5658abf4ff4e?w=100&h=100&fit=crop&crop=face",
-                    "rating": 5,
-                    "approved": True,
-                    "created_at": datetime.utcnow()
-                },
-                {
-                    "name": "Ana Costa",
-                    "role": "Líder da guild Dragons",
-                    "content": "Melhor investimento que fizemos. Nossos jogadores nunca mais reclamaram de lag ou instabilidade.",
-                    "avatar": "https://images.unsplash.com/photo-1494790108755-2616b612b5c8?w=100&h=100&fit=crop&crop=face",
-                    "rating": 5,
-                    "approved": True,
-                    "created_at": datetime.utcnow()
-                },
-                {
-                    "name": "João Santos",
-                    "role": "Streamer e Gamer",
-                    "content": "Interface super intuitiva e performance que impressiona. Recomendo para qualquer comunidade séria.",
-                    "avatar": "https://images.unsplash.com/photo-1507003211169-0a1dd7228f2d?w=100&h=100&fit=crop&crop=face",
-                    "rating": 5,
-                    "approved": True,
-                    "created_at": datetime.utcnow()
-                }
-            ]
-            
-            for testimonial_data in initial_testimonials:
-                testimonial = Testimonial(**testimonial_data)
-                await db.testimonials.insert_one(testimonial.dict())
+    async def count_servers_by_status():
+        """Count game servers per status in a single aggregation round trip"""
+        registry.inc("mongo_roundtrips_total", operation="dashboard_stats")
+        pipeline = [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+        groups = await db.game_servers.aggregate(pipeline).to_list(None)
+        return {group["_id"]: group["count"] for group in groups}
+    
+    @staticmethod
+    def invalidate_catalog(collection: str):
+        """Drop the cached response for a catalog collection after a write"""
+        catalog_cache.invalidate(collection)
+    
+    @staticmethod
+    def invalidate_user(user_id: str):
+        """Drop the cached user after a write to their document"""
+        user_cache.invalidate(user_id)
+    
+    @staticmethod
+    def invalidate_dashboard_stats():
+        """Drop cached dashboard stats after a write to game_servers"""
+        dashboard_stats_cache.invalidate()
     
     @staticmethod
     async def get_dashboard_stats():
+        """Get dashboard statistics, served from the in-process cache when fresh"""
+        return await dashboard_stats_cache.get_or_load("stats", Database.compute_dashboard_stats)
+    
+    @staticmethod
+    async def compute_dashboard_stats():
         """Calculate real-time dashboard statistics"""
         # Count active servers
-        active_servers = await db.game_servers.count_documents({"status": "online"})
-        total_servers = await db.game_servers.count_documents({})
+        counts = await Database.count_servers_by_status()
+        active_servers = counts.get("online", 0)
+        total_servers = sum(counts.values())
         
         # Simulate player count (in real app, this would come from game server APIs)
         player_count = active_servers * 47 + (active_servers * 23)  # Rough calculation
@@ -211,4 +233,31 @@ class Database:
             }
         ]
         
-        return stats
\ No newline at end of file
+        return stats
+
+def _on_game_servers_change(change):
+    Database.invalidate_catalog("game_servers")
+    Database.invalidate_dashboard_stats()
+
+
+def _on_catalog_change(collection: str):
+    def handler(change):
+        Database.invalidate_catalog(collection)
+    return handler
+
+
+def _on_users_change(change):
+    # fullDocument is looked up for inserts and updates; deletes and flushes drop everyone
+    user_id = ((change or {}).get("fullDocument") or {}).get("id")
+    if user_id:
+        Database.invalidate_user(user_id)
+    else:
+        user_cache.invalidate()
+
+
+# Writes made by other workers reach this worker's caches through the change stream
+invalidation_bus.subscribe("game_servers", _on_game_servers_change)
+invalidation_bus.subscribe("pricing_plans", _on_catalog_change("pricing_plans"))
+# The public testimonials list is the materialized feed: pending submissions don't evict it
+invalidation_bus.subscribe("feeds", _on_catalog_change("testimonials"))
+invalidation_bus.subscribe("users", _on_users_change)
@@ -0,0 +1,61 @@
+"""
+Materialized public feeds.
+
+The public testimonials list is not queried from the ``testimonials``
+collection on read. Moderation rebuilds it whenever its contents change:
+the newest approved testimonials, capped at ``TESTIMONIAL_FEED_SIZE``, are
+written as one document of the ``feeds`` collection. Readers fetch that
+document by ``_id``, so a public read costs the same however many pending
+or rejected submissions pile up.
+
+Rebuilds racing in several workers are ordered by their start time: a
+rebuild only replaces a feed built before it started, so a slower rebuild
+that read older data never overwrites a newer one. Other workers evict
+their cached copy through the change stream on ``feeds``.
+"""
+
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from metrics import registry
+from models import Testimonial
+from serialization import projection
+from config import TESTIMONIAL_FEED_SIZE
+
+logger = logging.getLogger(__name__)
+
+TESTIMONIALS_FEED = "testimonials"
+# Served by the approved_rejected_created_at_id index
+PUBLIC_TESTIMONIALS_QUERY = {"approved": True, "rejected": False}
+PUBLIC_TESTIMONIALS_SORT = [("created_at", -1), ("id", -1)]
+
+
+async def rebuild_testimonials_feed(database, size: int = TESTIMONIAL_FEED_SIZE) -> List[Dict[str, Any]]:
+    """Rebuild and store the public testimonials feed; returns its items"""
+    started = time.perf_counter()
+    built_at = datetime.utcnow()
+    items = await database.testimonials.find(
+        PUBLIC_TESTIMONIALS_QUERY, projection(Testimonial)
+    ).sort(PUBLIC_TESTIMONIALS_SORT).limit(size).to_list(size)
+    try:
+        await database.feeds.update_one(
+            {"_id": TESTIMONIALS_FEED, "built_at": {"$lt": built_at}},
+            {"$set": {"items": items, "built_at": built_at}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # A rebuild that started later already stored a newer feed
+        logger.info("Skipped storing %s feed, a newer one exists", TESTIMONIALS_FEED)
+    registry.inc("feed_rebuilds_total", feed=TESTIMONIALS_FEED)
+    registry.observe("feed_rebuild_seconds", time.perf_counter() - started, feed=TESTIMONIALS_FEED)
+    return items
+
+
+async def load_testimonials_feed(database) -> Optional[List[Dict[str, Any]]]:
+    """The stored feed items, or None when the feed was never built"""
+    doc = await database.feeds.find_one({"_id": TESTIMONIALS_FEED}, {"_id": 0, "items": 1})
+    return doc["items"] if doc else None
@@ -0,0 +1,160 @@
+"""
+Cross-worker cache invalidation through MongoDB change streams.
+
+Each worker process keeps its own caches, and a write only invalidates the
+caches of the worker that made it. ``InvalidationBus`` tails one change
+stream on the database, filtered to the watched collections, and calls the
+handlers subscribed for the changed collection in every process, so other
+workers (and writes made by scripts such as catalog_io.py) evict within
+milliseconds instead of at TTL expiry.
+
+The stream is resumed from the last resume token after a dropped
+connection, so no change is missed. When the token can no longer be used
+(the oplog moved past it) or the stream is opened without one, every
+subscriber is told to drop everything, since changes may have been missed.
+
+Change streams need a replica set. Against a standalone server the bus
+logs a warning and stops, and caches fall back to their TTLs. A local
+single-node replica set is enough for development and tests:
+
+    mongod --replSet rs0 --dbpath /tmp/rs0 &
+    mongosh --eval 'rs.initiate()'
+    TEST_MONGO_URL="mongodb://localhost:27017/?directConnection=true" pytest tests/test_invalidation.py
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+WATCHED_COLLECTIONS = ("game_servers", "pricing_plans", "testimonials", "users", "feeds")
+
+# Server error codes
+NOT_A_REPLICA_SET = 40573
+# The resume token is unusable: start over from now
+_RESUME_FAILED = frozenset({
+    260,  # InvalidResumeToken
+    280,  # ChangeStreamFatalError
+    286,  # ChangeStreamHistoryLost
+})
+
+RETRY_DELAY_SECONDS = 0.5
+MAX_RETRY_DELAY_SECONDS = 30.0
+
+# Called with the change event, or with None when everything must be dropped
+Handler = Callable[[Optional[Mapping[str, Any]]], None]
+
+
+class InvalidationBus:
+    """Dispatch change events on watched collections to cache eviction handlers"""
+
+    def __init__(self, collections: Sequence[str] = WATCHED_COLLECTIONS):
+        self.collections = tuple(collections)
+        self.resume_token: Optional[Mapping[str, Any]] = None
+        self._handlers: Dict[str, List[Handler]] = {name: [] for name in self.collections}
+        self._task: Optional[asyncio.Task] = None
+        self.connected = False
+
+    def subscribe(self, collection: str, handler: Handler):
+        if collection not in self._handlers:
+            raise ValueError(f"{collection} is not watched")
+        self._handlers[collection].append(handler)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def pipeline(self) -> List[Dict[str, Any]]:
+        return [
+            {"$match": {"ns.coll": {"$in": list(self.collections)}}},
+            # Only what handlers look at: the resume token (_id) is always kept
+            {"$project": {"operationType": 1, "ns": 1, "documentKey": 1, "fullDocument.id": 1}},
+        ]
+
+    def dispatch(self, change: Mapping[str, Any]):
+        collection = change.get("ns", {}).get("coll")
+        registry.inc("cache_invalidation_events_total", collection=collection)
+        for handler in self._handlers.get(collection, ()):
+            self._call(handler, change)
+
+    def flush_all(self):
+        """Tell every subscriber to drop everything it caches"""
+        registry.inc("cache_invalidation_flushes_total")
+        for handlers in self._handlers.values():
+            for handler in handlers:
+                self._call(handler, None)
+
+    def _call(self, handler: Handler, change: Optional[Mapping[str, Any]]):
+        try:
+            handler(change)
+        except Exception as e:
+            logger.error("Cache invalidation handler failed: %s", e)
+
+    def start(self, database):
+        """Start tailing the change stream of a Motor database in the background"""
+        if not self.running:
+            self._task = asyncio.create_task(self._run(database))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        registry.set_gauge("cache_invalidation_bus_connected", 0)
+
+    async def _run(self, database):
+        delay = RETRY_DELAY_SECONDS
+        while True:
+            self.connected = False
+            try:
+                await self._tail(database)
+                # The stream ended with an invalidate event (database dropped)
+                self.resume_token = None
+            except OperationFailure as e:
+                if e.code == NOT_A_REPLICA_SET:
+                    logger.warning("Change streams unavailable (not a replica set); caches rely on their TTLs")
+                    return
+                if e.code in _RESUME_FAILED:
+                    logger.warning("Change stream could not resume (%s); dropping cached data", e.code)
+                    self.resume_token = None
+                else:
+                    logger.error("Change stream failed: %s", e)
+            except PyMongoError as e:
+                logger.warning("Change stream interrupted: %s", e)
+            registry.set_gauge("cache_invalidation_bus_connected", 0)
+            registry.inc("cache_invalidation_bus_retries_total")
+            if self.connected:
+                delay = RETRY_DELAY_SECONDS
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RETRY_DELAY_SECONDS)
+
+    async def _tail(self, database):
+        resuming = self.resume_token is not None
+        async with database.watch(
+            self.pipeline(), full_document="updateLookup", resume_after=self.resume_token
+        ) as stream:
+            # Opens the cursor, so nothing written after the flush below is missed
+            change = await stream.try_next()
+            self.connected = True
+            registry.set_gauge("cache_invalidation_bus_connected", 1)
+            if not resuming:
+                # Whatever changed before the stream opened was not seen
+                self.flush_all()
+            logger.info("Watching %s for cache invalidation", ", ".join(self.collections))
+            while stream.alive:
+                if change is not None:
+                    self.dispatch(change)
+                self.resume_token = stream.resume_token
+                change = await stream.try_next()
+
+
+# Process-wide bus; database.py subscribes the shared caches
+invalidation_bus = InvalidationBus()
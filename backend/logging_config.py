@@ -0,0 +1,216 @@
+"""
+Structured, non-blocking logging setup.
+
+``setup_logging`` is called once from ``server.py``. Records are put on an
+in-memory queue by a ``QueueHandler`` and written to stderr as JSON lines
+by a background ``QueueListener`` thread, so request handlers never block on
+log I/O. Message interpolation is deferred to that thread as well.
+
+Every record carries the current request ID (see ``RequestContextMiddleware``),
+which lets API access lines and AMP client lines be correlated.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from metrics import registry, route_label
+from mongo_monitoring import RequestDbStats, db_stats_var
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+access_logger = logging.getLogger("access")
+
+# Attributes present on every LogRecord; anything else was passed via ``extra``
+_RESERVED_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def get_request_id() -> str:
+    """Request ID of the request being handled, or "-" outside a request."""
+    return request_id_var.get()
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """Parse "amp_client=0.1,access=0.5" into {logger_name: rate}."""
+    rates = {}
+    for part in value.split(","):
+        name, _, rate = part.partition("=")
+        if name.strip() and rate.strip():
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp records with the request ID from the emitting context."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of DEBUG/INFO records for selected loggers.
+
+    Rates are matched on the logger name and its parents, so a rate for
+    "amp_client" also applies to "amp_client.requests". WARNING and above
+    are never dropped.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        name = record.name
+        while name:
+            rate = self.rates.get(name)
+            if rate is not None:
+                return rate >= 1 or random.random() < rate
+            name = name.rpartition(".")[0]
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """Render a record as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that hands the record over without formatting it.
+
+    The stock ``prepare`` interpolates the message in the calling thread;
+    here that work is left to the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging(level: str = "INFO", json_output: bool = True, sample_rates: Optional[Dict[str, float]] = None):
+    """Install the queue-based root handler. Safe to call more than once."""
+    global _listener
+    if _listener is not None:
+        return
+
+    if json_output:
+        formatter = JSONFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s')
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+    queue_handler.addFilter(SamplingFilter(sample_rates or {}))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class RequestContextMiddleware:
+    """
+    ASGI middleware assigning a request ID and writing one access log line.
+
+    An incoming ``X-Request-ID`` header is reused (so IDs propagate from a
+    proxy), otherwise a new one is generated. The ID is echoed back in the
+    response headers. Request counts and latency are recorded per route.
+    MongoDB time and query count are collected for the request (see
+    ``mongo_monitoring``), sent as ``Server-Timing`` and logged.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get("x-request-id", "")
+        if not request_id or len(request_id) > 128:
+            request_id = uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        db_stats = RequestDbStats()
+        db_stats_token = db_stats_var.set(db_stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_request_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Request-ID", request_id)
+                # Queries run by streaming bodies after this point only reach the access log
+                headers.append("Server-Timing", db_stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            route = route_label(scope)
+            elapsed = time.perf_counter() - started
+            registry.inc("http_requests_total", route=route, status=status_code)
+            registry.observe("http_request_duration_seconds", elapsed, route=route)
+            if access_logger.isEnabledFor(logging.INFO):
+                access_logger.info(
+                    "%s %s %s",
+                    scope["method"], scope["path"], status_code,
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "route": route,
+                        "status": status_code,
+                        "duration_ms": round(elapsed * 1000, 2),
+                        "db_ms": round(db_stats.seconds * 1000, 2),
+                        "db_queries": db_stats.queries,
+                    },
+                )
+            db_stats_var.reset(db_stats_token)
+            request_id_var.reset(token)
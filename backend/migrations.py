@@ -0,0 +1,288 @@
+"""
+Versioned MongoDB migrations.
+
+Each migration declares the indexes it needs per collection and may run an
+extra ``apply(db)`` step. Applied versions are recorded in the
+``schema_migrations`` collection, and index creation is idempotent, so the
+runner can be executed on every deploy (and by several workers at once)
+without side effects.
+
+Usage:
+    python migrations.py            # apply pending migrations
+    python migrations.py --status   # list applied and pending versions
+"""
+
+import argparse
+import asyncio
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel, UpdateOne
+
+from catalog_fields import game_server_numeric_fields, pricing_plan_numeric_fields, search_fields
+from feeds import rebuild_testimonials_feed
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_COLLECTION = "schema_migrations"
+BACKFILL_BATCH_SIZE = 500
+
+
+class Migration:
+    """A schema change identified by an increasing version number."""
+
+    def __init__(
+        self,
+        version: int,
+        description: str,
+        indexes: Optional[Dict[str, List[IndexModel]]] = None,
+        apply: Optional[Callable[..., Awaitable[None]]] = None
+    ):
+        self.version = version
+        self.description = description
+        self.indexes = indexes or {}
+        self.apply = apply
+
+    async def run(self, db):
+        for collection, indexes in self.indexes.items():
+            await db[collection].create_indexes(indexes)
+        if self.apply is not None:
+            await self.apply(db)
+
+
+def _unique_id_index() -> IndexModel:
+    return IndexModel([("id", ASCENDING)], name="id_unique", unique=True)
+
+
+def _expiry_ttl_index() -> IndexModel:
+    # expireAfterSeconds=0: documents are removed once expires_at is in the past
+    return IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0)
+
+
+async def _purge_used_reset_tokens(db):
+    """Drop tokens consumed before reset_password started deleting them."""
+    await db.password_reset_tokens.delete_many({"used": True})
+
+
+async def _backfill_fields(collection, fields: List[str], derive, projection: Dict[str, int],
+                          batch_size: int = BACKFILL_BATCH_SIZE):
+    """Set derived fields on documents missing them, one bulk_write per batch."""
+    missing = {"$or": [{field: {"$exists": False}} for field in fields]}
+    cursor = collection.find(missing, {"_id": 1, **projection}).batch_size(batch_size)
+    batch = []
+    updated = 0
+    async for doc in cursor:
+        batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": derive(doc)}))
+        if len(batch) == batch_size:
+            updated += (await collection.bulk_write(batch, ordered=False)).modified_count
+            batch = []
+    if batch:
+        updated += (await collection.bulk_write(batch, ordered=False)).modified_count
+    logger.info("Backfilled %s on %s %s documents", ", ".join(fields), updated, collection.name)
+
+
+async def _backfill_catalog_numeric_fields(db):
+    display_strings = {"price": 1, "ram": 1, "storage": 1, "players": 1}
+    await _backfill_fields(
+        db.game_servers,
+        ["price_cents", "ram_mb", "storage_gb", "players_min", "players_max"],
+        game_server_numeric_fields,
+        display_strings
+    )
+    await _backfill_fields(db.pricing_plans, ["price_cents"], pricing_plan_numeric_fields, {"price": 1})
+
+
+async def _backfill_search_fields(db):
+    for collection in (db.game_servers, db.pricing_plans):
+        await _backfill_fields(
+            collection,
+            ["search_name", "name_trigrams"],
+            lambda doc: search_fields(doc.get("name", "")),
+            {"name": 1}
+        )
+
+
+async def _build_testimonials_feed(db):
+    # Testimonials from before moderation were all approved and none rejected
+    await db.testimonials.update_many({"rejected": {"$exists": False}}, {"$set": {"rejected": False}})
+    await rebuild_testimonials_feed(db)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        1,
+        "Lookup indexes for users, catalog collections and auth tokens",
+        indexes={
+            "users": [
+                IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+                _unique_id_index(),
+            ],
+            "game_servers": [_unique_id_index()],
+            "pricing_plans": [_unique_id_index()],
+            "testimonials": [_unique_id_index()],
+            "support_requests": [_unique_id_index()],
+            "password_reset_tokens": [
+                IndexModel([("token", ASCENDING)], name="token_unique", unique=True),
+                IndexModel([("user_id", ASCENDING), ("used", ASCENDING)], name="user_id_used"),
+            ],
+            "email_verification_tokens": [
+                IndexModel([("token", ASCENDING)], name="token_unique", unique=True),
+                IndexModel([("user_id", ASCENDING)], name="user_id"),
+            ],
+        },
+    ),
+    Migration(
+        2,
+        "TTL expiry for password reset and email verification tokens",
+        indexes={
+            "password_reset_tokens": [_expiry_ttl_index()],
+            "email_verification_tokens": [_expiry_ttl_index()],
+        },
+        apply=_purge_used_reset_tokens,
+    ),
+    Migration(
+        3,
+        "Keyset pagination indexes for the game server catalog",
+        indexes={
+            "game_servers": [
+                IndexModel([("name", ASCENDING), ("id", ASCENDING)], name="name_id"),
+                IndexModel([("status", ASCENDING), ("name", ASCENDING), ("id", ASCENDING)], name="status_name_id"),
+            ],
+        },
+    ),
+    Migration(
+        4,
+        "Numeric price/capacity fields on the catalog, with backfill",
+        indexes={
+            "game_servers": [
+                IndexModel([("price_cents", ASCENDING), ("id", ASCENDING)], name="price_cents_id"),
+                IndexModel([("ram_mb", ASCENDING), ("id", ASCENDING)], name="ram_mb_id"),
+                IndexModel([("price_cents", ASCENDING), ("ram_mb", ASCENDING)], name="price_cents_ram_mb"),
+            ],
+            "pricing_plans": [
+                IndexModel([("price_cents", ASCENDING), ("id", ASCENDING)], name="price_cents_id"),
+            ],
+        },
+        apply=_backfill_catalog_numeric_fields,
+    ),
+    Migration(
+        5,
+        "Text, prefix and trigram indexes for catalog search, with backfill",
+        indexes={
+            "game_servers": [
+                IndexModel([("name", TEXT)], name="name_text", default_language="none"),
+                IndexModel([("search_name", ASCENDING)], name="search_name"),
+                IndexModel([("name_trigrams", ASCENDING)], name="name_trigrams"),
+            ],
+            "pricing_plans": [
+                IndexModel(
+                    [("name", TEXT), ("description", TEXT), ("features", TEXT)],
+                    name="name_description_features_text",
+                    weights={"name": 10, "description": 3, "features": 1},
+                    default_language="portuguese",
+                ),
+                IndexModel([("search_name", ASCENDING)], name="search_name"),
+                IndexModel([("name_trigrams", ASCENDING)], name="name_trigrams"),
+            ],
+        },
+        apply=_backfill_search_fields,
+    ),
+    Migration(
+        6,
+        "Support ticket triage index",
+        indexes={
+            # Listings pin status and priority to explicit value lists, so this one index
+            # serves every filter combination newest-first without an in-memory sort
+            "support_requests": [
+                IndexModel(
+                    [("status", ASCENDING), ("priority", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+                    name="status_priority_created_at_id",
+                ),
+            ],
+        },
+    ),
+    Migration(
+        7,
+        "TTL expiry for shared rate limit counters",
+        indexes={
+            "rate_limits": [_expiry_ttl_index()],
+        },
+    ),
+    Migration(
+        8,
+        "Testimonial moderation index and materialized public feed",
+        indexes={
+            # Public feed (approved, newest first) and moderation queue (pending, oldest first)
+            "testimonials": [
+                IndexModel(
+                    [("approved", ASCENDING), ("rejected", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+                    name="approved_rejected_created_at_id",
+                ),
+            ],
+        },
+        apply=_build_testimonials_feed,
+    ),
+    Migration(
+        9,
+        "Natural key indexes for seeding",
+        indexes={
+            # seed.py upserts filter on these (game servers use name_id). Not unique: the API may
+            # repeat a plan name or an author's testimonial; seeding is kept unique by its derived ids
+            "pricing_plans": [IndexModel([("name", ASCENDING)], name="name")],
+            "testimonials": [IndexModel([("name", ASCENDING), ("role", ASCENDING)], name="name_role")],
+        },
+    ),
+]
+
+
+async def applied_versions(db) -> List[int]:
+    """Versions already recorded as applied, ascending."""
+    docs = await db[MIGRATIONS_COLLECTION].find({}, {"_id": 1}).sort("_id", ASCENDING).to_list(None)
+    return [doc["_id"] for doc in docs]
+
+
+async def run_migrations(db, migrations: Optional[List[Migration]] = None) -> List[int]:
+    """Apply every pending migration in version order and return the versions applied."""
+    migrations = sorted(migrations if migrations is not None else MIGRATIONS, key=lambda m: m.version)
+    done = set(await applied_versions(db))
+    applied = []
+
+    for migration in migrations:
+        if migration.version in done:
+            continue
+        logger.info("Applying migration %s: %s", migration.version, migration.description)
+        await migration.run(db)
+        await db[MIGRATIONS_COLLECTION].update_one(
+            {"_id": migration.version},
+            {"$setOnInsert": {"description": migration.description, "applied_at": datetime.utcnow()}},
+            upsert=True
+        )
+        applied.append(migration.version)
+
+    return applied
+
+
+async def _main(show_status: bool):
+    from database import mongo
+
+    db = mongo.connect()
+    try:
+        if show_status:
+            done = set(await applied_versions(db))
+            for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+                state = "applied" if migration.version in done else "pending"
+                print(f"{migration.version:>4}  {state:<8} {migration.description}")
+        else:
+            applied = await run_migrations(db)
+            print(f"Applied migrations: {applied}" if applied else "Database schema is up to date.")
+    finally:
+        mongo.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply MongoDB schema migrations")
+    parser.add_argument("--status", action="store_true", help="list applied and pending migrations")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(args.status))
@@ -1,9 +1,11 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from typing import Dict, List, Optional
 from datetime import datetime
 import uuid
 
+from catalog_fields import game_server_numeric_fields, pricing_plan_numeric_fields
+
 # MongoDB Models using Pydantic
 
 class GameServer(BaseModel):
@@ -17,6 +19,19 @@ class GameServer(BaseModel):
     image: str    # URL to game image
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    # Normalized numbers derived from the display strings, for filtering/sorting in Mongo
+    price_cents: Optional[int] = None
+    ram_mb: Optional[int] = None
+    storage_gb: Optional[int] = None
+    players_min: Optional[int] = None
+    players_max: Optional[int] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def fill_numeric_fields(cls, data):
+        if isinstance(data, dict):
+            return {**game_server_numeric_fields(data), **data}
+        return data
 
 class GameServerCreate(BaseModel):
     name: str
@@ -29,6 +44,22 @@ class GameServerCreate(BaseModel):
 class GameServerUpdate(BaseModel):
     status: str
 
+class GameServerImport(BaseModel):
+    """One NDJSON line of a catalog import, keyed on name.
+
+    A line with every GameServerCreate field creates or replaces the
+    server; a line with only some of them patches an existing one.
+    """
+    model_config = ConfigDict(extra="forbid")
+
+    name: str = Field(min_length=1)
+    players: Optional[str] = None
+    price: Optional[str] = None
+    ram: Optional[str] = None
+    storage: Optional[str] = None
+    status: Optional[str] = None
+    image: Optional[str] = None
+
 class PricingPlan(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
@@ -38,6 +69,14 @@ class PricingPlan(BaseModel):
     features: List[str]
     popular: bool = False
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    price_cents: Optional[int] = None  # derived from price
+
+    @model_validator(mode="before")
+    @classmethod
+    def fill_numeric_fields(cls, data):
+        if isinstance(data, dict):
+            return {**pricing_plan_numeric_fields(data), **data}
+        return data
 
 class PricingPlanCreate(BaseModel):
     name: str
@@ -60,7 +99,9 @@ class Testimonial(BaseModel):
     content: str
     avatar: str
     rating: int = 5
-    approved: bool = True
+    approved: bool = False    # pending until an admin approves it
+    rejected: bool = False
+    moderated_at: Optional[datetime] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class TestimonialCreate(BaseModel):
@@ -70,6 +111,15 @@ class TestimonialCreate(BaseModel):
     avatar: str
     rating: int = 5
 
+SUPPORT_PRIORITIES = ("low", "medium", "high")
+SUPPORT_STATUSES = ("open", "in_progress", "resolved")
+# Status a ticket may move to -> statuses it may move from
+SUPPORT_STATUS_TRANSITIONS = {
+    "open": ("in_progress", "resolved"),  # unassigned / reopened
+    "in_progress": ("open",),
+    "resolved": ("open", "in_progress"),
+}
+
 class SupportRequest(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
@@ -79,17 +129,22 @@ class SupportRequest(BaseModel):
     priority: str = "medium"  # "low", "medium", "high"
     status: str = "open"      # "open", "in_progress", "resolved"
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = None  # last status change
 
 class SupportRequestCreate(BaseModel):
     name: str
     email: str
     subject: str
     message: str
-    priority: str = "medium"
+    priority: str = Field("medium", pattern="^(low|medium|high)$")
+
+class SupportRequestStatusUpdate(BaseModel):
+    status: str = Field(pattern="^(open|in_progress|resolved)$")
 
 # Response Models
 class GameServerResponse(BaseModel):
     servers: List[GameServer]
+    next_cursor: Optional[str] = None  # pass as ?after= to get the next page
 
 class PricingPlanResponse(BaseModel):
     plans: List[PricingPlan]
@@ -104,6 +159,26 @@ class SupportRequestResponse(BaseModel):
     message: str
     request_id: str
 
+class SupportRequestListResponse(BaseModel):
+    requests: List[SupportRequest]
+    next_cursor: Optional[str] = None  # pass as ?after= to get the next page
+
+class SupportRequestCounts(BaseModel):
+    total: int
+    by_status: Dict[str, int]                  # every status, zero included
+    by_priority: Dict[str, Dict[str, int]]     # status -> priority -> count
+
+class SearchResult(BaseModel):
+    type: str                   # "server" or "plan"
+    score: float                # higher is more relevant
+    matched_by: List[str]       # "text", "prefix" and/or "fuzzy"
+    server: Optional[GameServer] = None
+    plan: Optional[PricingPlan] = None
+
+class SearchResponse(BaseModel):
+    query: str
+    results: List[SearchResult]
+
 # User Authentication Models
 class User(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -115,6 +190,7 @@ class User(BaseModel):
     provider_id: Optional[str] = None  # ID from social provider
     is_active: bool = True
     is_verified: bool = False
+    is_admin: bool = False  # granted directly in the database
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
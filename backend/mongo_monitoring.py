@@ -0,0 +1,284 @@
+"""
+MongoDB command monitoring.
+
+``CommandMetricsListener`` is registered on the Motor client (see
+``database.create_client``) and sees every command the driver runs. For
+each one it records the duration, collection, command name and number of
+documents returned in the metrics registry, and:
+
+- adds the duration to the current request's ``RequestDbStats``, which
+  ``RequestContextMiddleware`` puts on the access log line and in a
+  ``Server-Timing`` header. Motor runs commands on executor threads with a
+  copy of the caller's context, so the listener finds the request's stats
+  object through ``db_stats_var``;
+- logs commands slower than ``MONGO_SLOW_QUERY_MS`` with the shape of their
+  filter (values replaced by ``"?"``) so similar queries group together;
+- in dev mode (``MONGO_DETECT_COLLSCANS``), hands each new read shape to
+  ``CollectionScanDetector``, which explains it once in the background and
+  warns when the winning plan scans the whole collection.
+
+``getMore`` on the invalidation bus's change stream is left out: each one
+waits on the server (about a second when idle) for the next change, which
+would otherwise show up as a slow query every second.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Tuple
+
+from pymongo import monitoring
+
+from config import MONGO_SLOW_QUERY_MS
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("mongo.slow")
+
+# Commands whose first field names the collection they read or write
+_COLLECTION_COMMANDS = frozenset({
+    "find", "aggregate", "count", "distinct", "insert", "update", "delete", "findAndModify",
+    "createIndexes", "listIndexes", "drop",
+})
+# Reads worth explaining for collection scans
+_EXPLAINABLE_COMMANDS = frozenset({"find", "aggregate", "count", "distinct"})
+# Driver-added fields that explain rejects or that don't affect the plan
+_DRIVER_FIELDS = frozenset({"lsid", "txnNumber", "autocommit", "startTransaction", "readConcern", "writeConcern"})
+# Distinct shapes remembered by the scan detector
+MAX_EXPLAINED_SHAPES = 1000
+# Cursor namespace of database-level change streams (the invalidation bus)
+CHANGE_STREAM_COLLECTION = "$cmd.aggregate"
+
+
+class RequestDbStats:
+    """Database time and query count accumulated by one HTTP request"""
+
+    __slots__ = ("_lock", "queries", "seconds")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.seconds = 0.0
+
+    def add(self, seconds: float):
+        # Commands of one request can run on several executor threads at once
+        with self._lock:
+            self.queries += 1
+            self.seconds += seconds
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.2f};desc="{self.queries} queries"'
+
+
+db_stats_var: ContextVar[Optional[RequestDbStats]] = ContextVar("db_stats", default=None)
+
+
+def query_shape(value: Any) -> Any:
+    """A filter with its values replaced by "?", keeping field names and operators"""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+        # $or / $and / pipelines: keep the structure of each clause
+        return [query_shape(item) for item in value]
+    return "?"
+
+
+def command_collection(command_name: str, command: Dict[str, Any]) -> str:
+    if command_name in _COLLECTION_COMMANDS:
+        return str(command.get(command_name, "-"))
+    if command_name == "getMore":
+        return str(command.get("collection", "-"))
+    return "-"
+
+
+def command_filter(command_name: str, command: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The query part of a command, for slow-query logging"""
+    if command_name == "find":
+        return command.get("filter", {})
+    if command_name in ("count", "distinct", "findAndModify"):
+        return command.get("query", {})
+    if command_name == "aggregate":
+        pipeline = command.get("pipeline", [])
+        return pipeline[0].get("$match", {}) if pipeline and "$match" in pipeline[0] else {}
+    if command_name in ("update", "delete"):
+        statements = command.get("updates" if command_name == "update" else "deletes", [])
+        return statements[0].get("q", {}) if statements else {}
+    return None
+
+
+def docs_returned(command_name: str, reply: Dict[str, Any]) -> int:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", ())))
+    if command_name == "distinct":
+        return len(reply.get("values", ()))
+    if command_name == "findAndModify":
+        return 1 if reply.get("value") is not None else 0
+    return 0
+
+
+def _shape_key(value: Any) -> str:
+    return json.dumps(query_shape(value), sort_keys=True, default=str)
+
+
+class CollectionScanDetector:
+    """
+    Dev-mode check that explains each new read shape once.
+
+    ``submit`` is called from the listener on driver threads and only
+    queues the command; a task on the app's event loop runs the explain, so
+    the query that triggered it is never slowed down.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._seen: set = set()
+        self._seen_lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self, client):
+        """Begin explaining submitted commands with the given Motor client"""
+        self._client = client
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=MAX_EXPLAINED_SHAPES)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._client = None
+
+    def submit(self, database: str, command_name: str, command: Dict[str, Any]):
+        if self._task is None or command_name not in _EXPLAINABLE_COMMANDS:
+            return
+        key = (database, command_collection(command_name, command), command_name,
+               _shape_key(command_filter(command_name, command)))
+        with self._seen_lock:
+            if key in self._seen or len(self._seen) >= MAX_EXPLAINED_SHAPES:
+                return
+            self._seen.add(key)
+        explainable = {
+            name: value for name, value in command.items()
+            if name not in _DRIVER_FIELDS and not name.startswith("$")
+        }
+        self._loop.call_soon_threadsafe(self._enqueue, database, key, explainable)
+
+    def _enqueue(self, database: str, key: Tuple, command: Dict[str, Any]):
+        try:
+            self._queue.put_nowait((database, key, command))
+        except asyncio.QueueFull:
+            pass
+
+    async def _run(self):
+        while True:
+            database, key, command = await self._queue.get()
+            try:
+                await self.check(database, key, command)
+            except Exception as e:
+                logger.debug("Could not explain %s: %s", key[2], e)
+
+    async def check(self, database: str, key: Tuple, command: Dict[str, Any]) -> bool:
+        """Explain one command; returns whether its plan scans the collection"""
+        explain = await self._client[database].command({"explain": command, "verbosity": "queryPlanner"})
+        if not _has_stage(explain, "COLLSCAN"):
+            return False
+        _, collection, command_name, shape = key
+        registry.inc("mongo_collection_scans_total", collection=collection)
+        logger.warning(
+            "Collection scan on %s.%s: %s %s",
+            database, collection, command_name, shape,
+            extra={"collection": collection, "command": command_name, "filter_shape": shape},
+        )
+        return True
+
+
+def _has_stage(plan: Any, stage: str) -> bool:
+    """Whether any (nested) stage of an explain output is the given stage"""
+    if isinstance(plan, dict):
+        if plan.get("stage") == stage:
+            return True
+        return any(_has_stage(value, stage) for value in plan.values())
+    if isinstance(plan, list):
+        return any(_has_stage(item, stage) for item in plan)
+    return False
+
+
+scan_detector = CollectionScanDetector()
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Per-command metrics, per-request DB time and the slow-query log"""
+
+    def __init__(self, slow_query_ms: float = MONGO_SLOW_QUERY_MS, detector: CollectionScanDetector = scan_detector):
+        self.slow_query_seconds = slow_query_ms / 1000
+        self.detector = detector
+        self._lock = threading.Lock()
+        # (connection, request id) -> (collection, filter) captured when the command starts
+        self._pending: Dict[Tuple[Any, int], Tuple[str, Optional[Dict[str, Any]]]] = {}
+
+    def started(self, event):
+        if event.command_name == "explain":
+            return
+        command = event.command
+        collection = command_collection(event.command_name, command)
+        if event.command_name == "getMore" and collection == CHANGE_STREAM_COLLECTION:
+            # Change stream long polls wait on the server until something
+            # changes; their duration is idle time, not query time
+            return
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                collection, command_filter(event.command_name, command)
+            )
+        if self.detector.running:
+            self.detector.submit(event.database_name, event.command_name, command)
+
+    def succeeded(self, event):
+        self._finish(event, docs_returned(event.command_name, event.reply), "ok")
+
+    def failed(self, event):
+        self._finish(event, 0, "error")
+
+    def _finish(self, event, returned: int, outcome: str):
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        collection, query = pending
+        seconds = event.duration_micros / 1_000_000
+        command_name = event.command_name
+
+        registry.observe("mongo_command_duration_seconds", seconds, command=command_name, collection=collection)
+        registry.inc("mongo_commands_total", command=command_name, collection=collection, outcome=outcome)
+        if returned:
+            registry.inc("mongo_docs_returned_total", returned, collection=collection)
+
+        stats = db_stats_var.get()
+        if stats is not None:
+            stats.add(seconds)
+
+        if seconds >= self.slow_query_seconds:
+            shape = _shape_key(query) if query is not None else None
+            slow_query_logger.warning(
+                "Slow %s on %s: %.1fms %s",
+                command_name, collection, seconds * 1000, shape or "",
+                extra={
+                    "collection": collection,
+                    "command": command_name,
+                    "duration_ms": round(seconds * 1000, 2),
+                    "docs_returned": returned,
+                    "filter_shape": shape,
+                },
+            )
@@ -0,0 +1,96 @@
+"""
+Password hashing off the event loop.
+
+A bcrypt hash or check takes ~250ms of CPU at the default cost. Run inline
+in an async handler it blocks the event loop for that long, so a few
+concurrent logins stall every other request of the worker. bcrypt releases
+the GIL while it works, so ``PasswordHasher`` runs it on a small dedicated
+thread pool instead; the loop keeps serving other requests meanwhile.
+
+The pool is bounded twice: ``max_workers`` threads (more than the CPU
+count only adds contention) and at most ``max_queue`` operations waiting
+for a thread. Past that, ``run`` raises ``PasswordHashingBusy`` at once,
+which routes turn into a 503, rather than letting a login storm build a
+queue whose tail waits for many seconds. Queue depth, rejections, queue
+wait and hashing time are in ``GET /api/metrics``.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+import bcrypt
+
+from metrics import registry
+from config import PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE
+
+T = TypeVar("T")
+
+
+class PasswordHashingBusy(Exception):
+    """Raised by PasswordHasher.run() when max_queue operations are already waiting"""
+
+
+class PasswordHasher:
+    """
+    Bounded thread pool for bcrypt operations.
+
+    Args:
+        max_workers: Threads hashing at the same time
+        max_queue: Operations allowed to wait for a thread before rejecting
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 32):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Submitted and not finished: running plus queued
+        self._in_flight = 0
+
+    @property
+    def queued(self) -> int:
+        return max(0, self._in_flight - self.max_workers)
+
+    async def run(self, operation: str, func: Callable[..., T], *args) -> T:
+        """Run func(*args) on the pool; raises PasswordHashingBusy when the queue is full"""
+        if self._in_flight >= self.max_workers + self.max_queue:
+            registry.inc("password_hash_rejected_total", operation=operation)
+            raise PasswordHashingBusy("Password hashing queue is full")
+
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            result = func(*args)
+            return result, started - submitted, time.perf_counter() - started
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="password-hash")
+        self._in_flight += 1
+        registry.set_gauge("password_hash_queue_depth", self.queued)
+        try:
+            result, waited, elapsed = await asyncio.get_running_loop().run_in_executor(self._executor, timed)
+        finally:
+            self._in_flight -= 1
+            registry.set_gauge("password_hash_queue_depth", self.queued)
+        registry.observe("password_hash_queue_seconds", waited, operation=operation)
+        registry.observe("password_hash_seconds", elapsed, operation=operation)
+        return result
+
+    async def hash(self, password: str) -> str:
+        hashed = await self.run("hash", bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt())
+        return hashed.decode('utf-8')
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self.run("verify", bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+
+    def shutdown(self):
+        """Stop the threads; a later run() starts a new pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Process-wide pool; shut down by the app lifespan
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE)
@@ -0,0 +1,327 @@
+"""
+Sliding-window rate limiting for the auth and public write endpoints.
+
+Each ``RouteRule`` limits one route per client IP and, optionally, per a
+field of the JSON body (the email for auth routes), so a single address
+can't flood an account and a botnet can't hammer one account. Limits are
+``requests`` per ``window_seconds``, counted with a sliding-window counter:
+the previous fixed window's count, weighted by how much of it still
+overlaps the sliding window, plus the current window's count. That costs
+two integers per key instead of one timestamp per request.
+
+``RateLimitMiddleware`` checks the IP limit from the ASGI scope before the
+body is read, and the key limit from the raw body before FastAPI parses
+and validates it, so rejected requests never reach bcrypt or MongoDB.
+Rejections are 429 with ``Retry-After``.
+
+Counters live in memory by default, which is per worker process: with N
+workers the effective limit is up to N times higher. ``MongoBackend``
+shares the counters between workers through the ``rate_limits``
+collection (one document per key and window, removed by a TTL index) at
+the cost of a round trip per checked request. If MongoDB is unreachable
+requests are let through rather than locking everyone out.
+
+Behind proxies, set ``trusted_proxies`` to how many of them append to
+``X-Forwarded-For``. The client IP is read that many entries from the
+right: whatever is further left was sent by the client and can be forged
+on every request to dodge the per-IP limits.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from pymongo import ReturnDocument
+from starlette.datastructures import Headers
+
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMITS_COLLECTION = "rate_limits"
+# Key limits are only checked for bodies up to this size; larger ones go on to validation
+MAX_KEY_BODY_BYTES = 16 * 1024
+MAX_KEY_LENGTH = 254
+
+
+class RateLimit(NamedTuple):
+    requests: int
+    window_seconds: float
+
+
+class RouteRule(NamedTuple):
+    """Limits for one route: per client IP, and per value of a JSON body field"""
+    name: str
+    method: str
+    path: str
+    ip: Optional[RateLimit] = None
+    key_field: Optional[str] = None
+    key: Optional[RateLimit] = None
+
+
+DEFAULT_RULES: Tuple[RouteRule, ...] = (
+    RouteRule("register", "POST", "/api/auth/register",
+              ip=RateLimit(10, 3600), key_field="email", key=RateLimit(3, 3600)),
+    RouteRule("login", "POST", "/api/auth/login",
+              ip=RateLimit(20, 60), key_field="email", key=RateLimit(5, 60)),
+    RouteRule("forgot_password", "POST", "/api/auth/forgot-password",
+              ip=RateLimit(5, 900), key_field="email", key=RateLimit(3, 900)),
+    RouteRule("resend_verification", "POST", "/api/auth/resend-verification",
+              ip=RateLimit(5, 900), key_field="email", key=RateLimit(3, 900)),
+    RouteRule("support_contact", "POST", "/api/support/contact",
+              ip=RateLimit(10, 600), key_field="email", key=RateLimit(5, 600)),
+    RouteRule("testimonials", "POST", "/api/testimonials", ip=RateLimit(3, 3600)),
+)
+
+
+def parse_rate_limits(value: str) -> Dict[str, Optional[RateLimit]]:
+    """
+    Parse "login.ip=20/60,login.key=5/60,testimonials.ip=off" into
+    {"login.ip": RateLimit(20, 60), ..., "testimonials.ip": None}.
+    """
+    limits = {}
+    for part in value.split(","):
+        name, _, limit = part.partition("=")
+        name, limit = name.strip(), limit.strip()
+        if not name or not limit:
+            continue
+        if limit.lower() == "off":
+            limits[name] = None
+            continue
+        requests, _, seconds = limit.partition("/")
+        limits[name] = RateLimit(int(requests), float(seconds))
+    return limits
+
+
+def apply_overrides(rules: Sequence[RouteRule], overrides: Dict[str, Optional[RateLimit]]) -> List[RouteRule]:
+    """Replace rule limits named "<rule>.ip" or "<rule>.key" in overrides"""
+    names = {f"{rule.name}.{scope}" for rule in rules for scope in ("ip", "key")}
+    unknown = set(overrides) - names
+    if unknown:
+        raise ValueError(f"Unknown rate limits: {', '.join(sorted(unknown))}")
+    return [
+        rule._replace(
+            ip=overrides.get(f"{rule.name}.ip", rule.ip),
+            key=overrides.get(f"{rule.name}.key", rule.key),
+        )
+        for rule in rules
+    ]
+
+
+def sliding_window(limit: RateLimit, now: float, previous: int, current: int) -> Tuple[bool, float]:
+    """
+    Decide on one request given the previous and current fixed-window counts
+    (the current count excluding this request).
+
+    Returns (allowed, retry_after_seconds).
+    """
+    window = limit.window_seconds
+    elapsed = now % window
+    weight = 1 - elapsed / window
+    if previous * weight + current + 1 <= limit.requests:
+        return True, 0.0
+
+    room = limit.requests - 1 - current
+    if room >= 0 and previous:
+        # Wait until the previous window's weight has decayed enough
+        return False, window * (1 - room / previous) - elapsed
+    # Not before the next window, where this window's count becomes the weighted one
+    room = limit.requests - 1
+    return False, (window - elapsed) + max(0.0, window * (1 - room / max(current, 1)))
+
+
+class MemoryBackend:
+    """Per-process counters, least recently used keys dropped beyond max_keys"""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        # key -> [window index, previous count, current count]
+        self._counters: "OrderedDict[str, List[int]]" = OrderedDict()
+
+    async def hit(self, key: str, limit: RateLimit, now: float) -> Tuple[bool, float]:
+        index = int(now // limit.window_seconds)
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters[key] = [index, 0, 0]
+            if len(self._counters) > self.max_keys:
+                self._counters.popitem(last=False)
+        else:
+            self._counters.move_to_end(key)
+            if counter[0] != index:
+                counter[1] = counter[2] if counter[0] == index - 1 else 0
+                counter[0], counter[2] = index, 0
+
+        allowed, retry_after = sliding_window(limit, now, counter[1], counter[2])
+        if allowed:
+            counter[2] += 1
+        return allowed, retry_after
+
+    def reset(self):
+        self._counters.clear()
+
+
+class MongoBackend:
+    """
+    Counters shared by every worker, one document per key and fixed window.
+
+    The current window is incremented before the decision, so requests
+    rejected while over the limit still count against the client.
+    """
+
+    def __init__(self, database, collection: str = RATE_LIMITS_COLLECTION):
+        self.database = database
+        self.collection = collection
+
+    async def hit(self, key: str, limit: RateLimit, now: float) -> Tuple[bool, float]:
+        index = int(now // limit.window_seconds)
+        # Kept while it can still be the previous window
+        expires_at = datetime.utcfromtimestamp((index + 2) * limit.window_seconds) + timedelta(seconds=1)
+        collection = self.database[self.collection]
+        current, previous = await asyncio.gather(
+            collection.find_one_and_update(
+                {"_id": f"{key}:{index}"},
+                {"$inc": {"count": 1}, "$setOnInsert": {"expires_at": expires_at}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            ),
+            collection.find_one({"_id": f"{key}:{index - 1}"}),
+        )
+        return sliding_window(limit, now, previous["count"] if previous else 0, current["count"] - 1)
+
+    def reset(self):
+        pass
+
+
+class RateLimiter:
+    """Applies route rules against a counter backend"""
+
+    def __init__(self, rules: Sequence[RouteRule] = DEFAULT_RULES, backend=None,
+                 trusted_proxies: int = 0, enabled: bool = True):
+        self.backend = backend or MemoryBackend()
+        self.trusted_proxies = trusted_proxies
+        self.enabled = enabled
+        self.configure(rules)
+
+    def configure(self, rules: Sequence[RouteRule]):
+        self.rules = {(rule.method, rule.path): rule for rule in rules}
+
+    def rule_for(self, scope) -> Optional[RouteRule]:
+        if not self.enabled:
+            return None
+        return self.rules.get((scope["method"], scope["path"].rstrip("/") or "/"))
+
+    def client_ip(self, scope) -> str:
+        if self.trusted_proxies:
+            forwarded = Headers(scope=scope).get("x-forwarded-for")
+            entries = [entry.strip() for entry in forwarded.split(",")] if forwarded else []
+            if entries:
+                # The leftmost entry a trusted proxy wrote, never one the client sent
+                return entries[-min(self.trusted_proxies, len(entries))]
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    async def check(self, rule: RouteRule, scope: str, value: str, limit: RateLimit) -> Optional[float]:
+        """Count one request; returns seconds to wait when it is over the limit"""
+        key = f"{rule.name}:{scope}:{value[:MAX_KEY_LENGTH]}"
+        try:
+            allowed, retry_after = await self.backend.hit(key, limit, time.time())
+        except Exception as e:
+            logger.error("Rate limit check failed, allowing request: %s", e)
+            registry.inc("rate_limit_errors_total", rule=rule.name)
+            return None
+        if allowed:
+            return None
+        registry.inc("rate_limit_rejected_total", rule=rule.name, scope=scope)
+        return retry_after
+
+    def reset(self):
+        self.backend.reset()
+
+
+def body_key(body: bytes, field: str) -> Optional[str]:
+    """The normalized value of a top-level JSON string field, if any"""
+    try:
+        value = json.loads(body).get(field)
+    except (ValueError, AttributeError):
+        return None
+    return value.strip().lower() if isinstance(value, str) and value.strip() else None
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware applying a RateLimiter's route rules.
+
+    Requests to other routes pass through untouched. For rules with a key
+    field the body is read here (it is small) and replayed to the app.
+    """
+
+    def __init__(self, app, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        rule = self.limiter.rule_for(scope) if scope["type"] == "http" else None
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        if rule.ip:
+            retry_after = await self.limiter.check(rule, "ip", self.limiter.client_ip(scope), rule.ip)
+            if retry_after is not None:
+                await self._reject(send, retry_after)
+                return
+
+        if rule.key:
+            messages, body = await self._read_body(receive)
+            key = body_key(body, rule.key_field) if len(body) <= MAX_KEY_BODY_BYTES else None
+            if key is not None:
+                retry_after = await self.limiter.check(rule, "key", key, rule.key)
+                if retry_after is not None:
+                    await self._reject(send, retry_after)
+                    return
+            receive = self._replay(messages, receive)
+
+        await self.app(scope, receive, send)
+
+    async def _read_body(self, receive) -> Tuple[List[dict], bytes]:
+        messages, body = [], b""
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                break
+            body += message.get("body", b"")
+            if not message.get("more_body") or len(body) > MAX_KEY_BODY_BYTES:
+                break
+        return messages, body
+
+    @staticmethod
+    def _replay(messages: List[dict], receive):
+        async def replay():
+            if messages:
+                return messages.pop(0)
+            return await receive()
+        return replay
+
+    @staticmethod
+    async def _reject(send, retry_after: float):
+        body = b'{"detail":"Too many requests, please try again later"}'
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+# Process-wide limiter; server.py applies the configured rules and backend
+rate_limiter = RateLimiter()
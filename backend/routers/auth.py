@@ -15,11 +15,20 @@ from security import (
     generate_reset_token, get_current_user,
     send_password_reset_email, send_verification_email
 )
+from password_hashing import PasswordHashingBusy
 from config import GOOGLE_CLIENT_ID
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+def _password_hashing_busy() -> HTTPException:
+    """503 for when the password hashing pool is saturated (e.g. a login storm)"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-in attempts right now, please try again shortly",
+        headers={"Retry-After": "1"}
+    )
+
 # Authentication Endpoints
 @router.post("/auth/register", response_model=AuthResponse, status_code=status.HTTP_201_CREATED)
 async def register_user(user_data: UserCreate):
@@ -34,7 +43,7 @@ async def register_user(user_data: UserCreate):
             )
         
         # Create new user
-        hashed_password = hash_password(user_data.password)
+        hashed_password = await hash_password(user_data.password)
         user = User(
             name=user_data.name,
             email=user_data.email,
@@ -74,8 +83,10 @@ async def register_user(user_data: UserCreate):
         )
     except HTTPException:
         raise
+    except PasswordHashingBusy:
+        raise _password_hashing_busy()
     except Exception as e:
-        logger.error(f"Error registering user: {e}")
+        logger.error("Error registering user: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/auth/login", response_model=AuthResponse)
@@ -93,7 +104,7 @@ async def login_user(login_data: UserLogin):
         user = User(**user_doc)
         
         # Check password
-        if not user.password_hash or not verify_password(login_data.password, user.password_hash):
+        if not user.password_hash or not await verify_password(login_data.password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password"
@@ -113,8 +124,10 @@ async def login_user(login_data: UserLogin):
         )
     except HTTPException:
         raise
+    except PasswordHashingBusy:
+        raise _password_hashing_busy()
     except Exception as e:
-        logger.error(f"Error logging in user: {e}")
+        logger.error("Error logging in user: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/auth/social", response_model=AuthResponse)
@@ -141,6 +154,7 @@ async def social_login(social_data: SocialLoginData):
             if updated:
                 user.updated_at = datetime.utcnow()
                 await db.users.replace_one({"id": user.id}, user.dict())
+                Database.invalidate_user(user.id)
         else:
             # Create new user from social data
             user = User(
@@ -168,7 +182,7 @@ async def social_login(social_data: SocialLoginData):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error with social login: {e}")
+        logger.error("Error with social login: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/auth/google", response_model=AuthResponse)
@@ -226,6 +240,7 @@ async def google_login(request_data: dict):
                 if updated:
                     user.updated_at = datetime.utcnow()
                     await db.users.replace_one({"id": user.id}, user.dict())
+                    Database.invalidate_user(user.id)
             else:
                 # Create new user from Google data
                 user = User(
@@ -253,7 +268,7 @@ async def google_login(request_data: dict):
             
         except ValueError as e:
             # Invalid token
-            logger.error(f"Invalid Google token: {e}")
+            logger.error("Invalid Google token: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid Google token"
@@ -262,7 +277,7 @@ async def google_login(request_data: dict):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error with Google login: {e}")
+        logger.error("Error with Google login: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/auth/verify")
@@ -335,7 +350,7 @@ async def forgot_password(request_data: PasswordResetRequest):
         return {"message": "If the email exists, a password reset link has been sent"}
         
     except Exception as e:
-        logger.error(f"Error in forgot password: {e}")
+        logger.error("Error in forgot password: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/auth/reset-password")
@@ -375,25 +390,25 @@ async def reset_password(reset_data: PasswordResetConfirm):
             )
         
         # Update user's password
-        new_password_hash = hash_password(reset_data.new_password)
+        new_password_hash = await hash_password(reset_data.new_password)
         user.password_hash = new_password_hash
         user.updated_at = datetime.utcnow()
         
         # Save updated user
         await db.users.replace_one({"id": user.id}, user.dict())
+        Database.invalidate_user(user.id)
         
-        # Mark token as used
-        await db.password_reset_tokens.update_one(
-            {"_id": token_doc["_id"]},
-            {"$set": {"used": True}}
-        )
+        # Consume the token (expired ones are removed by the expires_at TTL index)
+        await db.password_reset_tokens.delete_one({"_id": token_doc["_id"]})
         
         return {"message": "Password reset successfully"}
         
     except HTTPException:
         raise
+    except PasswordHashingBusy:
+        raise _password_hashing_busy()
     except Exception as e:
-        logger.error(f"Error resetting password: {e}")
+        logger.error("Error resetting password: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 # Email Verification Endpoints
@@ -435,7 +450,7 @@ async def resend_verification_email_endpoint(request_data: EmailVerificationRequ
         return {"message": "Verification email sent"}
         
     except Exception as e:
-        logger.error(f"Error resending verification: {e}")
+        logger.error("Error resending verification: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/auth/verify-email/{token}")
@@ -472,6 +487,7 @@ async def verify_email(token: str):
         
         # Save updated user
         await db.users.replace_one({"id": user.id}, user.dict())
+        Database.invalidate_user(user.id)
         
         # Remove verification token
         await db.email_verification_tokens.delete_one({"_id": token_doc["_id"]})
@@ -481,5 +497,5 @@ async def verify_email(token: str):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error verifying email: {e}")
+        logger.error("Error verifying email: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
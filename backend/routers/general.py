@@ -1,28 +1,40 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Depends, Query
+from datetime import datetime
 import logging
 
 from models import (
     PricingPlan, PricingPlanCreate, PricingPlanResponse,
     DashboardStat, DashboardStatsResponse,
     Testimonial, TestimonialCreate, TestimonialResponse,
-    SupportRequest, SupportRequestCreate, SupportRequestResponse
+    SupportRequest, SupportRequestCreate, SupportRequestResponse, User
 )
-from database import Database, db
+from database import Database, db, catalog_cache, support_requests_buffer
+from write_buffer import BufferFull
+from catalog_fields import with_search_fields
+from serialization import projection, construct, construct_many, to_json_bytes
+from conditional import CachedBody, cached_body, conditional_response
+from feeds import load_testimonials_feed, rebuild_testimonials_feed
+from security import get_admin_user
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 # Pricing Plans Endpoints
+async def load_pricing_plans_body() -> CachedBody:
+    """Read and serialize all pricing plans"""
+    plans_cursor = db.pricing_plans.find({}, projection(PricingPlan))
+    plans_list = await plans_cursor.to_list(1000)
+    plans = construct_many(PricingPlan, plans_list)
+    return cached_body(to_json_bytes(PricingPlanResponse.model_construct(plans=plans)))
+
 @router.get("/pricing-plans", response_model=PricingPlanResponse)
-async def get_pricing_plans():
+async def get_pricing_plans(request: Request):
     """Get all pricing plans"""
     try:
-        plans_cursor = db.pricing_plans.find()
-        plans_list = await plans_cursor.to_list(1000)
-        plans = [PricingPlan(**plan) for plan in plans_list]
-        return PricingPlanResponse(plans=plans)
+        entry = await catalog_cache.get_or_load("pricing_plans", load_pricing_plans_body)
+        return conditional_response(request, entry)
     except Exception as e:
-        logger.error(f"Error fetching pricing plans: {e}")
+        logger.error("Error fetching pricing plans: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/pricing-plans", response_model=PricingPlan)
@@ -30,10 +42,11 @@ async def create_pricing_plan(plan_data: PricingPlanCreate):
     """Create a new pricing plan"""
     try:
         plan = PricingPlan(**plan_data.dict())
-        await db.pricing_plans.insert_one(plan.dict())
+        await db.pricing_plans.insert_one(with_search_fields(plan.dict()))
+        Database.invalidate_catalog("pricing_plans")
         return plan
     except Exception as e:
-        logger.error(f"Error creating pricing plan: {e}")
+        logger.error("Error creating pricing plan: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 # Dashboard Statistics Endpoint
@@ -45,45 +58,116 @@ async def get_dashboard_stats():
         dashboard_stats = [DashboardStat(**stat) for stat in stats]
         return DashboardStatsResponse(stats=dashboard_stats)
     except Exception as e:
-        logger.error(f"Error fetching dashboard stats: {e}")
+        logger.error("Error fetching dashboard stats: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 # Testimonials Endpoints
+def _testimonials_body(items) -> CachedBody:
+    testimonials = construct_many(Testimonial, items)
+    return cached_body(to_json_bytes(TestimonialResponse.model_construct(testimonials=testimonials)))
+
+async def load_testimonials_body() -> CachedBody:
+    """Serialize the materialized public feed, building it on first use"""
+    items = await load_testimonials_feed(db)
+    if items is None:
+        items = await rebuild_testimonials_feed(db)
+    return _testimonials_body(items)
+
+async def _publish_testimonials_feed():
+    """Rebuild the public feed after moderation and serve it from memory right away"""
+    catalog_cache.set("testimonials", _testimonials_body(await rebuild_testimonials_feed(db)))
+
 @router.get("/testimonials", response_model=TestimonialResponse)
-async def get_testimonials():
+async def get_testimonials(request: Request):
     """Get approved testimonials"""
     try:
-        testimonials_cursor = db.testimonials.find({"approved": True})
-        testimonials_list = await testimonials_cursor.to_list(1000)
-        testimonials = [Testimonial(**testimonial) for testimonial in testimonials_list]
-        return TestimonialResponse(testimonials=testimonials)
+        entry = await catalog_cache.get_or_load("testimonials", load_testimonials_body)
+        return conditional_response(request, entry)
     except Exception as e:
-        logger.error(f"Error fetching testimonials: {e}")
+        logger.error("Error fetching testimonials: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/testimonials", response_model=Testimonial)
 async def create_testimonial(testimonial_data: TestimonialCreate):
-    """Create a new testimonial"""
+    """Submit a testimonial; it is published once an admin approves it"""
     try:
         testimonial = Testimonial(**testimonial_data.dict())
         await db.testimonials.insert_one(testimonial.dict())
         return testimonial
     except Exception as e:
-        logger.error(f"Error creating testimonial: {e}")
+        logger.error("Error creating testimonial: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@router.get("/testimonials/pending", response_model=TestimonialResponse)
+async def get_pending_testimonials(
+    limit: int = Query(50, ge=1, le=200),
+    admin: User = Depends(get_admin_user)
+):
+    """Get testimonials awaiting moderation, oldest first"""
+    try:
+        cursor = db.testimonials.find({"approved": False, "rejected": False}, projection(Testimonial))
+        docs = await cursor.sort([("created_at", 1), ("id", 1)]).limit(limit).to_list(limit)
+        return TestimonialResponse.model_construct(testimonials=construct_many(Testimonial, docs))
+    except Exception as e:
+        logger.error("Error fetching pending testimonials: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+async def _moderate_testimonial(testimonial_id: str, approved: bool) -> Testimonial:
+    moderation = {"approved": approved, "rejected": not approved, "moderated_at": datetime.utcnow()}
+    try:
+        before = await db.testimonials.find_one_and_update(
+            {"id": testimonial_id}, {"$set": moderation}, projection=projection(Testimonial)
+        )
+        if before is None:
+            raise HTTPException(status_code=404, detail="Testimonial not found")
+        # The feed only changes when a testimonial enters or leaves it
+        if before.get("approved", False) != approved:
+            await _publish_testimonials_feed()
+        return construct(Testimonial, {**before, **moderation})
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error moderating testimonial: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.post("/testimonials/{testimonial_id}/approve", response_model=Testimonial)
+async def approve_testimonial(testimonial_id: str, admin: User = Depends(get_admin_user)):
+    """Publish a testimonial"""
+    return await _moderate_testimonial(testimonial_id, approved=True)
+
+@router.post("/testimonials/{testimonial_id}/reject", response_model=Testimonial)
+async def reject_testimonial(testimonial_id: str, admin: User = Depends(get_admin_user)):
+    """Reject a testimonial (and unpublish it if it was approved)"""
+    return await _moderate_testimonial(testimonial_id, approved=False)
+
 # Support Endpoints
 @router.post("/support/contact", response_model=SupportRequestResponse)
 async def submit_support_request(request_data: SupportRequestCreate):
-    """Submit a support request"""
+    """
+    Submit a support request.
+
+    The request is queued in the write-behind buffer and its id returned
+    right away; it is inserted with the next batch. Without a running
+    buffer (no app lifespan) it is inserted directly.
+    """
     try:
         support_request = SupportRequest(**request_data.dict())
-        await db.support_requests.insert_one(support_request.dict())
+        document = support_request.dict()
+        if support_requests_buffer.running:
+            support_requests_buffer.submit(document)
+        else:
+            await db.support_requests.insert_one(document)
         
         return SupportRequestResponse(
             message="Support request submitted successfully",
             request_id=support_request.id
         )
+    except BufferFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many support requests right now, please try again shortly",
+            headers={"Retry-After": "5"}
+        )
     except Exception as e:
-        logger.error(f"Error submitting support request: {e}")
+        logger.error("Error submitting support request: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
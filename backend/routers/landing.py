@@ -0,0 +1,92 @@
+from fastapi import APIRouter, HTTPException, Request
+from email.utils import formatdate
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import logging
+import time
+
+from models import DashboardStat, DashboardStatsResponse
+from database import Database, catalog_cache, dashboard_stats_cache
+from cache import TTLCache
+from conditional import CachedBody, conditional_response
+from serialization import FastJSONResponse, to_json_bytes
+from routers.general import load_pricing_plans_body, load_testimonials_body
+from routers.servers import load_default_servers_page
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# (section body, bytes identifying its content, build time, cache metadata)
+Section = Tuple[bytes, bytes, float, Dict[str, Any]]
+
+
+def _cache_meta(cache: TTLCache, key: str, was_cached: bool) -> Dict[str, Any]:
+    age = cache.age(key)
+    return {
+        "cached": was_cached,
+        "age_seconds": round(age, 3) if age is not None else 0.0,
+        "ttl_seconds": cache.ttl,
+    }
+
+
+async def _catalog_section(key: str, loader) -> Section:
+    """A catalog body exactly as its own route serves it"""
+    was_cached = catalog_cache.age(key) is not None
+    entry: CachedBody = await catalog_cache.get_or_load(key, loader)
+    meta = {**_cache_meta(catalog_cache, key, was_cached), "etag": entry.etag}
+    return entry.body, entry.etag.encode(), entry.built_at, meta
+
+
+async def _dashboard_stats_section() -> Section:
+    was_cached = dashboard_stats_cache.age("stats") is not None
+    stats = await Database.get_dashboard_stats()
+    body = to_json_bytes(DashboardStatsResponse(stats=[DashboardStat(**stat) for stat in stats]))
+    meta = _cache_meta(dashboard_stats_cache, "stats", was_cached)
+    return body, body, time.time() - meta["age_seconds"], meta
+
+
+@router.get("/landing")
+async def get_landing(request: Request):
+    """
+    Everything the home page renders, in one response.
+
+    Sections are loaded concurrently, each from its own cache, and spliced
+    into the payload as the serialized bytes their routes would send. A
+    section that fails is sent as null with ``"error": true`` in its
+    metadata so the rest of the page still renders.
+    """
+    sections = {
+        "servers": _catalog_section("game_servers", load_default_servers_page),
+        "pricing_plans": _catalog_section("pricing_plans", load_pricing_plans_body),
+        "dashboard_stats": _dashboard_stats_section(),
+        "testimonials": _catalog_section("testimonials", load_testimonials_body),
+    }
+    results = await asyncio.gather(*sections.values(), return_exceptions=True)
+
+    parts = []
+    meta: Dict[str, Dict[str, Any]] = {}
+    digest = hashlib.blake2b(digest_size=16)
+    newest: Optional[float] = None
+    for name, result in zip(sections, results):
+        if isinstance(result, Exception):
+            logger.error("Error loading landing section %s: %s", name, result)
+            body, meta[name] = b"null", {"error": True}
+        else:
+            body, identity, built_at, meta[name] = result
+            digest.update(identity)
+            newest = built_at if newest is None else max(newest, built_at)
+        parts.append(b'"%s":%s' % (name.encode(), body))
+
+    if newest is None:
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+    parts.append(b'"cache":' + FastJSONResponse(meta).body)
+    # Weak tag: it covers the sections' content, not the per-request cache metadata
+    entry = CachedBody(
+        b"{" + b",".join(parts) + b"}",
+        f'W/"{digest.hexdigest()}"',
+        formatdate(newest, usegmt=True),
+        newest,
+    )
+    return conditional_response(request, entry)
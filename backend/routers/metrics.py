@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Depends
+
+from metrics import registry
+from models import User
+from security import get_admin_user
+
+router = APIRouter()
+
+@router.get("/metrics")
+async def get_metrics(admin: User = Depends(get_admin_user)):
+    """Get in-process metrics for this worker (admin: they expose traffic and internals)"""
+    return registry.snapshot()
@@ -0,0 +1,153 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Any, Dict, List, Tuple
+import asyncio
+import logging
+import math
+import re
+
+from models import GameServer, PricingPlan, SearchResult, SearchResponse
+from database import db
+from catalog_fields import normalize_name, name_trigrams
+from serialization import construct
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 50
+# Relevance added on top of the text score when the name starts with / equals the query
+PREFIX_SCORE = 1.5
+EXACT_NAME_SCORE = 3.0
+# Minimum trigram (Jaccard) similarity for a typo-tolerant name match
+FUZZY_THRESHOLD = 0.3
+
+# Search kind -> (collection, model)
+SEARCH_TARGETS = {
+    "server": ("game_servers", GameServer),
+    "plan": ("pricing_plans", PricingPlan),
+}
+
+Hit = Tuple[str, str, float, Dict[str, Any]]  # (kind, match, score, document)
+
+
+async def _text_hits(kind: str, q: str, limit: int) -> List[Hit]:
+    """Full-text matches ranked by Mongo's textScore (name_text / name_description_features_text)"""
+    collection = db[SEARCH_TARGETS[kind][0]]
+    cursor = collection.find(
+        {"$text": {"$search": q}},
+        {"_id": 0, "name_trigrams": 0, "score": {"$meta": "textScore"}}
+    ).sort([("score", {"$meta": "textScore"})]).limit(limit)
+    return [(kind, "text", doc["score"], doc) for doc in await cursor.to_list(limit)]
+
+
+async def _prefix_hits(kind: str, normalized: str, limit: int) -> List[Hit]:
+    """Names starting with the query, case and accent insensitive (search_name index)"""
+    collection = db[SEARCH_TARGETS[kind][0]]
+    cursor = collection.find(
+        {"search_name": {"$regex": f"^{re.escape(normalized)}"}},
+        {"_id": 0, "name_trigrams": 0}
+    ).sort("search_name", 1).limit(limit)
+    return [
+        (kind, "prefix", EXACT_NAME_SCORE if doc["search_name"] == normalized else PREFIX_SCORE, doc)
+        for doc in await cursor.to_list(limit)
+    ]
+
+
+def fuzzy_bounds(count: int) -> Tuple[int, int]:
+    """
+    (fewest shared, most own) trigrams of a name that can reach
+    FUZZY_THRESHOLD against a query with ``count`` trigrams.
+
+    Similarity is shared / (a + n - shared) for a name with a trigrams, at
+    most min(a, n) / max(a, n). So such a name shares at least
+    ceil(threshold * n) trigrams and has at most n / threshold of them.
+    """
+    return math.ceil(FUZZY_THRESHOLD * count - 1e-9), math.floor(count / FUZZY_THRESHOLD + 1e-9)
+
+
+def fuzzy_candidate_trigrams(trigrams: List[str]) -> List[str]:
+    """
+    Trigrams a name must contain at least one of to reach FUZZY_THRESHOLD.
+
+    Such a name shares at least ``fuzzy_bounds`` of the query's n trigrams,
+    so it contains one of any n - shared + 1 of them. Those are picked
+    word-start padding last ("  m", " mi" match most of a catalog), then
+    word-end padding, so the index lookup stays selective.
+    """
+    required = fuzzy_bounds(len(trigrams))[0]
+    ordered = sorted(trigrams, key=lambda trigram: 2 if trigram[0] == " " else 1 if trigram[-1] == " " else 0)
+    return ordered[:len(trigrams) - required + 1]
+
+
+async def _fuzzy_hits(kind: str, trigrams: List[str], limit: int) -> List[Hit]:
+    """
+    Names sharing enough trigrams with the query (name_trigrams multikey index).
+
+    Candidates are narrowed only by conditions every name at the threshold
+    meets (see ``fuzzy_bounds``), cheapest first, before the similarity is
+    computed; the closest names are then kept by a top-``limit`` sort.
+    Nothing is cut in storage order, so the best match is never dropped.
+    """
+    collection = db[SEARCH_TARGETS[kind][0]]
+    shared, most = fuzzy_bounds(len(trigrams))
+    pipeline = [
+        {"$match": {"name_trigrams": {"$in": fuzzy_candidate_trigrams(trigrams)}}},
+        {"$match": {"$expr": {"$and": [
+            {"$lte": [{"$size": "$name_trigrams"}, most]},
+            {"$gte": [{"$size": {"$setIntersection": ["$name_trigrams", trigrams]}}, shared]},
+        ]}}},
+        {"$addFields": {"similarity": {"$let": {
+            "vars": {"shared": {"$size": {"$setIntersection": ["$name_trigrams", trigrams]}}},
+            "in": {"$divide": [
+                "$$shared",
+                {"$subtract": [{"$add": [{"$size": "$name_trigrams"}, len(trigrams)]}, "$$shared"]}
+            ]}
+        }}}},
+        {"$match": {"similarity": {"$gte": FUZZY_THRESHOLD}}},
+        {"$sort": {"similarity": -1, "id": 1}},
+        {"$limit": limit},
+        {"$project": {"_id": 0, "name_trigrams": 0}},
+    ]
+    docs = await collection.aggregate(pipeline).to_list(limit)
+    return [(kind, "fuzzy", doc["similarity"], doc) for doc in docs]
+
+
+def _rank(hits: List[Hit], limit: int) -> List[SearchResult]:
+    """Merge hits per document, summing the score of every way it matched"""
+    merged: Dict[Tuple[str, str], SearchResult] = {}
+    for kind, match, score, doc in hits:
+        key = (kind, doc["id"])
+        result = merged.get(key)
+        if result is None:
+            model = construct(SEARCH_TARGETS[kind][1], doc)
+            result = merged[key] = SearchResult(type=kind, score=0.0, matched_by=[], **{kind: model})
+        result.score = round(result.score + score, 4)
+        if match not in result.matched_by:
+            result.matched_by.append(match)
+    ranked = sorted(merged.values(), key=lambda result: (-result.score, getattr(result, result.type).name))
+    return ranked[:limit]
+
+
+@router.get("/search", response_model=SearchResponse)
+async def search_catalog(
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT)
+):
+    """Search game servers and pricing plans, most relevant first"""
+    normalized = normalize_name(q)
+    try:
+        lookups = [_text_hits(kind, q, limit) for kind in SEARCH_TARGETS]
+        if normalized:
+            lookups += [_prefix_hits(kind, normalized, limit) for kind in SEARCH_TARGETS]
+        hits = [hit for batch in await asyncio.gather(*lookups) for hit in batch]
+
+        # Typo tolerance is the expensive path: only when exact terms found too little
+        trigrams = name_trigrams(q)
+        if trigrams and len({(kind, doc["id"]) for kind, _, _, doc in hits}) < limit:
+            fuzzy = await asyncio.gather(*(_fuzzy_hits(kind, trigrams, limit) for kind in SEARCH_TARGETS))
+            hits += [hit for batch in fuzzy for hit in batch]
+
+        return SearchResponse(query=q, results=_rank(hits, limit))
+    except Exception as e:
+        logger.error("Error searching catalog: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
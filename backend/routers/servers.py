@@ -1,32 +1,146 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+import base64
+import json
 import logging
+import re
 
 from models import (
     GameServer, GameServerCreate, GameServerUpdate, GameServerResponse,
     User
 )
-from database import db
-from security import get_current_user
+from database import Database, db, catalog_cache
+from catalog_fields import with_search_fields
+from serialization import projection, construct_many, to_json_bytes, FastJSONResponse
+from conditional import CachedBody, cached_body, conditional_response
+from security import get_current_user, get_admin_user
+from catalog_io import (
+    DEFAULT_BATCH_SIZE, MAX_BATCH_SIZE, NDJSON_MEDIA_TYPE, export_servers, import_servers
+)
 
 # AMP Client
-from amp_client import get_amp_client, AMPAPIError
+from amp_client import get_amp_client, AMPAPIError, instances_cache
 from pydantic import BaseModel as PydanticBaseModel
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 # Game Servers Endpoints
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# ?sort= value -> document field; every order breaks ties on id
+SORT_FIELDS = {"name": "name", "price": "price_cents", "ram": "ram_mb"}
+
+def _encode_cursor(server: GameServer, sort: str = "name") -> str:
+    """Opaque keyset cursor pointing just past the given server"""
+    raw = json.dumps([sort, getattr(server, SORT_FIELDS[sort]), server.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode_cursor(cursor: str, sort: str = "name") -> Tuple[Any, str]:
+    """Return (sort value, id) from a cursor; raises ValueError when malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, value, server_id = json.loads(raw)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    expected_type = str if sort == "name" else int
+    if cursor_sort != sort or not isinstance(value, expected_type) or not isinstance(server_id, str):
+        raise ValueError("Invalid cursor")
+    return value, server_id
+
+async def _load_servers_page(
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: Optional[Tuple[Any, str]] = None,
+    status_filter: Optional[str] = None,
+    name_prefix: Optional[str] = None,
+    sort: str = "name",
+    ranges: Optional[Dict[str, Dict[str, int]]] = None
+) -> bytes:
+    """
+    Read one page of the catalog ordered by (sort field, id) and serialize it.
+
+    Served by the (status, name, id), (name, id), (price_cents, id),
+    (ram_mb, id) and (price_cents, ram_mb) indexes, so the cost depends on
+    the page size, not on the catalog size. Numeric orders skip servers
+    whose display strings could not be parsed.
+    """
+    field = SORT_FIELDS[sort]
+    query = {}
+    if status_filter:
+        query["status"] = status_filter
+    if name_prefix:
+        query["name"] = {"$regex": f"^{re.escape(name_prefix)}"}
+    for range_field, condition in (ranges or {}).items():
+        query[range_field] = dict(condition)
+    if field != "name":
+        query.setdefault(field, {})["$type"] = "number"
+    if after:
+        value, server_id = after
+        keyset = {"$or": [{field: {"$gt": value}}, {field: value, "id": {"$gt": server_id}}]}
+        query = {"$and": [query, keyset]} if query else keyset
+    
+    servers_cursor = db.game_servers.find(query, projection(GameServer)).sort([(field, 1), ("id", 1)]).limit(limit + 1)
+    servers_list = await servers_cursor.to_list(limit + 1)
+    servers = construct_many(GameServer, servers_list[:limit])
+    next_cursor = _encode_cursor(servers[-1], sort) if len(servers_list) > limit else None
+    return to_json_bytes(GameServerResponse.model_construct(servers=servers, next_cursor=next_cursor))
+
+async def load_default_servers_page() -> CachedBody:
+    """First page with no filters, as GET /servers and GET /landing serve it"""
+    return cached_body(await _load_servers_page())
+
+def _range_conditions(
+    max_price_cents: Optional[int],
+    min_ram_mb: Optional[int],
+    min_storage_gb: Optional[int],
+    min_players: Optional[int]
+) -> Dict[str, Dict[str, int]]:
+    """Mongo range conditions on the normalized numeric fields"""
+    ranges = {}
+    if max_price_cents is not None:
+        ranges["price_cents"] = {"$lte": max_price_cents}
+    if min_ram_mb is not None:
+        ranges["ram_mb"] = {"$gte": min_ram_mb}
+    if min_storage_gb is not None:
+        ranges["storage_gb"] = {"$gte": min_storage_gb}
+    if min_players is not None:
+        ranges["players_max"] = {"$gte": min_players}
+    return ranges
+
 @router.get("/servers", response_model=GameServerResponse)
-async def get_servers():
-    """Get all game servers"""
+async def get_servers(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    name_prefix: Optional[str] = Query(None, max_length=100),
+    sort: str = Query("name", pattern="^(name|price|ram)$"),
+    max_price_cents: Optional[int] = Query(None, ge=0),
+    min_ram_mb: Optional[int] = Query(None, ge=0),
+    min_storage_gb: Optional[int] = Query(None, ge=0),
+    min_players: Optional[int] = Query(None, ge=0)
+):
+    """Get game servers, one keyset-paginated page at a time"""
+    try:
+        after_key = _decode_cursor(after, sort) if after else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    ranges = _range_conditions(max_price_cents, min_ram_mb, min_storage_gb, min_players)
+    
     try:
-        servers_cursor = db.game_servers.find()
-        servers_list = await servers_cursor.to_list(1000)
-        servers = [GameServer(**server) for server in servers_list]
-        return GameServerResponse(servers=servers)
+        if (after_key is None and not status_filter and not name_prefix and not ranges
+                and sort == "name" and limit == DEFAULT_PAGE_SIZE):
+            # Unfiltered first page: the landing-page hot path
+            entry = await catalog_cache.get_or_load("game_servers", load_default_servers_page)
+        else:
+            # Not cached: a match still saves the transfer, not the query
+            entry = cached_body(await _load_servers_page(limit, after_key, status_filter, name_prefix, sort, ranges))
+        return conditional_response(request, entry)
     except Exception as e:
-        logger.error(f"Error fetching servers: {e}")
+        logger.error("Error fetching servers: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/servers", response_model=GameServer)
@@ -34,10 +148,12 @@ async def create_server(server_data: GameServerCreate):
     """Create a new game server"""
     try:
         server = GameServer(**server_data.dict())
-        await db.game_servers.insert_one(server.dict())
+        await db.game_servers.insert_one(with_search_fields(server.dict()))
+        Database.invalidate_dashboard_stats()
+        Database.invalidate_catalog("game_servers")
         return server
     except Exception as e:
-        logger.error(f"Error creating server: {e}")
+        logger.error("Error creating server: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.put("/servers/{server_id}/status", response_model=GameServer)
@@ -51,6 +167,8 @@ async def update_server_status(server_id: str, status_update: GameServerUpdate):
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Server not found")
+        Database.invalidate_dashboard_stats()
+        Database.invalidate_catalog("game_servers")
         
         # Return updated server
         server_doc = await db.game_servers.find_one({"id": server_id})
@@ -58,7 +176,44 @@ async def update_server_status(server_id: str, status_update: GameServerUpdate):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error updating server status: {e}")
+        logger.error("Error updating server status: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/servers/export")
+async def export_servers_ndjson(admin: User = Depends(get_admin_user)):
+    """Stream the whole catalog as NDJSON, in the format /servers/import reads"""
+    return StreamingResponse(
+        export_servers(db),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": 'attachment; filename="game_servers.ndjson"'}
+    )
+
+@router.post("/servers/import")
+async def import_servers_ndjson(
+    request: Request,
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=MAX_BATCH_SIZE),
+    admin: User = Depends(get_admin_user)
+):
+    """
+    Apply an NDJSON request body to the catalog.
+
+    The body is read and written batch by batch, so only one batch is held
+    in memory; the response lists every batch report and the summary.
+    Batches written before a failure stay applied.
+    """
+    batches = []
+    try:
+        async for report in import_servers(db, request.stream(), batch_size):
+            if report.get("inserted") or report.get("updated"):
+                Database.invalidate_dashboard_stats()
+                Database.invalidate_catalog("game_servers")
+            if report.get("summary"):
+                return {"batches": batches, "summary": report}
+            batches.append(report)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Error importing servers: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
@@ -70,25 +225,30 @@ class CreateServerRequest(PydanticBaseModel):
     friendly_name: str
     port_number: int = 25565
 
+async def _load_amp_instances() -> CachedBody:
+    amp = get_amp_client()
+    instances = amp.get_instances()
+    # Plain JSON from AMP: skip jsonable_encoder and let orjson walk it once
+    return cached_body(FastJSONResponse({
+        "success": True,
+        "message": f"Found {len(instances)} instances",
+        "instances": instances
+    }).body)
+
 @router.get("/amp/instances")
-async def get_amp_instances(current_user: User = Depends(get_current_user)):
+async def get_amp_instances(request: Request, current_user: User = Depends(get_current_user)):
     """Get list of all AMP instances/servers"""
     try:
-        amp = get_amp_client()
-        instances = amp.get_instances()
-        return {
-            "success": True,
-            "message": f"Found {len(instances)} instances",
-            "instances": instances
-        }
+        entry = await instances_cache.get_or_load("instances", _load_amp_instances)
+        return conditional_response(request, entry)
     except AMPAPIError as e:
-        logger.error(f"AMP API Error: {e}")
+        logger.error("AMP API Error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch instances: {str(e)}"
         )
     except Exception as e:
-        logger.error(f"Unexpected error fetching instances: {e}")
+        logger.error("Unexpected error fetching instances: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -103,19 +263,19 @@ async def get_amp_instance_status(
     try:
         amp = get_amp_client()
         status_data = amp.get_instance_status(instance_id)
-        return {
+        return FastJSONResponse({
             "success": True,
             "message": "Status retrieved successfully",
             "data": status_data
-        }
+        })
     except AMPAPIError as e:
-        logger.error(f"AMP API Error: {e}")
+        logger.error("AMP API Error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to get instance status: {str(e)}"
         )
     except Exception as e:
-        logger.error(f"Unexpected error: {e}")
+        logger.error("Unexpected error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -130,19 +290,20 @@ async def start_amp_instance(
     try:
         amp = get_amp_client()
         result = amp.start_instance(instance_id)
+        instances_cache.invalidate()
         return {
             "success": True,
             "message": "Instance start command sent",
             "data": result
         }
     except AMPAPIError as e:
-        logger.error(f"AMP API Error: {e}")
+        logger.error("AMP API Error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to start instance: {str(e)}"
         )
     except Exception as e:
-        logger.error(f"Unexpected error: {e}")
+        logger.error("Unexpected error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -157,19 +318,20 @@ async def stop_amp_instance(
     try:
         amp = get_amp_client()
         result = amp.stop_instance(instance_id)
+        instances_cache.invalidate()
         return {
             "success": True,
             "message": "Instance stop command sent",
             "data": result
         }
     except AMPAPIError as e:
-        logger.error(f"AMP API Error: {e}")
+        logger.error("AMP API Error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to stop instance: {str(e)}"
         )
     except Exception as e:
-        logger.error(f"Unexpected error: {e}")
+        logger.error("Unexpected error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -189,13 +351,14 @@ async def create_amp_instance(
             friendly_name=request.friendly_name,
             port_number=request.port_number
         )
+        instances_cache.invalidate()
         return {
             "success": True,
             "message": "Instance created successfully",
             "data": result
         }
     except AMPAPIError as e:
-        logger.error(f"AMP API Error: {e}")
+        logger.error("AMP API Error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create instance: {str(e)}"
@@ -210,13 +373,14 @@ async def delete_amp_instance(
     try:
         amp = get_amp_client()
         result = amp.delete_instance(instance_id)
+        instances_cache.invalidate()
         return {
             "success": True,
             "message": "Instance deleted successfully",
             "data": result
         }
     except AMPAPIError as e:
-        logger.error(f"AMP API Error: {e}")
+        logger.error("AMP API Error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to delete instance: {str(e)}"
@@ -0,0 +1,181 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from datetime import datetime
+from typing import Optional, Tuple
+import base64
+import json
+import logging
+
+from models import (
+    SupportRequest, SupportRequestListResponse, SupportRequestCounts, SupportRequestStatusUpdate,
+    SUPPORT_PRIORITIES, SUPPORT_STATUSES, SUPPORT_STATUS_TRANSITIONS, User
+)
+from database import db
+from serialization import projection, construct, construct_many
+from security import get_admin_user
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Support ticket triage (admin)
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# Keys of the (status, priority, created_at, id) index: a listing projecting only these is covered
+LISTING_KEY_FIELDS = {"_id": 0, "status": 1, "priority": 1, "created_at": 1, "id": 1}
+
+def _encode_cursor(created_at: datetime, ticket_id: str) -> str:
+    """Opaque keyset cursor pointing just past the ticket with this (created_at, id)"""
+    raw = json.dumps([created_at.isoformat(), ticket_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Return (created_at, id) from a cursor; raises ValueError when malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, ticket_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(ticket_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def _listing_query(
+    status_filter: Optional[str],
+    priority: Optional[str],
+    after: Optional[Tuple[datetime, str]]
+) -> dict:
+    """
+    Filter for one page of tickets, newest first.
+
+    Status and priority are always pinned to explicit value lists, so the
+    (status, priority, created_at, id) index serves every combination: the
+    planner merges one index range per (status, priority) pair instead of
+    sorting in memory. The cursor bounds created_at in the index, and the
+    tie-break on id is checked on index keys. With ``LISTING_KEY_FIELDS`` as
+    the projection the whole page selection is covered by the index.
+    """
+    query = {
+        "status": {"$in": [status_filter] if status_filter else list(SUPPORT_STATUSES)},
+        "priority": {"$in": [priority] if priority else list(SUPPORT_PRIORITIES)},
+    }
+    if after:
+        created_at, ticket_id = after
+        query["created_at"] = {"$lte": created_at}
+        query["$nor"] = [{"created_at": created_at, "id": {"$gte": ticket_id}}]
+    return query
+
+async def _load_tickets_page(
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: Optional[Tuple[datetime, str]] = None,
+    status_filter: Optional[str] = None,
+    priority: Optional[str] = None
+) -> SupportRequestListResponse:
+    """
+    One page of tickets in two steps: the page is picked from index keys
+    alone (covered, no document read), then only its tickets are loaded by
+    id through id_unique. A ticket deleted in between is left out.
+    """
+    query = _listing_query(status_filter, priority, after)
+    cursor = db.support_requests.find(query, LISTING_KEY_FIELDS).sort(
+        [("created_at", -1), ("id", -1)]
+    ).limit(limit + 1)
+    keys = await cursor.to_list(limit + 1)
+    page = keys[:limit]
+    docs = {}
+    if page:
+        found = db.support_requests.find({"id": {"$in": [key["id"] for key in page]}}, projection(SupportRequest))
+        docs = {doc["id"]: doc for doc in await found.to_list(len(page))}
+    tickets = construct_many(SupportRequest, [docs[key["id"]] for key in page if key["id"] in docs])
+    next_cursor = _encode_cursor(page[-1]["created_at"], page[-1]["id"]) if len(keys) > limit else None
+    return SupportRequestListResponse.model_construct(requests=tickets, next_cursor=next_cursor)
+
+async def count_tickets() -> SupportRequestCounts:
+    """
+    Ticket counts per status and priority in one aggregation.
+
+    Only status and priority are read, both from the triage index, so the
+    aggregation never fetches a document.
+    """
+    pipeline = [
+        {"$match": {"status": {"$in": list(SUPPORT_STATUSES)}, "priority": {"$in": list(SUPPORT_PRIORITIES)}}},
+        {"$group": {"_id": {"status": "$status", "priority": "$priority"}, "count": {"$sum": 1}}},
+    ]
+    groups = await db.support_requests.aggregate(pipeline).to_list(None)
+    by_priority = {status: {priority: 0 for priority in SUPPORT_PRIORITIES} for status in SUPPORT_STATUSES}
+    for group in groups:
+        by_priority[group["_id"]["status"]][group["_id"]["priority"]] = group["count"]
+    by_status = {status: sum(counts.values()) for status, counts in by_priority.items()}
+    return SupportRequestCounts(total=sum(by_status.values()), by_status=by_status, by_priority=by_priority)
+
+@router.get("/support/requests", response_model=SupportRequestListResponse)
+async def list_support_requests(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    status_filter: Optional[str] = Query(None, alias="status", pattern="^(open|in_progress|resolved)$"),
+    priority: Optional[str] = Query(None, pattern="^(low|medium|high)$"),
+    admin: User = Depends(get_admin_user)
+):
+    """List support tickets newest first, one keyset-paginated page at a time"""
+    try:
+        after_key = _decode_cursor(after) if after else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        return await _load_tickets_page(limit, after_key, status_filter, priority)
+    except Exception as e:
+        logger.error("Error listing support requests: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/support/requests/counts", response_model=SupportRequestCounts)
+async def get_support_request_counts(admin: User = Depends(get_admin_user)):
+    """Get ticket counts per status (and priority within each status)"""
+    try:
+        return await count_tickets()
+    except Exception as e:
+        logger.error("Error counting support requests: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/support/requests/{request_id}", response_model=SupportRequest)
+async def get_support_request(request_id: str, admin: User = Depends(get_admin_user)):
+    """Get one support ticket"""
+    try:
+        doc = await db.support_requests.find_one({"id": request_id}, projection(SupportRequest))
+    except Exception as e:
+        logger.error("Error fetching support request: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+    if not doc:
+        raise HTTPException(status_code=404, detail="Support request not found")
+    return construct(SupportRequest, doc)
+
+@router.put("/support/requests/{request_id}/status", response_model=SupportRequest)
+async def update_support_request_status(
+    request_id: str,
+    status_update: SupportRequestStatusUpdate,
+    admin: User = Depends(get_admin_user)
+):
+    """
+    Move a ticket to a new status.
+
+    The allowed previous statuses are part of the update filter, so two
+    admins racing on the same ticket cannot apply conflicting transitions;
+    the loser gets 409 with the ticket's current status.
+    """
+    new_status = status_update.status
+    try:
+        doc = await db.support_requests.find_one_and_update(
+            {"id": request_id, "status": {"$in": list(SUPPORT_STATUS_TRANSITIONS[new_status])}},
+            {"$set": {"status": new_status, "updated_at": datetime.utcnow()}},
+            projection=projection(SupportRequest),
+            return_document=True
+        )
+        if doc:
+            return construct(SupportRequest, doc)
+        current = await db.support_requests.find_one({"id": request_id}, {"_id": 0, "status": 1})
+    except Exception as e:
+        logger.error("Error updating support request status: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+    if not current:
+        raise HTTPException(status_code=404, detail="Support request not found")
+    raise HTTPException(
+        status_code=409,
+        detail=f"Cannot move a ticket from {current.get('status')} to {new_status}"
+    )
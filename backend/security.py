@@ -1,34 +1,32 @@
 import jwt
-import bcrypt
 import logging
+import time
 from datetime import datetime, timedelta
 import secrets
 import string
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from motor.motor_asyncio import AsyncIOMotorClient
 
-from config import JWT_SECRET, JWT_ALGORITHM, JWT_EXPIRATION_HOURS, MONGO_URL, DB_NAME
+from config import JWT_SECRET, JWT_ALGORITHM, JWT_EXPIRATION_HOURS
 from models import User
+from database import db, user_cache
+from metrics import registry
+from serialization import projection, construct
+from password_hashing import password_hasher
 
 # Logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Security Scheme
 security = HTTPBearer(auto_error=False)
 
-# Database Connection (shared for dependency injection if needed)
-client = AsyncIOMotorClient(MONGO_URL)
-db = client[DB_NAME]
+async def hash_password(password: str) -> str:
+    """Hash a password using bcrypt, off the event loop (may raise PasswordHashingBusy)"""
+    return await password_hasher.hash(password)
 
-def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-
-def verify_password(password: str, hashed: str) -> bool:
-    """Verify a password against its hash"""
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+async def verify_password(password: str, hashed: str) -> bool:
+    """Verify a password against its hash, off the event loop (may raise PasswordHashingBusy)"""
+    return await password_hasher.verify(password, hashed)
 
 def create_jwt_token(user_id: str, email: str) -> str:
     """Create a JWT token for user authentication"""
@@ -63,22 +61,38 @@ def send_verification_email(email: str, token: str):
     print("In production, this would send a real email.")
     return True
 
+async def _load_user(user_id: str):
+    user_doc = await db.users.find_one({"id": user_id}, projection(User))
+    return construct(User, user_doc) if user_doc else None
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Get current user from JWT token"""
+    """
+    Get current user from JWT token.
+
+    Users come from ``user_cache`` when fresh, skipping MongoDB and model
+    construction; the returned User is shared between requests and must not
+    be modified. Time spent here is recorded as ``auth_seconds``.
+    """
     if not credentials:
         return None
     
+    started = time.perf_counter()
     try:
         payload = jwt.decode(credentials.credentials, JWT_SECRET, algorithms=[JWT_ALGORITHM])
         user_id = payload.get("user_id")
         if not user_id:
             return None
         
-        # Get user from database
-        user_doc = await db.users.find_one({"id": user_id})
-        if not user_doc:
-            return None
-            
-        return User(**user_doc)
+        return await user_cache.get_or_load(user_id, lambda: _load_user(user_id))
     except jwt.PyJWTError:
         return None
+    finally:
+        registry.observe("auth_seconds", time.perf_counter() - started)
+
+async def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+    """Require an authenticated user with the admin flag"""
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Authentication required")
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
@@ -0,0 +1,323 @@
+"""
+Seed data and synthetic datasets.
+
+Seeding used to run inside app startup, where several workers counting and
+inserting at the same time could seed twice. It now runs once per deploy,
+after migrations, and is idempotent: every document is upserted with
+``$setOnInsert`` keyed on its natural key (game server and plan name,
+testimonial author and role). The ``id`` of a seeded document is derived
+from that key, so concurrent runs collide on the ``id_unique`` index
+instead of inserting duplicates, and existing documents are never
+modified. Each natural key is indexed (migration 9, ``name_id`` for game
+servers), so an upsert is an index lookup and bulk seeding stays linear.
+
+Usage:
+    python seed.py                          # migrations + fixtures
+    python seed.py --servers 100000         # plus synthetic servers for benchmarks
+    python seed.py --servers 100000 --plans 1000 --testimonials 5000 --batch-size 5000
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from catalog_fields import with_search_fields
+from models import GameServer, PricingPlan, Testimonial
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+DUPLICATE_KEY = 11000
+# Namespace for ids derived from natural keys (uuid5)
+SEED_NAMESPACE = uuid.UUID("6f0b3c52-8d1e-4a57-9c36-2f4e8b1d7a90")
+
+# collection -> fields identifying a document
+NATURAL_KEYS: Dict[str, Sequence[str]] = {
+    "game_servers": ("name",),
+    "pricing_plans": ("name",),
+    "testimonials": ("name", "role"),
+}
+
+SEED_SERVERS: List[Dict[str, Any]] = [
+    {
+        "name": "Minecraft Java",
+        "players": "2-100",
+        "price": "R$ 15,90",
+        "ram": "2GB",
+        "storage": "10GB SSD",
+        "status": "online",
+        "image": "https://assets.nintendo.com/image/upload/ar_16:9,c_lpad,w_600/v1/ncom/en_US/games/switch/m/minecraft-switch/hero",
+    },
+    {
+        "name": "Counter-Strike 2",
+        "players": "2-64",
+        "price": "R$ 24,90",
+        "ram": "4GB",
+        "storage": "15GB SSD",
+        "status": "online",
+        "image": "https://cdn.cloudflare.steamstatic.com/steam/apps/730/header.jpg",
+    },
+    {
+        "name": "Rust",
+        "players": "2-200",
+        "price": "R$ 39,90",
+        "ram": "8GB",
+        "storage": "25GB SSD",
+        "status": "online",
+        "image": "https://cdn.cloudflare.steamstatic.com/steam/apps/252490/header.jpg",
+    },
+    {
+        "name": "ARK Survival",
+        "players": "2-50",
+        "price": "R$ 29,90",
+        "ram": "6GB",
+        "storage": "20GB SSD",
+        "status": "maintenance",
+        "image": "https://cdn.cloudflare.steamstatic.com/steam/apps/346110/header.jpg",
+    },
+]
+
+SEED_PLANS: List[Dict[str, Any]] = [
+    {
+        "name": "Apprentice",
+        "price": "R$ 19,90",
+        "period": "/mês",
+        "description": "Perfeito para começar sua jornada",
+        "features": [
+            "2GB RAM",
+            "15GB SSD",
+            "Até 20 jogadores",
+            "Suporte básico",
+            "Backup diário"
+        ],
+        "popular": False,
+    },
+    {
+        "name": "Sorcerer",
+        "price": "R$ 39,90",
+        "period": "/mês",
+        "description": "Para comunidades em crescimento",
+        "features": [
+            "4GB RAM",
+            "30GB SSD",
+            "Até 50 jogadores",
+            "Suporte prioritário",
+            "Backup a cada 6h",
+            "DDoS Protection"
+        ],
+        "popular": True,
+    },
+    {
+        "name": "Archmage",
+        "price": "R$ 79,90",
+        "period": "/mês",
+        "description": "Máximo poder para grandes servidores",
+        "features": [
+            "8GB RAM",
+            "60GB SSD",
+            "Jogadores ilimitados",
+            "Suporte dedicado 24/7",
+            "Backup em tempo real",
+            "DDoS Protection Premium",
+            "CPU dedicado"
+        ],
+        "popular": False,
+    },
+]
+
+SEED_TESTIMONIALS: List[Dict[str, Any]] = [
+    {
+        "name": "Pedro Silva",
+        "role": "Admin do servidor MineCraft Brasil",
+        "content": "O Mystic Host transformou completamente nossa experiência. Performance impecável e suporte incrível!",
+        "avatar": "https://images.unsplash.com/photo-1472099645785-5658abf4ff4e?w=100&h=100&fit=crop&crop=face",
+        "rating": 5,
+        "approved": True,
+    },
+    {
+        "name": "Ana Costa",
+        "role": "Líder da guild Dragons",
+        "content": "Melhor investimento que fizemos. Nossos jogadores nunca mais reclamaram de lag ou instabilidade.",
+        "avatar": "https://images.unsplash.com/photo-1494790108755-2616b612b5c8?w=100&h=100&fit=crop&crop=face",
+        "rating": 5,
+        "approved": True,
+    },
+    {
+        "name": "João Santos",
+        "role": "Streamer e Gamer",
+        "content": "Interface super intuitiva e performance que impressiona. Recomendo para qualquer comunidade séria.",
+        "avatar": "https://images.unsplash.com/photo-1507003211169-0a1dd7228f2d?w=100&h=100&fit=crop&crop=face",
+        "rating": 5,
+        "approved": True,
+    },
+]
+
+# Model and storage transform per collection
+_BUILDERS = {
+    "game_servers": lambda data: with_search_fields(GameServer(**data).model_dump()),
+    "pricing_plans": lambda data: with_search_fields(PricingPlan(**data).model_dump()),
+    "testimonials": lambda data: Testimonial(**data).model_dump(),
+}
+
+
+def natural_id(collection: str, doc: Dict[str, Any]) -> str:
+    """Deterministic id for a document, derived from its natural key"""
+    key = "\x1f".join(str(doc[field]) for field in NATURAL_KEYS[collection])
+    return str(uuid.uuid5(SEED_NAMESPACE, f"{collection}:{key}"))
+
+
+def upsert_operations(collection: str, docs: Iterable[Dict[str, Any]]) -> List[UpdateOne]:
+    """Insert-if-absent operations keyed on the collection's natural key"""
+    build = _BUILDERS[collection]
+    operations = []
+    for data in docs:
+        doc = build({**data, "id": natural_id(collection, data)})
+        key = {field: doc[field] for field in NATURAL_KEYS[collection]}
+        operations.append(UpdateOne(key, {"$setOnInsert": doc}, upsert=True))
+    return operations
+
+
+def _batches(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def upsert_documents(db, collection: str, docs: Iterable[Dict[str, Any]],
+                           batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Upsert docs in unordered bulk_write batches; returns how many were inserted"""
+    inserted = 0
+    for batch in _batches(docs, batch_size):
+        started = time.perf_counter()
+        try:
+            result = await db[collection].bulk_write(upsert_operations(collection, batch), ordered=False)
+            batch_inserted = result.upserted_count
+        except BulkWriteError as e:
+            # Another seeder inserted the same natural key first; anything else is a real error
+            if any(error["code"] != DUPLICATE_KEY for error in e.details["writeErrors"]):
+                raise
+            batch_inserted = e.details["nUpserted"]
+        inserted += batch_inserted
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "%s: upserted batch of %s (%s new) in %.3fs, %.0f docs/s",
+            collection, len(batch), batch_inserted, elapsed, len(batch) / max(elapsed, 1e-9)
+        )
+    return inserted
+
+
+async def seed_fixtures(db, batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, int]:
+    """Insert the fixture catalog where missing; returns new documents per collection"""
+    return {
+        "game_servers": await upsert_documents(db, "game_servers", SEED_SERVERS, batch_size),
+        "pricing_plans": await upsert_documents(db, "pricing_plans", SEED_PLANS, batch_size),
+        "testimonials": await upsert_documents(db, "testimonials", SEED_TESTIMONIALS, batch_size),
+    }
+
+
+_GAMES = ["Minecraft", "Terraria", "Rust", "Valheim", "ARK", "Palworld", "Satisfactory", "Factorio",
+          "Project Zomboid", "Counter-Strike 2", "Garry's Mod", "7 Days to Die", "Enshrouded", "V Rising"]
+_EDITIONS = ["Java", "Bedrock", "Modded", "Vanilla", "Hardcore", "PvE", "PvP", "Survival", "Creative"]
+
+
+def synthetic_servers(count: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """Deterministic fake catalog entries, named so they never clash with fixtures"""
+    rng = random.Random(seed)
+    for i in range(count):
+        ram = rng.choice([1, 2, 4, 8, 16])
+        yield {
+            "name": f"{rng.choice(_GAMES)} {rng.choice(_EDITIONS)} #{i:07d}",
+            "players": f"2-{rng.choice([10, 32, 64, 100, 200])}",
+            "price": f"R$ {rng.randint(9, 99)},90",
+            "ram": f"{ram}GB",
+            "storage": f"{ram * rng.choice([5, 10])}GB SSD",
+            "status": rng.choice(["online", "online", "online", "maintenance"]),
+            "image": "https://example.com/synthetic.jpg",
+        }
+
+
+def synthetic_plans(count: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed)
+    for i in range(count):
+        ram = rng.choice([2, 4, 8, 16])
+        yield {
+            "name": f"Plano {rng.choice(_EDITIONS)} #{i:07d}",
+            "price": f"R$ {rng.randint(9, 199)},90",
+            "description": f"Ideal para servidores {rng.choice(_GAMES)}",
+            "features": [f"{ram}GB RAM", f"{ram * 8}GB SSD", "Backup diário"],
+            "popular": rng.random() < 0.1,
+        }
+
+
+def synthetic_testimonials(count: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    for i in range(count):
+        yield {
+            "name": f"Cliente #{i:07d}",
+            "role": f"Admin do servidor {rng.choice(_GAMES)}",
+            "content": "Servidor estável e suporte rápido.",
+            "avatar": "https://example.com/avatar.png",
+            "rating": rng.randint(3, 5),
+            "approved": rng.random() < 0.8,
+            "created_at": now - timedelta(minutes=i),
+        }
+
+
+async def seed_synthetic(db, servers: int = 0, plans: int = 0, testimonials: int = 0,
+                         batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, int]:
+    """Generate and upsert synthetic documents; reruns with the same counts are no-ops"""
+    return {
+        "game_servers": await upsert_documents(db, "game_servers", synthetic_servers(servers), batch_size),
+        "pricing_plans": await upsert_documents(db, "pricing_plans", synthetic_plans(plans), batch_size),
+        "testimonials": await upsert_documents(db, "testimonials", synthetic_testimonials(testimonials), batch_size),
+    }
+
+
+async def _main(args):
+    from database import mongo
+    from migrations import run_migrations
+    from feeds import rebuild_testimonials_feed
+
+    db = mongo.connect()
+    try:
+        # Seeding relies on the id_unique indexes
+        await run_migrations(db)
+        started = time.perf_counter()
+        inserted = await seed_fixtures(db, args.batch_size)
+        if args.servers or args.plans or args.testimonials:
+            synthetic = await seed_synthetic(db, args.servers, args.plans, args.testimonials, args.batch_size)
+            inserted = {name: inserted[name] + synthetic[name] for name in inserted}
+        if inserted["testimonials"]:
+            # Seeded testimonials are published without going through moderation
+            await rebuild_testimonials_feed(db)
+        elapsed = time.perf_counter() - started
+        for collection, count in inserted.items():
+            print(f"{collection:<15} {count:>9} inserted")
+        print(f"Done in {elapsed:.2f}s")
+    finally:
+        mongo.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed fixtures and synthetic data")
+    parser.add_argument("--servers", type=int, default=0, help="synthetic game servers to generate")
+    parser.add_argument("--plans", type=int, default=0, help="synthetic pricing plans to generate")
+    parser.add_argument("--testimonials", type=int, default=0, help="synthetic testimonials to generate")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="documents per bulk_write")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(args))
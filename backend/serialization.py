@@ -0,0 +1,88 @@
+"""
+Fast path from trusted MongoDB documents to JSON bytes.
+
+Documents in our collections were validated by the models on the way in,
+so read routes skip revalidating them on the way out: they ask Mongo for
+only the fields a model declares (no ``_id``), build models without
+running validators and serialize the response model straight to bytes
+with pydantic-core, without an intermediate ``str`` or dict.
+
+Only use this for documents this app wrote. Anything coming from a client
+or an external API still goes through normal validation.
+
+``FastJSONResponse`` is the app-wide default response class: it renders
+with orjson, which encodes datetimes, UUIDs and dataclasses natively.
+"""
+
+from typing import Any, Dict, Iterable, KeysView, List, Type, TypeVar
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the stdlib encoder is always available
+    orjson = None
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+_projections: Dict[type, Dict[str, int]] = {}
+
+
+def _field_names(model: Type[BaseModel]) -> KeysView[str]:
+    return model.model_fields.keys()
+
+
+def projection(model: Type[BaseModel]) -> Dict[str, int]:
+    """Mongo projection returning exactly the model's fields"""
+    fields = _projections.get(model)
+    if fields is None:
+        fields = _projections[model] = {"_id": 0, **{name: 1 for name in model.model_fields}}
+    return fields
+
+
+def construct(model: Type[ModelT], doc: Dict[str, Any]) -> ModelT:
+    """
+    Build a model from a trusted document without validation.
+
+    A document holding exactly the model's fields (what ``projection()``
+    returns) becomes the instance ``__dict__`` as is, so the caller hands
+    over ownership of ``doc``. Anything else - missing fields that need
+    defaults, extra fields - goes through ``model_construct()``, which is
+    correct but slower than full validation for small models.
+    """
+    if doc.keys() != _field_names(model):
+        return model.model_construct(**doc)
+    instance = model.__new__(model)
+    _set = object.__setattr__
+    _set(instance, "__dict__", doc)
+    _set(instance, "__pydantic_fields_set__", set(doc))
+    _set(instance, "__pydantic_extra__", None)
+    _set(instance, "__pydantic_private__", None)
+    return instance
+
+
+def construct_many(model: Type[ModelT], docs: Iterable[Dict[str, Any]]) -> List[ModelT]:
+    """Build models from trusted documents without validation"""
+    return [construct(model, doc) for doc in docs]
+
+
+def to_json_bytes(instance: BaseModel) -> bytes:
+    """Serialize a model directly to JSON bytes"""
+    return instance.__pydantic_serializer__.to_json(instance)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson.
+
+    Output matches ``JSONResponse(jsonable_encoder(content))`` for the
+    types our routes return. Routes without a ``response_model`` can return
+    one directly to also skip FastAPI's ``jsonable_encoder`` pass.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(jsonable_encoder(content))
+        return orjson.dumps(content, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS)
@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+import time
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
@@ -5,22 +7,81 @@ from pathlib import Path
 import os
 import logging
 
-from database import Database, client
-from routers import auth, servers, general
-
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+from database import mongo, db, support_requests_buffer
+from metrics import registry
+from routers import auth, servers, general, metrics, search, landing, support
+from compression import CompressionMiddleware
+from migrations import run_migrations
+from mongo_monitoring import scan_detector
+from invalidation import invalidation_bus
+from password_hashing import password_hasher
+from rate_limit import DEFAULT_RULES, MongoBackend, RateLimitMiddleware, apply_overrides, parse_rate_limits, rate_limiter
+from serialization import FastJSONResponse
+from logging_config import setup_logging, parse_sample_rates, RequestContextMiddleware
+from config import (
+    COMPRESSION_ALGORITHMS, COMPRESSION_MINIMUM_SIZE,
+    COMPRESSION_GZIP_LEVEL, COMPRESSION_BROTLI_QUALITY,
+    LOG_LEVEL, LOG_FORMAT, LOG_SAMPLE_RATES,
+    RUN_MIGRATIONS_ON_STARTUP, MONGO_DETECT_COLLSCANS, CACHE_INVALIDATION_BUS,
+    RATE_LIMITING, RATE_LIMIT_BACKEND, RATE_LIMITS, RATE_LIMIT_TRUSTED_PROXIES
 )
+
+# Setup logging (once per process, before anything logs)
+setup_logging(level=LOG_LEVEL, json_output=LOG_FORMAT == "json", sample_rates=parse_sample_rates(LOG_SAMPLE_RATES))
 logger = logging.getLogger(__name__)
 
 # Load Environment
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Own the shared MongoDB client for the lifetime of the app.
+
+    Seeding lives in seed.py and migrations in migrations.py, both run once
+    per deploy; creating the client does not contact the server.
+    """
+    started = time.perf_counter()
+    database = mongo.connect()
+    if CACHE_INVALIDATION_BUS:
+        # Runs in the background: startup still does not wait for the server
+        invalidation_bus.start(database)
+    if MONGO_DETECT_COLLSCANS:
+        scan_detector.start(mongo.client)
+    support_requests_buffer.start()
+    if RUN_MIGRATIONS_ON_STARTUP:
+        applied = await run_migrations(db)
+        if applied:
+            logger.info("Applied database migrations %s", applied)
+    startup_seconds = time.perf_counter() - started
+    registry.set_gauge("app_startup_seconds", startup_seconds)
+    logger.info("Startup complete in %.3fs", startup_seconds)
+    yield
+    # Before the client closes: queued support requests must reach the database
+    await support_requests_buffer.stop()
+    await invalidation_bus.stop()
+    await scan_detector.stop()
+    password_hasher.shutdown()
+    mongo.close()
+    logger.info("Database connection closed")
+
 # Create the main app
-app = FastAPI(title="Mystic Host API", description="Game hosting management API")
+# orjson-rendered responses for every route that doesn't return its own Response
+app = FastAPI(
+    title="Mystic Host API",
+    description="Game hosting management API",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
+
+# Rate limiting (innermost, so 429s still get CORS headers and an access log line)
+rate_limiter.enabled = RATE_LIMITING
+rate_limiter.trusted_proxies = RATE_LIMIT_TRUSTED_PROXIES
+rate_limiter.configure(apply_overrides(DEFAULT_RULES, parse_rate_limits(RATE_LIMITS)))
+if RATE_LIMIT_BACKEND == "mongo":
+    rate_limiter.backend = MongoBackend(db)
+app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
 
 # CORS middleware
 # Security Note: In production, configure this to your specific frontend domain found in config.py
@@ -32,21 +93,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize database on startup
-@app.on_event("startup")
-async def startup_event():
-    await Database.initialize_data()
-    logger.info("Database initialized with sample data")
+# Request IDs and access log
+app.add_middleware(RequestContextMiddleware)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
-    logger.info("Database connection closed")
+# Response compression (outermost, so every router's payload goes through it)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=COMPRESSION_MINIMUM_SIZE,
+    algorithms=COMPRESSION_ALGORITHMS,
+    gzip_level=COMPRESSION_GZIP_LEVEL,
+    brotli_quality=COMPRESSION_BROTLI_QUALITY,
+)
 
 # Include Routers
 app.include_router(auth.router, prefix="/api")
 app.include_router(servers.router, prefix="/api")
 app.include_router(general.router, prefix="/api")
+app.include_router(metrics.router, prefix="/api")
+app.include_router(search.router, prefix="/api")
+app.include_router(landing.router, prefix="/api")
+app.include_router(support.router, prefix="/api")
 
 @app.get("/")
 async def root():
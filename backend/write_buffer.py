@@ -0,0 +1,212 @@
+"""
+Write-behind buffering for insert-only collections.
+
+``WriteBehindBuffer`` accepts documents synchronously and inserts them in
+the background with one ``insert_many`` per batch: as soon as ``batch_size``
+documents are waiting, or ``flush_interval_ms`` after the last flush. A
+spike of submissions then costs a few pooled connections instead of one
+per request, leaving the pool to interactive traffic.
+
+The queue is bounded: ``submit`` raises ``BufferFull`` once ``max_pending``
+documents are waiting, which routes turn into a 503. Documents carry their
+own unique ``id`` (the collections have an ``id_unique`` index), so a batch
+that failed part way through is retried as a whole and the duplicates of
+the inserts that did succeed are ignored. ``stop()`` flushes whatever is
+left before the app shuts down.
+
+Only transient errors (connection loss, timeouts, retryable write errors)
+put the whole batch back; the queue bound covers an outage. Documents
+MongoDB refuses are named by the error (``writeErrors[].index``), or found
+by writing the batch one document at a time when the error doesn't say.
+Those are retried up to ``max_attempts`` times and then dropped with an
+error log, so one bad document can't hold up everything queued behind it.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from pymongo.errors import BulkWriteError, ConnectionFailure, ExecutionTimeout, PyMongoError, WTimeoutError
+
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY = 11000
+# Attempts at draining the queue on shutdown before giving up
+SHUTDOWN_FLUSH_ATTEMPTS = 3
+# Network errors (AutoReconnect, NetworkTimeout, ServerSelectionTimeoutError) and timeouts
+TRANSIENT_ERRORS = (ConnectionFailure, ExecutionTimeout, WTimeoutError)
+
+
+class BufferFull(Exception):
+    """Raised by submit() when the buffer holds max_pending documents"""
+
+
+def is_transient(error: Exception) -> bool:
+    """Whether retrying the same write later may succeed"""
+    if isinstance(error, BulkWriteError):
+        # Inserted but not acknowledged; a retry only hits duplicates
+        return bool(error.details.get("writeConcernErrors")) and not error.details.get("writeErrors")
+    if isinstance(error, TRANSIENT_ERRORS):
+        return True
+    return isinstance(error, PyMongoError) and error.has_error_label("RetryableWriteError")
+
+
+class WriteBehindBuffer:
+    """
+    Bounded queue of documents inserted in batches by a background task.
+
+    Args:
+        database: Motor database (or the ``db`` proxy) to write to
+        collection: Collection the documents are inserted into
+        batch_size: Flush as soon as this many documents are waiting
+        flush_interval_ms: Flush at least this often while documents wait
+        max_pending: Documents queued before submit() raises BufferFull
+        max_attempts: Refused inserts of one document before it is dropped
+    """
+
+    def __init__(self, database, collection: str, batch_size: int = 100,
+                 flush_interval_ms: float = 200, max_pending: int = 10000, max_attempts: int = 3):
+        self.database = database
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self._pending: Deque[Dict[str, Any]] = deque()
+        # Refused inserts so far, by document id
+        self._attempts: Dict[Any, int] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._closing
+
+    def submit(self, doc: Dict[str, Any]):
+        """Queue a document for insertion; raises BufferFull when the queue is full"""
+        if self._closing or len(self._pending) >= self.max_pending:
+            registry.inc("write_buffer_rejected_total", collection=self.collection)
+            raise BufferFull(f"{self.collection} write buffer is full")
+        self._pending.append(doc)
+        registry.set_gauge("write_buffer_pending", len(self._pending), collection=self.collection)
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def start(self):
+        """Start the background flusher on the running event loop"""
+        if self._task is None:
+            self._closing = False
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop accepting documents and flush everything still queued"""
+        if self._task is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+        for _ in range(SHUTDOWN_FLUSH_ATTEMPTS):
+            if not self._pending:
+                return
+            await self.flush()
+        if self._pending:
+            logger.error(
+                "Dropping %s unwritten %s documents on shutdown: %s",
+                len(self._pending), self.collection, [doc.get("id") for doc in self._pending]
+            )
+
+    async def flush(self):
+        """Insert queued documents batch by batch"""
+        while self._pending:
+            count = min(self.batch_size, len(self._pending))
+            batch: List[Dict[str, Any]] = [self._pending.popleft() for _ in range(count)]
+            started = time.perf_counter()
+            try:
+                refused = await self._write(batch)
+            except Exception as e:
+                self._requeue(batch, e)
+                return
+            finally:
+                registry.set_gauge("write_buffer_pending", len(self._pending), collection=self.collection)
+            if self._attempts:
+                refused_ids = {doc.get("id") for doc, _ in refused}
+                for doc in batch:
+                    if doc.get("id") not in refused_ids:
+                        self._attempts.pop(doc.get("id"), None)
+            registry.inc("write_buffer_flushed_total", len(batch) - len(refused), collection=self.collection)
+            registry.observe(
+                "write_buffer_flush_seconds", time.perf_counter() - started, collection=self.collection
+            )
+            if refused:
+                self._refused(refused)
+                # Refused documents wait for the next flush instead of being retried at once
+                return
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], str]]:
+        """Insert a batch; returns the documents refused and why, raises on transient errors"""
+        try:
+            await self.database[self.collection].insert_many(batch, ordered=False)
+            return []
+        except BulkWriteError as e:
+            if is_transient(e):
+                raise
+            # Retried batch: the documents that did get in before are the duplicates
+            return [
+                (batch[error["index"]], error.get("errmsg", f"code {error['code']}"))
+                for error in e.details.get("writeErrors", []) if error["code"] != DUPLICATE_KEY
+            ]
+        except Exception as e:
+            if is_transient(e):
+                raise
+            if len(batch) == 1:
+                return [(batch[0], str(e))]
+        # The error doesn't say which document it is about (e.g. DocumentTooLarge)
+        refused = []
+        for doc in batch:
+            refused += await self._write([doc])
+        return refused
+
+    def _requeue(self, batch: List[Dict[str, Any]], error: Exception):
+        logger.error("Error flushing %s %s documents, will retry: %s", len(batch), self.collection, error)
+        registry.inc("write_buffer_flush_errors_total", collection=self.collection)
+        # Back at the front, in order; may briefly exceed max_pending
+        self._pending.extendleft(reversed(batch))
+
+    def _refused(self, refused: List[Tuple[Dict[str, Any], str]]):
+        """Count an attempt for each refused document; requeue it or drop it for good"""
+        registry.inc("write_buffer_flush_errors_total", collection=self.collection)
+        retry = []
+        for doc, reason in refused:
+            attempts = self._attempts.get(doc.get("id"), 0) + 1
+            if attempts < self.max_attempts:
+                self._attempts[doc.get("id")] = attempts
+                retry.append(doc)
+                continue
+            self._attempts.pop(doc.get("id"), None)
+            registry.inc("write_buffer_dropped_total", collection=self.collection)
+            logger.error(
+                "Dropping %s document %s after %s refused inserts: %s",
+                self.collection, doc.get("id"), attempts, reason,
+                extra={"collection": self.collection, "document_id": doc.get("id")},
+            )
+        self._pending.extendleft(reversed(retry))
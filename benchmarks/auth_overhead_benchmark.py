@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Auth Overhead Benchmark
+Measures what get_current_user costs per authenticated request: JWT
+decode plus the user lookup, with the user cache cold (a MongoDB round
+trip and model construction every time, as before the cache) and warm.
+
+Scenarios:
+  1. JWT decode only
+  2. get_current_user, cache invalidated before every call
+  3. get_current_user, cache hit
+
+Usage:
+    python benchmarks/auth_overhead_benchmark.py --users 100000
+"""
+
+import argparse
+import asyncio
+
+import jwt
+from fastapi.security import HTTPAuthorizationCredentials
+
+from common import get_database, measure, measure_sync, print_header, print_result, summarize
+
+from config import JWT_ALGORITHM, JWT_SECRET
+from database import user_cache
+from migrations import run_migrations
+from models import User
+import security
+
+BATCH_SIZE = 10_000
+
+
+async def populate(db, users):
+    for start in range(0, users, BATCH_SIZE):
+        await db.users.insert_many([
+            User(id=f"user-{i}", name=f"User {i}", email=f"user{i}@example.com").model_dump()
+            for i in range(start, min(start + BATCH_SIZE, users))
+        ], ordered=False)
+
+
+async def main(users, iterations):
+    client, db = get_database()
+    security.db = db
+    try:
+        print_header("AUTH OVERHEAD BENCHMARK")
+        await populate(db, users)
+        await run_migrations(db)
+        print(f"{users:,} users\n")
+
+        token = security.create_jwt_token(f"user-{users // 2}", f"user{users // 2}@example.com")
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+        decode = summarize(measure_sync(lambda: jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM]), iterations))
+        print_result("  jwt decode only", decode)
+
+        async def cold():
+            user_cache.invalidate()
+            return await security.get_current_user(credentials)
+
+        print_result("  get_current_user, cache cold", summarize(await measure(cold, iterations)))
+        await security.get_current_user(credentials)
+        print_result(
+            "  get_current_user, cache hit",
+            summarize(await measure(lambda: security.get_current_user(credentials), iterations))
+        )
+        print("=" * 70)
+    finally:
+        await client.drop_database(db.name)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000, help="users in the collection")
+    parser.add_argument("--iterations", type=int, default=2000, help="calls per scenario")
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.iterations))
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Cold Start Benchmark
+Time from launching a uvicorn worker to its first successful response.
+
+Each run starts `uvicorn server:app` on a free port, polls GET /api/ until
+it answers 200 and stops the process. Startup does no data work (seeding is
+seed.py, migrations are migrations.py), so MongoDB does not need to be up.
+The app's own measurement of the lifespan step is exported as the
+app_startup_seconds gauge on /api/metrics (admin only) and printed for the
+last run when an admin's token is given.
+
+Usage:
+    python benchmarks/cold_start_benchmark.py --runs 10
+    python benchmarks/cold_start_benchmark.py --runs 10 --token <admin JWT>
+    RUN_MIGRATIONS_ON_STARTUP=true python benchmarks/cold_start_benchmark.py   # old behaviour, needs Mongo
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+from common import print_header, print_result, summarize
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get(url, timeout=0.5, token=None):
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=timeout) as response:
+        return response.status, response.read()
+
+
+def cold_start(timeout, token=None):
+    """Seconds until the first 200, plus the app_startup_seconds gauge it reported"""
+    port = free_port()
+    base = f"http://127.0.0.1:{port}/api"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            if time.perf_counter() - started > timeout:
+                raise TimeoutError(f"no response within {timeout}s")
+            try:
+                status, _ = get(base + "/")
+                if status == 200:
+                    elapsed = time.perf_counter() - started
+                    break
+            except OSError:
+                time.sleep(0.005)
+        if not token:
+            return elapsed, None
+        # Looking the admin up needs MongoDB
+        _, body = get(base + "/metrics", timeout=5, token=token)
+        gauges = json.loads(body).get("gauges", {}).get("app_startup_seconds", [])
+        lifespan = gauges[0]["value"] if gauges else None
+        return elapsed, lifespan
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def main(runs, timeout, token):
+    print_header("COLD START BENCHMARK")
+    samples = []
+    lifespan = None
+    for _ in range(runs):
+        elapsed, lifespan = cold_start(timeout, token)
+        samples.append(elapsed * 1000)
+    print_result("process start -> first 200", summarize(samples))
+    if lifespan is not None:
+        print(f"{'lifespan startup (last run)':38} | {lifespan * 1000:8.3f}ms")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="cold starts to time")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for each start")
+    parser.add_argument("--token", help="admin JWT, to read app_startup_seconds from /api/metrics")
+    args = parser.parse_args()
+    main(args.runs, args.timeout, args.token)
@@ -0,0 +1,75 @@
+"""
+Shared helpers for the backend benchmarks.
+
+Benchmarks talk to a real MongoDB server given by BENCH_MONGO_URL (falls back
+to MONGO_URL) and use their own database, BENCH_DB_NAME, which they drop when
+done. Never point them at a production database.
+"""
+
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+BENCH_MONGO_URL = os.environ.get("BENCH_MONGO_URL", os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+BENCH_DB_NAME = os.environ.get("BENCH_DB_NAME", "mystic_benchmark")
+
+
+def get_database():
+    """Return (client, db) for the benchmark database."""
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(BENCH_MONGO_URL)
+    return client, client[BENCH_DB_NAME]
+
+
+def summarize(samples_ms):
+    """Latency summary in milliseconds."""
+    ordered = sorted(samples_ms)
+
+    def percentile(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {
+        "avg_ms": round(statistics.mean(ordered), 3),
+        "p50_ms": round(percentile(0.50), 3),
+        "p95_ms": round(percentile(0.95), 3),
+        "p99_ms": round(percentile(0.99), 3),
+        "max_ms": round(ordered[-1], 3),
+        "iterations": len(ordered),
+    }
+
+
+async def measure(coro_factory, iterations):
+    """Await coro_factory() `iterations` times and return per-call latencies in ms."""
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await coro_factory()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def measure_sync(func, iterations):
+    """Call func() `iterations` times and return per-call latencies in ms."""
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def print_header(title):
+    print("=" * 70)
+    print(title)
+    print("=" * 70)
+
+
+def print_result(label, stats):
+    print(
+        f"{label:38} | avg {stats['avg_ms']:8.3f}ms | p50 {stats['p50_ms']:8.3f}ms"
+        f" | p99 {stats['p99_ms']:8.3f}ms"
+    )
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+JSON Encoding Benchmark
+Encode throughput of the response classes for the two largest payloads:
+the AMP instance list and the game server catalog.
+
+Paths compared:
+  stock      what FastAPI does by default: jsonable_encoder() for routes
+             without a response_model, then JSONResponse (stdlib json)
+  orjson     FastJSONResponse (serialization.py), the app default, which
+             AMP routes return directly so jsonable_encoder is skipped
+
+For the catalog, both paths start from the response model serialized the
+way FastAPI does it for a response_model route (model_dump(mode="json")),
+so the stock path there is the stdlib json render alone.
+
+Usage:
+    python benchmarks/json_encoding_benchmark.py --instances 500 --servers 1000
+"""
+
+import argparse
+import random
+from datetime import datetime
+
+from common import measure_sync, print_header, summarize
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from models import GameServer, GameServerResponse
+from serialization import FastJSONResponse
+
+
+def amp_instance(i):
+    """Roughly the shape ADSModule/GetInstances returns per instance"""
+    return {
+        "InstanceID": f"{i:08x}-0000-4000-8000-000000000000",
+        "TargetID": "00000000-0000-4000-8000-000000000001",
+        "InstanceName": f"Minecraft{i:04d}",
+        "FriendlyName": f"Minecraft Survival {i}",
+        "Module": "Minecraft",
+        "Running": random.random() > 0.3,
+        "AppState": random.choice([0, 10, 20, 30]),
+        "Port": 8080 + i,
+        "Metrics": {
+            "CPU Usage": {"RawValue": random.randint(0, 100), "MaxValue": 100, "Units": "%"},
+            "Memory Usage": {"RawValue": random.randint(256, 8192), "MaxValue": 8192, "Units": "MB"},
+            "Active Users": {"RawValue": random.randint(0, 20), "MaxValue": 20, "Units": ""},
+        },
+        "ApplicationEndpoints": [{"DisplayName": "Minecraft Server", "Endpoint": f"0.0.0.0:{25565 + i}"}],
+        "Tags": ["survival", "vanilla"],
+    }
+
+
+def catalog(servers):
+    return GameServerResponse(servers=[
+        GameServer(
+            name=f"Minecraft Java #{i}", players="2-100", price="R$ 15,90", ram="2GB",
+            storage="10GB SSD", image="https://example.com/minecraft.jpg", created_at=datetime.utcnow()
+        )
+        for i in range(servers)
+    ]).model_dump(mode="json")
+
+
+def report(label, payload, iterations, response_model_route=False):
+    size = len(FastJSONResponse(payload).body)
+    print(f"\n{label}: {size / 1024:.1f} KB")
+    if response_model_route:
+        stock = ("stock (json)", lambda: JSONResponse(payload))
+    else:
+        stock = ("stock (jsonable_encoder + json)", lambda: JSONResponse(jsonable_encoder(payload)))
+    for name, render in (stock, ("orjson (FastJSONResponse)", lambda: FastJSONResponse(payload))):
+        stats = summarize(measure_sync(render, iterations))
+        mb_per_s = size / 1e6 / (stats["p50_ms"] / 1000)
+        print(f"  {name:32} | p50 {stats['p50_ms']:8.3f}ms | p99 {stats['p99_ms']:8.3f}ms | {mb_per_s:8.1f} MB/s")
+
+
+def main(instances, servers, iterations):
+    print_header("JSON ENCODING BENCHMARK")
+    instance_list = {
+        "success": True,
+        "message": f"Found {instances} instances",
+        "instances": [amp_instance(i) for i in range(instances)],
+    }
+    report(f"AMP instance list ({instances} instances)", instance_list, iterations)
+    report(f"Game server catalog ({servers} servers)", catalog(servers), iterations, response_model_route=True)
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--instances", type=int, default=500, help="AMP instances in the list payload")
+    parser.add_argument("--servers", type=int, default=1_000, help="servers in the catalog payload")
+    parser.add_argument("--iterations", type=int, default=200, help="encodes per path")
+    args = parser.parse_args()
+    main(args.instances, args.servers, args.iterations)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Login Storm Benchmark
+Measures the latency of unrelated requests (GET /api and the cached
+GET /api/pricing-plans) while many clients log in at once, with bcrypt run
+inline on the event loop (the old behaviour) and on the password hashing
+pool.
+
+Scenarios:
+  1. Idle: probes only
+  2. Login storm, bcrypt inline
+  3. Login storm, bcrypt on the pool (rejections beyond its queue are 503s)
+
+The app runs in-process (httpx ASGI transport); rate limiting is disabled
+so the storm reaches bcrypt.
+
+Usage:
+    python benchmarks/login_storm_benchmark.py --concurrency 20 --seconds 5
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+import bcrypt
+import httpx
+
+from common import get_database, print_header, print_result, summarize
+
+from models import User
+from password_hashing import password_hasher
+from rate_limit import rate_limiter
+import routers.auth as auth
+import routers.general as general
+from server import app
+
+EMAIL = "storm@example.com"
+PASSWORD = "correct horse battery staple"
+PROBE_INTERVAL = 0.01
+
+
+async def inline_verify_password(password, hashed):
+    """What verify_password did before: bcrypt on the event loop"""
+    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+
+async def storm(client, stop, statuses):
+    while not stop.is_set():
+        response = await client.post("/api/auth/login", json={"email": EMAIL, "password": PASSWORD})
+        statuses[response.status_code] += 1
+
+
+async def probe(client, path, stop, samples):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get(path)
+        samples.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(PROBE_INTERVAL)
+
+
+async def run_scenario(client, concurrency, seconds):
+    stop = asyncio.Event()
+    statuses = Counter()
+    samples = {"/api": [], "/api/pricing-plans": []}
+    tasks = [asyncio.create_task(storm(client, stop, statuses)) for _ in range(concurrency)]
+    tasks += [asyncio.create_task(probe(client, path, stop, samples[path])) for path in samples]
+    await asyncio.sleep(seconds)
+    stop.set()
+    await asyncio.gather(*tasks)
+    return samples, statuses
+
+
+async def main(concurrency, seconds):
+    client_db, db = get_database()
+    auth.db = db
+    general.db = db
+    rate_limiter.enabled = False
+    user = User(name="Storm", email=EMAIL, password_hash=await password_hasher.hash(PASSWORD))
+    await db.users.insert_one(user.model_dump())
+
+    verify_password = auth.verify_password
+    scenarios = [
+        ("idle", 0, verify_password),
+        (f"storm x{concurrency}, bcrypt inline", concurrency, inline_verify_password),
+        (f"storm x{concurrency}, bcrypt pool", concurrency, verify_password),
+    ]
+    transport = httpx.ASGITransport(app=app)
+    try:
+        print_header("LOGIN STORM BENCHMARK")
+        print(f"pool: {password_hasher.max_workers} threads, queue {password_hasher.max_queue}\n")
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            # Warm the pricing plans cache
+            await client.get("/api/pricing-plans")
+            for label, workers, verify in scenarios:
+                auth.verify_password = verify
+                samples, statuses = await run_scenario(client, workers, seconds)
+                print(label)
+                for path, latencies in samples.items():
+                    print_result(f"  GET {path}", summarize(latencies))
+                if statuses:
+                    logins = ", ".join(f"{code}: {count}" for code, count in sorted(statuses.items()))
+                    print(f"  logins in {seconds}s: {logins}")
+        print("=" * 70)
+    finally:
+        auth.verify_password = verify_password
+        password_hasher.shutdown()
+        await client_db.drop_database(db.name)
+        client_db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=20, help="clients logging in at the same time")
+    parser.add_argument("--seconds", type=float, default=5, help="duration of each scenario")
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.seconds))
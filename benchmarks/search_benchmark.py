@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Catalog Search Benchmark
+Measures GET /api/search latency against synthetic catalogs of increasing
+size, next to the current alternative of downloading every server and
+filtering in the client.
+
+Scenarios per catalog size:
+  1. Full download + substring filter (what Games.jsx would have to do)
+  2. Text match ("minecraft")
+  3. Prefix match ("terra")
+  4. Typo fallback ("minecarft", no exact hits -> trigram scan)
+  5. The same typo scoring every name that shares any trigram with it
+     (no candidate selection, as before)
+
+The typo scenarios also check the closest name is returned.
+
+Usage:
+    python benchmarks/search_benchmark.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import asyncio
+import random
+
+from common import get_database, measure, print_header, print_result, summarize
+
+from catalog_fields import with_search_fields
+from migrations import run_migrations
+import routers.search as search
+
+BATCH_SIZE = 10_000
+GAMES = ["Minecraft", "Terraria", "Rust", "Valheim", "ARK", "Palworld", "Satisfactory", "Factorio",
+         "Project Zomboid", "Counter Strike", "Garry's Mod", "7 Days to Die", "Enshrouded", "V Rising"]
+EDITIONS = ["Java", "Bedrock", "Modded", "Vanilla", "Hardcore", "PvE", "PvP", "Survival", "Creative"]
+REGIONS = ["BR", "US", "EU", "SA", "Asia"]
+
+
+def synthetic_server(i):
+    name = f"{random.choice(GAMES)} {random.choice(EDITIONS)} {random.choice(REGIONS)} #{i}"
+    return with_search_fields({
+        "id": f"server-{i}",
+        "name": name,
+        "players": f"2-{random.choice([10, 32, 64, 100, 200])}",
+        "price": f"R$ {random.randint(9, 99)},90",
+        "ram": f"{random.choice([1, 2, 4, 8, 16])}GB",
+        "storage": f"{random.choice([10, 25, 50, 100])}GB SSD",
+        "status": random.choice(["online", "online", "maintenance"]),
+        "image": "https://example.com/server.jpg",
+    })
+
+
+def synthetic_plan(i):
+    return with_search_fields({
+        "id": f"plan-{i}",
+        "name": f"Plano {random.choice(EDITIONS)} {i}",
+        "price": f"R$ {random.randint(9, 99)},90",
+        "description": f"Ideal para servidores {random.choice(GAMES)}",
+        "features": [f"{random.choice([2, 4, 8])}GB RAM", "Backup diário", "Suporte 24/7"],
+    })
+
+
+async def populate(db, servers, plans):
+    for start in range(0, servers, BATCH_SIZE):
+        await db.game_servers.insert_many(
+            [synthetic_server(i) for i in range(start, min(start + BATCH_SIZE, servers))], ordered=False
+        )
+    await db.pricing_plans.insert_many([synthetic_plan(i) for i in range(plans)], ordered=False)
+
+
+async def run_size(db, servers, iterations, scan_iterations):
+    await db.drop_collection("game_servers")
+    await db.drop_collection("pricing_plans")
+    await db.drop_collection("schema_migrations")
+    await populate(db, servers, max(servers // 100, 10))
+    await run_migrations(db)
+    print(f"\n{servers:,} servers")
+
+    async def full_download():
+        docs = await db.game_servers.find({}, {"_id": 0}).to_list(None)
+        return [doc for doc in docs if "minecraft" in doc["name"].lower()][:10]
+
+    print_result("  full download + filter", summarize(await measure(full_download, scan_iterations)))
+    for label, q in (("text", "minecraft"), ("prefix", "terra"), ("typo fallback", "minecarft")):
+        stats = summarize(await measure(lambda: search.search_catalog(q=q, limit=10), iterations))
+        print_result(f"  /api/search {label} ({q})", stats)
+
+    expected = (await search.search_catalog(q="minecarft", limit=1)).results[0].server.name
+    assert expected.startswith("Minecraft"), expected
+
+    candidates, bounds = search.fuzzy_candidate_trigrams, search.fuzzy_bounds
+    search.fuzzy_candidate_trigrams, search.fuzzy_bounds = list, lambda count: (0, count * 100)
+    try:
+        stats = summarize(await measure(lambda: search.search_catalog(q="minecarft", limit=10), scan_iterations))
+        print_result("  /api/search typo, every candidate", stats)
+        unfiltered = (await search.search_catalog(q="minecarft", limit=1)).results[0].server.name
+        assert unfiltered == expected, (unfiltered, expected)
+    finally:
+        search.fuzzy_candidate_trigrams, search.fuzzy_bounds = candidates, bounds
+
+
+async def main(sizes, iterations, scan_iterations):
+    client, db = get_database()
+    search.db = db
+    try:
+        print_header("CATALOG SEARCH BENCHMARK")
+        for size in sizes:
+            await run_size(db, size, iterations, scan_iterations)
+        print("=" * 70)
+    finally:
+        await client.drop_database(db.name)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="catalog sizes (game servers) to test")
+    parser.add_argument("--iterations", type=int, default=200, help="searches per scenario")
+    parser.add_argument("--scan-iterations", type=int, default=10, help="full downloads per size")
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.iterations, args.scan_iterations))
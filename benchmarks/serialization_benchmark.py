@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Serialization Benchmark
+Per-document cost of turning MongoDB documents into JSON response bytes,
+for GameServer, PricingPlan, Testimonial and User.
+
+Paths compared:
+  validated  Model(**doc) for every document (with _id and storage-only
+             fields), the *Response wrapper validated, model_dump_json()
+             then .encode()
+  trusted    documents already projected to the model's fields,
+             construct() and to_json_bytes() (serialization.py)
+
+model_construct() alone is not a win: on pydantic 2.x it runs in Python
+and costs about twice as much as validating a small model in pydantic-core.
+construct() only pays off because projected documents can be adopted as
+the instance __dict__ directly.
+
+No database is needed: documents are generated in memory with the shape
+the collections actually hold.
+
+Usage:
+    python benchmarks/serialization_benchmark.py --docs 1000 --iterations 200
+"""
+
+import argparse
+import uuid
+from datetime import datetime
+
+from common import measure_sync, print_header, summarize
+
+from catalog_fields import with_search_fields
+from models import (
+    GameServer, GameServerResponse, PricingPlan, PricingPlanResponse,
+    Testimonial, TestimonialResponse, User, AuthResponse
+)
+from serialization import construct, construct_many, projection, to_json_bytes
+
+
+def server_doc(i):
+    return with_search_fields({
+        "_id": uuid.uuid4().hex[:24], "id": str(uuid.uuid4()), "name": f"Minecraft Java #{i}",
+        "players": "2-100", "price": "R$ 15,90", "ram": "2GB", "storage": "10GB SSD",
+        "status": "online", "image": "https://example.com/minecraft.jpg",
+        "created_at": datetime.utcnow(), "updated_at": datetime.utcnow(),
+        "price_cents": 1590, "ram_mb": 2048, "storage_gb": 10, "players_min": 2, "players_max": 100,
+    })
+
+
+def plan_doc(i):
+    return with_search_fields({
+        "_id": uuid.uuid4().hex[:24], "id": str(uuid.uuid4()), "name": f"Plano {i}", "price": "R$ 19,90",
+        "period": "/mês", "description": "Perfeito para começar",
+        "features": ["2GB RAM", "10GB SSD", "Backup diário", "Suporte 24/7"],
+        "popular": False, "created_at": datetime.utcnow(), "price_cents": 1990,
+    })
+
+
+def testimonial_doc(i):
+    return {
+        "_id": uuid.uuid4().hex[:24], "id": str(uuid.uuid4()), "name": f"Cliente {i}",
+        "role": "Admin do servidor", "content": "Servidor estável e suporte rápido. " * 4,
+        "avatar": "https://example.com/avatar.png", "rating": 5, "approved": True,
+        "created_at": datetime.utcnow(),
+    }
+
+
+def user_doc(i):
+    return {
+        "_id": uuid.uuid4().hex[:24], "id": str(uuid.uuid4()), "name": f"User {i}",
+        "email": f"user{i}@example.com", "password_hash": "$2b$12$" + "x" * 53, "avatar": None,
+        "provider": "email", "provider_id": None, "is_active": True, "is_verified": True,
+        "created_at": datetime.utcnow(), "updated_at": datetime.utcnow(),
+    }
+
+
+def project(model, docs):
+    """What Mongo returns for find(query, projection(model))"""
+    fields = projection(model)
+    return [{key: value for key, value in doc.items() if fields.get(key) == 1} for doc in docs]
+
+
+def list_paths(model, response_model, key, docs):
+    trusted_docs = project(model, docs)
+
+    def validated():
+        return response_model(**{key: [model(**doc) for doc in docs]}).model_dump_json().encode()
+
+    def trusted():
+        fresh = [dict(doc) for doc in trusted_docs]  # construct() takes ownership, as with Motor results
+        return to_json_bytes(response_model.model_construct(**{key: construct_many(model, fresh)}))
+
+    return validated, trusted
+
+
+def user_paths(docs):
+    """get_current_user builds one User per request; the response wraps one user"""
+    trusted_docs = project(User, docs)
+
+    def validated():
+        for doc in docs:
+            AuthResponse(user=User(**doc), token="t", message="ok").model_dump_json().encode()
+
+    def trusted():
+        for doc in trusted_docs:
+            to_json_bytes(construct(AuthResponse, {"user": construct(User, dict(doc)), "token": "t", "message": "ok"}))
+
+    return validated, trusted
+
+
+def main(docs, iterations):
+    cases = [
+        ("GameServer", list_paths(GameServer, GameServerResponse, "servers", [server_doc(i) for i in range(docs)])),
+        ("PricingPlan", list_paths(PricingPlan, PricingPlanResponse, "plans", [plan_doc(i) for i in range(docs)])),
+        ("Testimonial", list_paths(Testimonial, TestimonialResponse, "testimonials",
+                                   [testimonial_doc(i) for i in range(docs)])),
+        ("User", user_paths([user_doc(i) for i in range(docs)])),
+    ]
+
+    print_header(f"SERIALIZATION BENCHMARK ({docs:,} documents per call)")
+    print(f"{'model':14} | {'validated us/doc':>16} | {'trusted us/doc':>14} | speedup")
+    for name, (validated, trusted) in cases:
+        before = summarize(measure_sync(validated, iterations))["p50_ms"] * 1000 / docs
+        after = summarize(measure_sync(trusted, iterations))["p50_ms"] * 1000 / docs
+        print(f"{name:14} | {before:16.2f} | {after:14.2f} | {before / after:6.2f}x")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=1_000, help="documents per serialized payload")
+    parser.add_argument("--iterations", type=int, default=200, help="timed calls per path")
+    args = parser.parse_args()
+    main(args.docs, args.iterations)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Support Ticket Triage Benchmark
+Measures the admin ticket listing and counts against a large synthetic
+support_requests collection, and prints what each query reads according
+to explain(). Keyset page selection must be covered by the triage index
+(no document examined); the benchmark fails otherwise.
+
+Scenarios:
+  1. First page, unfiltered / by status / by status + priority
+  2. Page 200 by keyset cursor vs. the same page with skip()
+  3. Per-status counts (one covered aggregation)
+
+Usage:
+    python benchmarks/support_tickets_benchmark.py --tickets 1000000
+"""
+
+import argparse
+import asyncio
+import random
+import uuid
+from datetime import datetime, timedelta
+
+from common import get_database, measure, print_header, print_result, summarize
+
+from migrations import run_migrations
+import routers.support as support
+
+BATCH_SIZE = 10_000
+PAGE_SIZE = 50
+DEEP_PAGE = 200
+STATUSES = ["open", "in_progress", "resolved"]
+PRIORITIES = ["low", "medium", "high"]
+
+
+def synthetic_ticket(i, now):
+    return {
+        "id": str(uuid.uuid4()),
+        "name": f"Cliente {i}",
+        "email": f"cliente{i}@example.com",
+        "subject": "Servidor lento",
+        "message": "O servidor está com lag desde ontem.",
+        # Mostly resolved, like a real backlog
+        "status": random.choices(STATUSES, weights=[1, 1, 8])[0],
+        "priority": random.choices(PRIORITIES, weights=[3, 5, 2])[0],
+        # A few tickets share each second, so the id tie-break matters
+        "created_at": now - timedelta(seconds=i // 3),
+    }
+
+
+async def populate(db, tickets):
+    now = datetime.utcnow().replace(microsecond=0)
+    for start in range(0, tickets, BATCH_SIZE):
+        await db.support_requests.insert_many(
+            [synthetic_ticket(i, now) for i in range(start, min(start + BATCH_SIZE, tickets))],
+            ordered=False
+        )
+
+
+async def deep_cursor(status_filter):
+    """Cursor for the last ticket of page DEEP_PAGE - 1"""
+    after = None
+    for _ in range(DEEP_PAGE - 1):
+        page = await support._load_tickets_page(PAGE_SIZE, after, status_filter=status_filter)
+        after = support._decode_cursor(page.next_cursor)
+    return after
+
+
+async def explain_listing(db, status_filter=None, priority=None, after=None, skip=0):
+    """Explain the page selection step of _load_tickets_page (index keys only)"""
+    query = support._listing_query(status_filter, priority, after)
+    cursor = db.support_requests.find(query, support.LISTING_KEY_FIELDS).sort(
+        [("created_at", -1), ("id", -1)]
+    ).skip(skip).limit(PAGE_SIZE + 1)
+    stats = (await cursor.explain())["executionStats"]
+    return stats["totalKeysExamined"], stats["totalDocsExamined"], "'stage': 'SORT'" in str(stats)
+
+
+async def main(tickets, iterations):
+    client, db = get_database()
+    support.db = db
+    try:
+        print_header("SUPPORT TICKET TRIAGE BENCHMARK")
+        await db.drop_collection("support_requests")
+        await db.drop_collection("schema_migrations")
+        await populate(db, tickets)
+        await run_migrations(db)
+        print(f"{tickets:,} tickets\n")
+
+        scenarios = [
+            ("first page", {}),
+            ("first page status=open", {"status_filter": "open"}),
+            ("first page open + high", {"status_filter": "open", "priority": "high"}),
+        ]
+        for label, filters in scenarios:
+            stats = summarize(await measure(lambda: support._load_tickets_page(PAGE_SIZE, **filters), iterations))
+            print_result(f"  {label}", stats)
+
+        after = await deep_cursor("resolved")
+        stats = summarize(await measure(
+            lambda: support._load_tickets_page(PAGE_SIZE, after, status_filter="resolved"), iterations
+        ))
+        print_result(f"  page {DEEP_PAGE} resolved (keyset)", stats)
+
+        skip = (DEEP_PAGE - 1) * PAGE_SIZE
+
+        async def skip_page():
+            return await db.support_requests.find(support._listing_query("resolved", None, None)).sort(
+                [("created_at", -1), ("id", -1)]
+            ).skip(skip).limit(PAGE_SIZE).to_list(PAGE_SIZE)
+
+        print_result(f"  page {DEEP_PAGE} resolved (skip)", summarize(await measure(skip_page, iterations)))
+        print_result("  counts", summarize(await measure(support.count_tickets, max(iterations // 10, 1))))
+
+        print("\nexplain (keys examined / docs examined / in-memory sort)")
+        plans = [
+            ("first page", await explain_listing(db)),
+            ("first page open + high", await explain_listing(db, "open", "high")),
+            (f"page {DEEP_PAGE} resolved (keyset)", await explain_listing(db, "resolved", after=after)),
+            (f"page {DEEP_PAGE} resolved (skip)", await explain_listing(db, "resolved", skip=skip)),
+        ]
+        for label, (keys, docs, sort) in plans:
+            print(f"  {label:36} | keys {keys:8,} | docs {docs:8,} | sort {'yes' if sort else 'no'}")
+        for label, (keys, docs, sort) in plans[:3]:
+            assert docs == 0 and not sort, f"{label}: listing is not covered by the triage index"
+            # At most one index range per (status, priority) pair, each read past the page by one key
+            assert keys <= len(STATUSES) * len(PRIORITIES) * (PAGE_SIZE + 2), f"{label}: {keys} keys examined"
+        print("=" * 70)
+    finally:
+        await client.drop_database(db.name)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=1_000_000, help="support tickets to generate")
+    parser.add_argument("--iterations", type=int, default=200, help="requests per scenario")
+    args = parser.parse_args()
+    asyncio.run(main(args.tickets, args.iterations))
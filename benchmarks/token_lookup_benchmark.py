@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Token Lookup Benchmark
+Measures reset-token lookups and forgot-password cleanup against a
+password_reset_tokens collection holding millions of historical rows.
+
+Scenarios:
+  1. No indexes (collection scans)
+  2. Lookup indexes (migration 1), expired and used rows retained
+  3. Lookup + TTL indexes (migration 2) after expiry removed old rows
+
+Usage:
+    python benchmarks/token_lookup_benchmark.py --rows 2000000
+"""
+
+import argparse
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+from common import get_database, measure, print_header, print_result, summarize
+
+from migrations import MIGRATIONS, run_migrations
+
+BATCH_SIZE = 10_000
+LIVE_TOKENS = 1_000
+
+
+async def populate(collection, rows):
+    """Insert `rows` historical tokens (expired or used) plus live ones."""
+    now = datetime.utcnow()
+    users = max(rows // 5, 1)
+    batch = []
+    for i in range(rows):
+        batch.append({
+            "id": f"hist-{i}",
+            "user_id": f"user-{random.randrange(users)}",
+            "email": f"user{i}@example.com",
+            "token": f"hist-token-{i}",
+            "expires_at": now - timedelta(hours=random.randint(1, 24 * 365)),
+            "used": i % 2 == 0,
+            "created_at": now - timedelta(days=400),
+        })
+        if len(batch) == BATCH_SIZE:
+            await collection.insert_many(batch, ordered=False)
+            batch = []
+    batch.extend(
+        {
+            "id": f"live-{i}",
+            "user_id": f"live-user-{i}",
+            "email": f"live{i}@example.com",
+            "token": f"live-token-{i}",
+            "expires_at": now + timedelta(hours=1),
+            "used": False,
+            "created_at": now,
+        }
+        for i in range(LIVE_TOKENS)
+    )
+    await collection.insert_many(batch, ordered=False)
+
+
+async def run_scenario(label, collection, iterations):
+    """Time the reset_password lookup and forgot_password delete_many."""
+
+    async def lookup():
+        token = f"live-token-{random.randrange(LIVE_TOKENS)}"
+        await collection.find_one({
+            "token": token,
+            "used": False,
+            "expires_at": {"$gt": datetime.utcnow()}
+        })
+
+    async def cleanup():
+        # A user with no pending tokens: nothing is deleted, but Mongo still has to find that out
+        await collection.delete_many({"user_id": f"absent-user-{random.randrange(1000)}", "used": False})
+
+    stats = await collection.database.command("collStats", collection.name)
+    print(f"\n{label}: {stats['count']:,} docs, {stats['totalIndexSize'] / 1e6:.1f} MB of indexes")
+    print_result("  reset token lookup", summarize(await measure(lookup, iterations)))
+    print_result("  forgot-password delete_many", summarize(await measure(cleanup, iterations)))
+
+
+async def main(rows, iterations, scan_iterations):
+    client, db = get_database()
+    collection = db.password_reset_tokens
+    try:
+        await db.drop_collection(collection.name)
+        await db.drop_collection("schema_migrations")
+
+        print_header("TOKEN LOOKUP BENCHMARK")
+        print(f"Populating {rows:,} historical tokens...")
+        await populate(collection, rows)
+
+        await run_scenario("1. No indexes", collection, scan_iterations)
+
+        await run_migrations(db, MIGRATIONS[:1])
+        await run_scenario("2. Lookup indexes, history retained", collection, iterations)
+
+        await run_migrations(db, [m for m in MIGRATIONS if m.version == 2])
+        # The TTL monitor runs once a minute; remove what it would expire right away
+        await collection.delete_many({"expires_at": {"$lte": datetime.utcnow()}})
+        await run_scenario("3. Lookup + TTL indexes, expired rows removed", collection, iterations)
+        print("=" * 70)
+    finally:
+        await client.drop_database(db.name)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000, help="historical token rows")
+    parser.add_argument("--iterations", type=int, default=1_000, help="indexed lookups per scenario")
+    parser.add_argument("--scan-iterations", type=int, default=20, help="lookups without indexes")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.iterations, args.scan_iterations))
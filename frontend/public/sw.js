@@ -108,22 +108,22 @@ async function handleApiRequest(request) {
         return cachedResponse;
       }
 
-      // Fetch from network
-      const networkResponse = await fetch(request);
+      // Revalidate the stale copy: the API answers 304 with no body if it is unchanged
+      const etag = cachedResponse && cachedResponse.headers.get('ETag');
+      const networkResponse = etag
+        ? await fetch(request, { headers: { 'If-None-Match': etag } })
+        : await fetch(request);
+      
+      if (networkResponse.status === 304 && cachedResponse) {
+        const refreshed = await stampCachedAt(cachedResponse);
+        cache.put(request, refreshed.clone());
+        console.log('Service Worker: API response not modified', url.pathname);
+        return refreshed;
+      }
       
       if (networkResponse.ok) {
         // Add timestamp header for expiration checking
-        const responseToCache = networkResponse.clone();
-        const headers = new Headers(responseToCache.headers);
-        headers.set('sw-cached-at', Date.now().toString());
-        
-        const modifiedResponse = new Response(responseToCache.body, {
-          status: responseToCache.status,
-          statusText: responseToCache.statusText,
-          headers
-        });
-        
-        cache.put(request, modifiedResponse);
+        cache.put(request, await stampCachedAt(networkResponse.clone()));
         console.log('Service Worker: Cached API response', url.pathname);
       }
       
@@ -140,6 +140,19 @@ async function handleApiRequest(request) {
   return fetch(request);
 }
 
+/**
+ * Copy a response with a fresh sw-cached-at timestamp for expiration checking
+ */
+async function stampCachedAt(response) {
+  const headers = new Headers(response.headers);
+  headers.set('sw-cached-at', Date.now().toString());
+  return new Response(await response.blob(), {
+    status: response.status,
+    statusText: response.statusText,
+    headers
+  });
+}
+
 /**
  * Handle static assets with cache-first strategy
  */
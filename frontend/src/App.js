@@ -1,4 +1,4 @@
-import React, { Suspense, useEffect } from "react";
+import React, { Suspense, useEffect, useState } from "react";
 import "./App.css";
 import { BrowserRouter, Routes, Route } from "react-router-dom";
 import { HelmetProvider } from "react-helmet-async";
@@ -8,6 +8,7 @@ import { AuthProvider } from "./contexts/AuthContext";
 import { GoogleOAuthProvider } from '@react-oauth/google';
 import ErrorBoundary from "./components/ErrorBoundary";
 import LoadingSpinner from "./components/LoadingSpinner";
+import { apiService } from "./services/api";
 
 // Performance monitoring
 import { initPerformanceMonitoring } from "./utils/performance";
@@ -39,19 +40,22 @@ const Games = React.lazy(() => import("./pages/Games"));
 const ServerManagement = React.lazy(() => import("./pages/ServerManagement"));
 
 const Home = () => {
+  // One GET /landing for every section below; a section it couldn't load uses its own route
+  const [landing] = useState(() => apiService.getLanding().catch(() => null));
+
   return (
     <div className="min-h-screen bg-white dark:bg-gray-950 transition-colors">
       <HomePageSEO />
       <Header />
       <Hero />
       <Suspense fallback={<LoadingSpinner />}>
-        <DashboardPreview />
+        <DashboardPreview landing={landing} />
       </Suspense>
       <Suspense fallback={<LoadingSpinner />}>
-        <Pricing />
+        <Pricing landing={landing} />
       </Suspense>
       <Suspense fallback={<LoadingSpinner />}>
-        <Support />
+        <Support landing={landing} />
       </Suspense>
       <Footer />
     </div>
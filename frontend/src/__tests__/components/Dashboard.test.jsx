@@ -133,6 +133,25 @@ describe('DashboardPreview Component', () => {
     }, { timeout: 3000 });
   });
 
+  test('uses the landing bundle when the home page passes one', async () => {
+    // Any request to the section routes would fail the render
+    server.use(
+      rest.get('http://localhost:8001/api/dashboard/stats', (req, res, ctx) => res(ctx.status(500))),
+      rest.get('http://localhost:8001/api/servers', (req, res, ctx) => res(ctx.status(500)))
+    );
+    const landing = Promise.resolve({
+      servers: { servers: [{ id: '3', name: 'Valheim', players: '1-10', price: 'R$ 19,90', ram: '4GB', storage: '15GB SSD', status: 'online', image: 'valheim.jpg' }] },
+      dashboard_stats: { stats: [{ title: 'Servidores Ativos', value: '7', change: '+1%', trend: 'up' }] },
+    });
+
+    render(<DashboardPreview landing={landing} />);
+
+    await waitFor(() => {
+      expect(screen.getByText('Valheim')).toBeInTheDocument();
+      expect(screen.getByText('7')).toBeInTheDocument();
+    });
+  });
+
   test('shows correct trend indicators', async () => {
     render(<DashboardPreview />);
 
@@ -10,22 +10,22 @@ import { TrendingUp, TrendingDown, Play, Settings, Users, HardDrive } from 'luci
 
 import { useNavigate } from 'react-router-dom';
 
-const DashboardPreview = () => {
+const DashboardPreview = ({ landing = null }) => {
   const navigate = useNavigate();
   const [dashboardStats, setDashboardStats] = useState([]);
   const [gameServers, setGameServers] = useState([]);
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState(null);
 
-  const fetchDashboardData = async () => {
+  const fetchDashboardData = async (fromLanding = null) => {
     try {
       setIsLoading(true);
       setError(null);
 
       // Fetch both stats and servers in parallel
       const [stats, servers] = await Promise.all([
-        apiService.getDashboardStats(),
-        apiService.getServers()
+        apiService.getDashboardStats(fromLanding),
+        apiService.getServers(fromLanding)
       ]);
 
       setDashboardStats(stats);
@@ -39,7 +39,7 @@ const DashboardPreview = () => {
   };
 
   useEffect(() => {
-    fetchDashboardData();
+    fetchDashboardData(landing);
   }, []);
 
   if (isLoading) {
@@ -74,7 +74,7 @@ const DashboardPreview = () => {
               Dashboard intuitivo com métricas em tempo real, gerenciamento simplificado e insights poderosos
             </p>
           </div>
-          <ErrorMessage message={error} onRetry={fetchDashboardData} />
+          <ErrorMessage message={error} onRetry={() => fetchDashboardData()} />
         </div>
       </section>
     );
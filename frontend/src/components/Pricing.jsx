@@ -7,17 +7,17 @@ import LoadingSpinner from './LoadingSpinner';
 import ErrorMessage from './ErrorMessage';
 import { Check, Star } from 'lucide-react';
 
-const Pricing = () => {
+const Pricing = ({ landing = null }) => {
   const [pricingPlans, setPricingPlans] = useState([]);
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState(null);
 
-  const fetchPricingPlans = async () => {
+  const fetchPricingPlans = async (fromLanding = null) => {
     try {
       setIsLoading(true);
       setError(null);
       
-      const plans = await apiService.getPricingPlans();
+      const plans = await apiService.getPricingPlans(fromLanding);
       setPricingPlans(plans);
     } catch (err) {
       console.error('Error fetching pricing plans:', err);
@@ -28,7 +28,7 @@ const Pricing = () => {
   };
 
   useEffect(() => {
-    fetchPricingPlans();
+    fetchPricingPlans(landing);
   }, []);
 
   if (isLoading) {
@@ -63,7 +63,7 @@ const Pricing = () => {
               Escolha o plano perfeito para sua comunidade e desbloqueie todo o potencial dos seus jogos
             </p>
           </div>
-          <ErrorMessage message={error} onRetry={fetchPricingPlans} />
+          <ErrorMessage message={error} onRetry={() => fetchPricingPlans()} />
         </div>
       </section>
     );
@@ -12,7 +12,7 @@ import ErrorMessage from './ErrorMessage';
 import { useToast } from '../hooks/use-toast';
 import { MessageCircle, Mail, Phone, Clock, Shield, Headphones, Send } from 'lucide-react';
 
-const Support = () => {
+const Support = ({ landing = null }) => {
   const [testimonials, setTestimonials] = useState([]);
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -28,12 +28,12 @@ const Support = () => {
     priority: 'medium'
   });
 
-  const fetchTestimonials = async () => {
+  const fetchTestimonials = async (fromLanding = null) => {
     try {
       setIsLoading(true);
       setError(null);
       
-      const testimonialsData = await apiService.getTestimonials();
+      const testimonialsData = await apiService.getTestimonials(fromLanding);
       setTestimonials(testimonialsData);
     } catch (err) {
       console.error('Error fetching testimonials:', err);
@@ -102,7 +102,7 @@ const Support = () => {
   };
 
   useEffect(() => {
-    fetchTestimonials();
+    fetchTestimonials(landing);
   }, []);
 
   return (
@@ -362,7 +362,7 @@ const Support = () => {
           {isLoading ? (
             <LoadingSpinner size="large" className="py-12" />
           ) : error ? (
-            <ErrorMessage message={error} onRetry={fetchTestimonials} />
+            <ErrorMessage message={error} onRetry={() => fetchTestimonials()} />
           ) : (
             <div className="grid grid-cols-1 md:grid-cols-3 gap-8">
               {testimonials.map((testimonial) => (
@@ -33,10 +33,31 @@ api.interceptors.response.use(
   }
 );
 
+// Section of a pending getLanding() response, or null when there is none or the
+// landing response couldn't load that section (the caller then uses its own route)
+const landingSection = async (landing, name) => {
+  if (!landing) return null;
+  const data = await landing;
+  return data?.[name] || null;
+};
+
 // API service methods
 export const apiService = {
+  // Landing page: servers, pricing plans, dashboard stats and testimonials in one request
+  async getLanding() {
+    try {
+      const response = await api.get('/landing');
+      return response.data;
+    } catch (error) {
+      console.error('Error fetching landing data:', error);
+      throw error;
+    }
+  },
+
   // Game Servers
-  async getServers() {
+  async getServers(landing = null) {
+    const section = await landingSection(landing, 'servers');
+    if (section) return section.servers;
     try {
       const response = await api.get('/servers');
       return response.data.servers;
@@ -67,7 +88,9 @@ export const apiService = {
   },
 
   // Pricing Plans
-  async getPricingPlans() {
+  async getPricingPlans(landing = null) {
+    const section = await landingSection(landing, 'pricing_plans');
+    if (section) return section.plans;
     try {
       const response = await api.get('/pricing-plans');
       return response.data.plans;
@@ -78,7 +101,9 @@ export const apiService = {
   },
 
   // Dashboard Statistics
-  async getDashboardStats() {
+  async getDashboardStats(landing = null) {
+    const section = await landingSection(landing, 'dashboard_stats');
+    if (section) return section.stats;
     try {
       const response = await api.get('/dashboard/stats');
       return response.data.stats;
@@ -89,7 +114,9 @@ export const apiService = {
   },
 
   // Testimonials
-  async getTestimonials() {
+  async getTestimonials(landing = null) {
+    const section = await landingSection(landing, 'testimonials');
+    if (section) return section.testimonials;
     try {
       const response = await api.get('/testimonials');
       return response.data.testimonials;
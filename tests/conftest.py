@@ -2,9 +2,11 @@
 Pytest configuration and fixtures for Mystic Host tests
 """
 import pytest
+import pytest_asyncio
 import asyncio
 import os
 import sys
+import uuid
 from unittest.mock import AsyncMock, patch
 
 # Add backend to path
@@ -17,6 +19,24 @@ def event_loop():
     yield loop
     loop.close()
 
+@pytest_asyncio.fixture
+async def mongo_db():
+    """Throwaway database on a real MongoDB server (skipped when none is reachable)"""
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    url = os.environ.get("TEST_MONGO_URL", "mongodb://localhost:27017")
+    client = AsyncIOMotorClient(url, serverSelectionTimeoutMS=500)
+    try:
+        await client.admin.command("ping")
+    except Exception:
+        client.close()
+        pytest.skip("MongoDB server not available")
+
+    name = f"mystic_test_{uuid.uuid4().hex[:8]}"
+    yield client[name]
+    await client.drop_database(name)
+    client.close()
+
 @pytest.fixture
 def mock_database():
     """Mock database for testing"""
@@ -66,4 +86,13 @@ def sample_support_request():
         "subject": "Test Support Request",
         "message": "This is a test support message",
         "priority": "medium"
-    }
\ No newline at end of file
+    }
+
+
+@pytest.fixture(autouse=True)
+def reset_request_state():
+    """Every test starts with empty rate limit counters and no cached users"""
+    from rate_limit import rate_limiter
+    from database import user_cache
+    rate_limiter.reset()
+    user_cache.invalidate()
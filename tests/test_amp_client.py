@@ -0,0 +1,78 @@
+"""
+Test AMP client instrumentation
+"""
+import pytest
+import requests
+from unittest.mock import MagicMock
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from amp_client import AMPClient, AMPAPIError
+from metrics import registry
+
+
+def make_response(payload, status_code=200, body=b'{"SESSIONID": "x"}'):
+    response = MagicMock()
+    response.json.return_value = payload
+    response.content = b"x" * 300
+    response.request.body = body
+    response.status_code = status_code
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(f"{status_code} Error")
+    return response
+
+
+class TestAMPInstrumentation:
+    """Test latency, payload size and error metrics per module/method"""
+
+    def setup_method(self):
+        registry.reset()
+        self.client = AMPClient("http://amp.local", "user", "pass", slow_call_ms=10_000)
+        self.client.session = MagicMock()
+
+    def test_successful_call_records_latency_and_sizes(self):
+        """Test a successful call is counted and sized"""
+        self.client.session.post.return_value = make_response({"State": 20})
+        self.client._make_request("Core/GetStatus", {"InstanceId": "abc"})
+
+        snapshot = registry.snapshot()
+        durations = snapshot["histograms"]["amp_request_duration_seconds"]
+        assert durations[0]["labels"] == {"endpoint": "Core/GetStatus"}
+        assert durations[0]["count"] == 1
+        assert snapshot["histograms"]["amp_response_bytes"][0]["sum"] == 300
+        assert "amp_errors_total" not in snapshot["counters"]
+
+    def test_amp_title_error_is_classified(self):
+        """Test AMP-level errors are counted with their Title"""
+        self.client.session.post.return_value = make_response(
+            {"Title": "Unauthorized Access", "Message": "Session expired"}
+        )
+        with pytest.raises(AMPAPIError, match="Unauthorized: Session expired"):
+            self.client._make_request("Core/GetStatus", {})
+        assert registry.get(
+            "amp_errors_total", endpoint="Core/GetStatus", kind="amp", title="Unauthorized Access"
+        ) == 1
+
+    def test_timeout_is_classified(self):
+        """Test timeouts are counted separately"""
+        self.client.session.post.side_effect = requests.exceptions.Timeout()
+        with pytest.raises(AMPAPIError):
+            self.client._make_request("ADSModule/GetInstances", {})
+        assert registry.get("amp_errors_total", endpoint="ADSModule/GetInstances", kind="timeout", title="") == 1
+
+    def test_http_error_is_classified(self):
+        """Test HTTP status errors are counted"""
+        self.client.session.post.return_value = make_response({}, status_code=502)
+        with pytest.raises(AMPAPIError):
+            self.client._make_request("Core/Start", {})
+        assert registry.get("amp_errors_total", endpoint="Core/Start", kind="http", title="") == 1
+
+    def test_slow_call_is_logged(self, caplog):
+        """Test calls over the threshold log a warning"""
+        self.client.slow_call_ms = 0
+        self.client.session.post.return_value = make_response({})
+        with caplog.at_level("WARNING", logger="amp_client"):
+            self.client._make_request("Core/GetUpdates", {})
+        assert any("Slow AMP call Core/GetUpdates" in record.getMessage() for record in caplog.records)
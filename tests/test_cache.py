@@ -0,0 +1,107 @@
+"""
+Test in-process caches and cached dashboard statistics
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from cache import TTLCache
+from database import Database, dashboard_stats_cache
+from metrics import registry
+
+
+class TestTTLCache:
+    """Test expiry, LRU bound and single-flight loading"""
+
+    def setup_method(self):
+        registry.reset()
+
+    def test_hit_and_miss_are_counted(self):
+        """Test hits and misses are recorded per cache"""
+        cache = TTLCache("test", ttl=60)
+        assert cache.get("a") is None
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert registry.get("cache_requests_total", cache="test", result="hit") == 1
+        assert registry.get("cache_requests_total", cache="test", result="miss") == 1
+
+    def test_expired_entries_are_dropped(self):
+        """Test entries past their TTL are misses"""
+        cache = TTLCache("test", ttl=0)
+        cache.set("a", 1)
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_lru_bound(self):
+        """Test the least recently used entry is evicted"""
+        cache = TTLCache("test", ttl=60, maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+
+    def test_age_is_not_counted(self):
+        """Test age() reports fresh entries without touching hit/miss counters"""
+        cache = TTLCache("test", ttl=60)
+        assert cache.age("a") is None
+        cache.set("a", 1)
+        assert 0 <= cache.age("a") < 1
+        assert registry.get("cache_requests_total", cache="test", result="miss") == 0
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self):
+        """Test concurrent misses trigger a single loader call"""
+        cache = TTLCache("test", ttl=60)
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "value"
+
+        results = await asyncio.gather(*(cache.get_or_load("k", loader) for _ in range(5)))
+        assert results == ["value"] * 5
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidation_during_load_is_not_overwritten(self):
+        """Test a load that raced with a write does not repopulate stale data"""
+        cache = TTLCache("test", ttl=60)
+
+        async def loader():
+            cache.invalidate()
+            return "stale"
+
+        assert await cache.get_or_load("k", loader) == "stale"
+        assert cache.get("k") is None
+
+
+class TestDashboardStatsCache:
+    """Test dashboard stats are aggregated once and invalidated by writes"""
+
+    def setup_method(self):
+        registry.reset()
+        dashboard_stats_cache.invalidate()
+
+    @pytest.mark.asyncio
+    async def test_stats_are_cached_until_invalidated(self):
+        """Test repeated reads reuse one aggregation"""
+        counts = AsyncMock(return_value={"online": 3, "maintenance": 1})
+        with patch.object(Database, "count_servers_by_status", counts):
+            first = await Database.get_dashboard_stats()
+            second = await Database.get_dashboard_stats()
+            assert counts.await_count == 1
+            assert first == second
+            assert first[0]["value"] == "3"
+            assert first[2]["value"] == "75.0%"
+
+            Database.invalidate_dashboard_stats()
+            await Database.get_dashboard_stats()
+            assert counts.await_count == 2
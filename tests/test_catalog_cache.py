@@ -0,0 +1,74 @@
+"""
+Test the read-through catalog cache
+"""
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi.testclient import TestClient
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from server import app
+from database import catalog_cache
+
+
+def mock_collection(docs):
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=docs)
+    collection = MagicMock()
+    collection.find.return_value = cursor
+    collection.insert_one = AsyncMock()
+    return collection
+
+
+PLAN = {
+    "_id": "mongo-id",
+    "id": "plan1",
+    "name": "Apprentice",
+    "price": "R$ 19,90",
+    "period": "/mês",
+    "description": "Perfeito para começar",
+    "features": ["2GB RAM"],
+    "popular": False,
+    "created_at": datetime(2024, 1, 1),
+}
+
+
+class TestCatalogCache:
+    """Test cached catalog reads and write invalidation"""
+
+    def setup_method(self):
+        catalog_cache.invalidate()
+        self.client = TestClient(app)
+
+    def test_second_read_does_not_touch_mongo(self):
+        """Test hot reads are served from serialized bytes"""
+        mock_db = MagicMock()
+        mock_db.pricing_plans = mock_collection([PLAN])
+        with patch("routers.general.db", mock_db):
+            first = self.client.get("/api/pricing-plans")
+            second = self.client.get("/api/pricing-plans")
+
+        assert first.status_code == 200
+        assert first.content == second.content
+        assert first.json()["plans"][0]["name"] == "Apprentice"
+        assert "_id" not in first.json()["plans"][0]
+        assert mock_db.pricing_plans.find.call_count == 1
+
+    def test_create_invalidates_cache(self):
+        """Test a POST forces the next read to reload"""
+        mock_db = MagicMock()
+        mock_db.pricing_plans = mock_collection([PLAN])
+        new_plan = {
+            "name": "Sorcerer",
+            "price": "R$ 39,90",
+            "description": "Para comunidades",
+            "features": ["4GB RAM"],
+        }
+        with patch("routers.general.db", mock_db):
+            self.client.get("/api/pricing-plans")
+            assert self.client.post("/api/pricing-plans", json=new_plan).status_code == 200
+            self.client.get("/api/pricing-plans")
+
+        assert mock_db.pricing_plans.find.call_count == 2
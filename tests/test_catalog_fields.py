@@ -0,0 +1,56 @@
+"""
+Test parsing of catalog display strings into numeric fields
+"""
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from catalog_fields import parse_player_range, parse_price_cents, parse_size_gb, parse_size_mb
+from models import GameServer, PricingPlan
+
+
+class TestCatalogFieldParsing:
+    """Test price, size and player range parsing"""
+
+    def test_price_cents(self):
+        """Test Brazilian price strings become cents"""
+        assert parse_price_cents("R$ 15,90") == 1590
+        assert parse_price_cents("R$ 1.234,5") == 123450
+        assert parse_price_cents("R$ 30") == 3000
+        assert parse_price_cents("Grátis") is None
+
+    def test_sizes(self):
+        """Test RAM and storage strings become MB and GB"""
+        assert parse_size_mb("2GB") == 2048
+        assert parse_size_mb("512 MB") == 512
+        assert parse_size_mb("1,5GB") == 1536
+        assert parse_size_gb("10GB SSD") == 10
+        assert parse_size_gb("1TB NVMe") == 1024
+        assert parse_size_mb("ilimitado") is None
+
+    def test_player_range(self):
+        """Test player ranges and single values"""
+        assert parse_player_range("2-100") == (2, 100)
+        assert parse_player_range("64") == (64, 64)
+        assert parse_player_range("") == (None, None)
+
+
+class TestModelNumericFields:
+    """Test models derive numeric fields from display strings"""
+
+    def test_game_server_derives_fields(self):
+        """Test a server built from display strings gets numeric fields"""
+        server = GameServer(
+            name="Rust", players="10-200", price="R$ 29,90",
+            ram="4GB", storage="25GB SSD", status="online", image="rust.jpg"
+        )
+        assert (server.price_cents, server.ram_mb, server.storage_gb) == (2990, 4096, 25)
+        assert (server.players_min, server.players_max) == (10, 200)
+
+    def test_stored_values_win(self):
+        """Test explicit numeric fields are not overwritten"""
+        plan = PricingPlan(
+            name="Apprentice", price="R$ 19,90", description="Plano inicial",
+            features=[], price_cents=1500
+        )
+        assert plan.price_cents == 1500
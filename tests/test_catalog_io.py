@@ -0,0 +1,214 @@
+"""
+Test the streaming NDJSON catalog import and export
+"""
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi.testclient import TestClient
+from pymongo.errors import BulkWriteError
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from server import app
+from catalog_io import export_servers, import_operation, import_servers, iter_lines, parse_line
+from migrations import run_migrations
+from models import User
+from seed import natural_id
+from security import get_current_user
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), '..', 'backend')
+FULL = {"name": "Rust", "players": "2-200", "price": "R$ 39,90", "ram": "8GB", "storage": "25GB SSD", "image": "rust.jpg"}
+
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def ndjson(*records) -> bytes:
+    return b"".join(json.dumps(record).encode() + b"\n" for record in records)
+
+
+def bulk_result(upserted=0, matched=0, modified=0):
+    result = MagicMock()
+    result.bulk_api_result = {"nUpserted": upserted, "nMatched": matched, "nModified": modified, "writeErrors": []}
+    return result
+
+
+async def collect(generator):
+    return [item async for item in generator]
+
+
+class TestImportOperations:
+    """Test how import lines become writes"""
+
+    def test_full_record_upserts_with_natural_id(self):
+        """Test a complete line creates the server under the seed id"""
+        operation = import_operation(parse_line(json.dumps(FULL).encode()))
+        assert operation._filter == {"name": "Rust"}
+        assert operation._upsert is True
+        assert operation._doc["$setOnInsert"]["id"] == natural_id("game_servers", {"name": "Rust"})
+        assert operation._doc["$setOnInsert"]["status"] == "online"
+        assert operation._doc["$set"]["price_cents"] == 3990
+        assert operation._doc["$set"]["players_max"] == 200
+
+    def test_partial_record_patches_only(self):
+        """Test a partial line sets just its fields and never inserts"""
+        operation = import_operation(parse_line(b'{"name": "Rust", "image": "new.jpg"}'))
+        assert operation._upsert is False
+        assert "$setOnInsert" not in operation._doc
+        assert operation._doc["$set"]["image"] == "new.jpg"
+        assert "price_cents" not in operation._doc["$set"]
+
+    def test_invalid_lines(self):
+        """Test malformed JSON, unknown fields and missing names are rejected"""
+        for raw in (b"{not json", b'{"name": "Rust", "owner": "x"}', b'{"image": "a.jpg"}', b'{"name": ""}'):
+            with pytest.raises(ValueError):
+                parse_line(raw)
+
+    def test_image_data_file(self):
+        """Test the shipped image fixes are valid patches"""
+        with open(os.path.join(BACKEND_DIR, "data", "server_images.ndjson"), "rb") as f:
+            records = [parse_line(line) for line in f if line.strip()]
+        assert {record.name for record in records} == {"Minecraft Java", "Counter-Strike 2", "Rust", "ARK Survival"}
+        assert all(not import_operation(record)._upsert for record in records)
+
+
+class TestStreaming:
+    """Test line splitting, batching and reports"""
+
+    @pytest.mark.asyncio
+    async def test_lines_split_across_chunks(self):
+        """Test lines are reassembled whatever the chunk boundaries"""
+        data = b'{"a": 1}\n\n{"b": 2}\r\n{"c": 3}'
+        lines = await collect(iter_lines(chunked(data, 3)))
+        assert [number for number, _ in lines] == [1, 3, 4]
+        assert json.loads(lines[1][1]) == {"b": 2}
+
+    @pytest.mark.asyncio
+    async def test_overlong_line_rejected(self):
+        """Test the read buffer is bounded"""
+        with pytest.raises(ValueError):
+            await collect(iter_lines(chunked(b"x" * 70000, 8192)))
+
+    @pytest.mark.asyncio
+    async def test_batches_and_summary(self):
+        """Test one bulk_write per batch, bad lines reported with line numbers"""
+        db = MagicMock()
+        db.game_servers.bulk_write = AsyncMock(side_effect=[bulk_result(upserted=2), bulk_result(matched=1, modified=1)])
+        data = ndjson(FULL, {**FULL, "name": "ARK"}, {"name": "Rust", "image": "x.jpg"}) + b"oops\n"
+
+        reports = await collect(import_servers(db, chunked(data, 10), batch_size=2))
+
+        assert db.game_servers.bulk_write.call_count == 2
+        assert [len(call.args[0]) for call in db.game_servers.bulk_write.call_args_list] == [2, 1]
+        assert reports[0]["inserted"] == 2 and reports[0]["docs_per_second"] > 0
+        assert reports[1]["updated"] == 1
+        assert reports[1]["error_details"][0]["line"] == 4
+        assert reports[-1]["summary"] is True
+        assert reports[-1]["batches"] == 2
+        assert reports[-1]["lines"] == 4 and reports[-1]["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_and_write_errors(self):
+        """Test unmatched patches and failed writes are counted separately"""
+        db = MagicMock()
+        db.game_servers.bulk_write = AsyncMock(side_effect=BulkWriteError({
+            "nUpserted": 0, "nMatched": 0, "nModified": 0,
+            "writeErrors": [{"index": 1, "code": 11000, "errmsg": "duplicate key"}],
+        }))
+        data = ndjson({"name": "Nope", "image": "x.jpg"}, FULL)
+        report = (await collect(import_servers(db, chunked(data, 1024))))[0]
+        assert report["missing"] == 1
+        assert report["errors"] == 1
+        assert report["error_details"] == [{"line": 2, "error": "duplicate key"}]
+
+    @pytest.mark.asyncio
+    async def test_export_chunks(self):
+        """Test export emits one chunk per batch of documents"""
+        cursor = MagicMock()
+        cursor.sort.return_value = cursor
+        cursor.batch_size.return_value = cursor
+        cursor.__aiter__.return_value = [{"name": f"S{i}", "price": "R$ 1,00"} for i in range(5)]
+        db = MagicMock()
+        db.game_servers.find.return_value = cursor
+
+        chunks = await collect(export_servers(db, batch_size=2))
+
+        assert len(chunks) == 3
+        assert json.loads(b"".join(chunks).splitlines()[4]) == {"name": "S4", "price": "R$ 1,00"}
+        assert db.game_servers.find.call_args.args[1]["_id"] == 0
+
+
+class TestImportEndpoints:
+    """Test the admin HTTP endpoints"""
+
+    def setup_method(self):
+        self.client = TestClient(app)
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+
+    def as_user(self, is_admin):
+        user = User(name="Ops", email="ops@example.com", is_admin=is_admin)
+        app.dependency_overrides[get_current_user] = lambda: user
+
+    def test_requires_admin(self):
+        """Test anonymous and non-admin callers are refused"""
+        assert self.client.get("/api/servers/export").status_code == 401
+        self.as_user(is_admin=False)
+        assert self.client.post("/api/servers/import", content=ndjson(FULL)).status_code == 403
+
+    def test_import_reports_batches_and_invalidates(self):
+        """Test the response has one report per batch plus a summary"""
+        self.as_user(is_admin=True)
+        db = MagicMock()
+        db.game_servers.bulk_write = AsyncMock(return_value=bulk_result(upserted=1))
+        with patch("routers.servers.db", db), patch("routers.servers.Database.invalidate_catalog") as invalidate:
+            response = self.client.post("/api/servers/import?batch_size=1", content=ndjson(FULL, FULL))
+
+        data = response.json()
+        assert [batch["batch"] for batch in data["batches"]] == [1, 2]
+        assert data["summary"]["inserted"] == 2
+        invalidate.assert_called_with("game_servers")
+
+    def test_import_failure(self):
+        """Test a database failure is a 500"""
+        self.as_user(is_admin=True)
+        db = MagicMock()
+        db.game_servers.bulk_write = AsyncMock(side_effect=RuntimeError("down"))
+        with patch("routers.servers.db", db):
+            response = self.client.post("/api/servers/import", content=ndjson(FULL))
+        assert response.status_code == 500
+
+    def test_export_streams_ndjson(self):
+        """Test export is served as an NDJSON attachment"""
+        self.as_user(is_admin=True)
+        with patch("routers.servers.export_servers", lambda db: chunked(ndjson(FULL, FULL), 10)):
+            response = self.client.get("/api/servers/export")
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert [json.loads(line) for line in response.text.splitlines()] == [FULL, FULL]
+
+
+class TestImportAgainstMongo:
+    """Test an import/export round trip against a real MongoDB server"""
+
+    @pytest.mark.asyncio
+    async def test_round_trip(self, mongo_db):
+        """Test export output re-imports as a no-op and patches apply"""
+        await run_migrations(mongo_db)
+        servers = [{**FULL, "name": f"Server {i:03d}"} for i in range(25)]
+        await collect(import_servers(mongo_db, chunked(ndjson(*servers), 100), batch_size=10))
+        assert await mongo_db.game_servers.count_documents({}) == 25
+
+        exported = b"".join(await collect(export_servers(mongo_db, batch_size=7)))
+        assert len(exported.splitlines()) == 25
+
+        patch_line = ndjson({"name": "Server 003", "price": "R$ 9,90"}, {"name": "Ghost", "image": "x"})
+        summary = (await collect(import_servers(mongo_db, chunked(patch_line, 100))))[-1]
+        assert summary["updated"] == 1 and summary["missing"] == 1
+        server = await mongo_db.game_servers.find_one({"name": "Server 003"})
+        assert server["price_cents"] == 990
+        assert server["id"] == natural_id("game_servers", {"name": "Server 003"})
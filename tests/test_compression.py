@@ -0,0 +1,101 @@
+"""
+Test negotiated response compression
+"""
+import gzip
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from compression import CompressionMiddleware, parse_accept_encoding
+from metrics import registry
+
+
+def build_app(**options):
+    app = FastAPI()
+
+    @app.get("/large")
+    async def large():
+        return {"instances": [{"name": f"server-{i}", "status": "online"} for i in range(200)]}
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/events")
+    async def events():
+        async def stream():
+            for i in range(3):
+                yield f"data: {'x' * 2000}{i}\n\n"
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    app.add_middleware(CompressionMiddleware, **options)
+    return app
+
+
+class TestCompressionMiddleware:
+    """Test compression negotiation and skipping rules"""
+
+    def setup_method(self):
+        registry.reset()
+        self.client = TestClient(build_app(minimum_size=500, algorithms=["gzip"]))
+
+    def test_parse_accept_encoding(self):
+        """Test q-values are parsed"""
+        assert parse_accept_encoding("gzip;q=0.5, br, identity;q=0") == {
+            "gzip": 0.5, "br": 1.0, "identity": 0.0
+        }
+
+    def test_large_response_is_gzipped(self):
+        """Test large JSON responses are compressed"""
+        response = self.client.get("/large", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert len(response.json()["instances"]) == 200
+
+    def test_small_response_is_not_compressed(self):
+        """Test responses under the threshold are sent as-is"""
+        response = self.client.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert registry.get(
+            "http_compression_skipped_total", route="/small", reason="below_minimum_size"
+        ) == 1
+
+    def test_event_stream_is_not_compressed(self):
+        """Test SSE channels bypass compression"""
+        response = self.client.get("/events", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert "data: " in response.text
+
+    def test_refused_encoding(self):
+        """Test q=0 disables an encoding"""
+        response = self.client.get("/large", headers={"Accept-Encoding": "gzip;q=0"})
+        assert "content-encoding" not in response.headers
+
+    def test_metrics_per_route(self):
+        """Test bytes saved and CPU time are recorded per route"""
+        self.client.get("/large", headers={"Accept-Encoding": "gzip"})
+        bytes_in = registry.get("http_compression_bytes_in_total", route="/large", encoding="gzip")
+        bytes_out = registry.get("http_compression_bytes_out_total", route="/large", encoding="gzip")
+        assert bytes_in > bytes_out > 0
+        assert registry.get(
+            "http_compression_bytes_saved_total", route="/large", encoding="gzip"
+        ) == bytes_in - bytes_out
+
+    def test_raw_body_is_valid_gzip(self):
+        """Test the wire payload decodes with the standard library"""
+        with self.client.stream("GET", "/large", headers={"Accept-Encoding": "gzip"}) as response:
+            raw = b"".join(response.iter_raw())
+        assert gzip.decompress(raw).startswith(b'{"instances"')
+
+    def test_brotli_preferred_when_available(self):
+        """Test server preference order picks brotli first"""
+        pytest.importorskip("brotli")
+        client = TestClient(build_app(minimum_size=500, algorithms=["br", "gzip"]))
+        response = client.get("/large", headers={"Accept-Encoding": "gzip, br"})
+        assert response.headers["content-encoding"] == "br"
@@ -0,0 +1,131 @@
+"""
+Test ETags and conditional GETs on catalog and AMP instance routes
+"""
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi.testclient import TestClient
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from server import app
+from amp_client import instances_cache
+from conditional import cached_body, etag_matches
+from database import catalog_cache
+from metrics import registry
+from security import get_current_user
+
+
+def mock_feed(items):
+    collection = MagicMock()
+    collection.find_one = AsyncMock(return_value={"items": items})
+    return collection
+
+
+TESTIMONIAL = {
+    "id": "t1",
+    "name": "Pedro Silva",
+    "role": "Admin do servidor",
+    "content": "Ótimo suporte",
+    "avatar": "avatar.png",
+    "rating": 5,
+    "approved": True,
+    "created_at": datetime(2024, 1, 1),
+}
+
+
+class TestEtagMatching:
+    """Test If-None-Match parsing"""
+
+    def test_weak_comparison(self):
+        """Test lists, weak tags and the wildcard"""
+        etag = cached_body(b"{}").etag
+        assert etag_matches(etag, etag)
+        assert etag_matches(f'"other", W/{etag}', etag)
+        assert etag_matches(etag, "W/" + etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches('"other"', etag)
+
+    def test_same_content_same_tag(self):
+        """Test every worker derives the same tag for the same bytes"""
+        assert cached_body(b'{"a":1}').etag == cached_body(b'{"a":1}').etag
+        assert cached_body(b'{"a":1}').etag != cached_body(b'{"a":2}').etag
+
+
+class TestConditionalRoutes:
+    """Test 304 answers come from the cache without loading"""
+
+    def setup_method(self):
+        registry.reset()
+        catalog_cache.invalidate()
+        instances_cache.invalidate()
+        self.client = TestClient(app)
+
+    def test_testimonials_not_modified(self):
+        """Test a matching If-None-Match gets an empty 304 and is counted"""
+        mock_db = MagicMock()
+        mock_db.feeds = mock_feed([TESTIMONIAL])
+        with patch("routers.general.db", mock_db):
+            first = self.client.get("/api/testimonials")
+            second = self.client.get("/api/testimonials", headers={"If-None-Match": first.headers["etag"]})
+            changed = self.client.get("/api/testimonials", headers={"If-None-Match": '"stale"'})
+
+        assert first.status_code == 200
+        assert first.headers["cache-control"] == "no-cache"
+        assert "last-modified" in first.headers
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["etag"] == first.headers["etag"]
+        assert changed.status_code == 200
+        assert mock_db.feeds.find_one.await_count == 1
+
+        route = "/api/testimonials"
+        assert registry.get("http_conditional_requests_total", route=route, result="not_modified") == 1
+        assert registry.get("http_conditional_requests_total", route=route, result="modified") == 1
+        assert registry.get("http_conditional_requests_total", route=route, result="unconditional") == 1
+        assert registry.get("http_not_modified_bytes_saved_total", route=route) == len(first.content)
+
+    def test_if_modified_since(self):
+        """Test Last-Modified is honoured when no ETag is sent"""
+        mock_db = MagicMock()
+        mock_db.feeds = mock_feed([TESTIMONIAL])
+        with patch("routers.general.db", mock_db):
+            first = self.client.get("/api/testimonials")
+            second = self.client.get(
+                "/api/testimonials", headers={"If-Modified-Since": first.headers["last-modified"]}
+            )
+        assert second.status_code == 304
+
+    def test_compressed_responses_use_weak_tags(self):
+        """Test compression weakens the tag and the weak tag still revalidates"""
+        mock_db = MagicMock()
+        mock_db.feeds = mock_feed([{**TESTIMONIAL, "id": f"t{i}"} for i in range(50)])
+        with patch("routers.general.db", mock_db):
+            first = self.client.get("/api/testimonials", headers={"Accept-Encoding": "gzip"})
+            second = self.client.get(
+                "/api/testimonials",
+                headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["etag"]}
+            )
+        assert first.headers["content-encoding"] == "gzip"
+        assert first.headers["etag"].startswith('W/"')
+        assert second.status_code == 304
+
+    def test_amp_instances_not_modified_without_amp_call(self):
+        """Test the instance list revalidates without calling AMP"""
+        amp = MagicMock()
+        amp.get_instances.return_value = [{"InstanceID": "abc", "Running": True}]
+        app.dependency_overrides[get_current_user] = lambda: None
+        try:
+            with patch("routers.servers.get_amp_client", return_value=amp):
+                first = self.client.get("/api/amp/instances")
+                second = self.client.get("/api/amp/instances", headers={"If-None-Match": first.headers["etag"]})
+                self.client.post("/api/amp/instances/abc/stop")
+                third = self.client.get("/api/amp/instances", headers={"If-None-Match": first.headers["etag"]})
+        finally:
+            app.dependency_overrides.clear()
+
+        assert second.status_code == 304
+        assert amp.get_instances.call_count == 2
+        # Same content after the stop command: still not modified
+        assert third.status_code == 304
@@ -0,0 +1,69 @@
+"""
+Test the shared MongoDB client and its pool instrumentation
+"""
+from types import SimpleNamespace
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import database
+import security
+from database import MongoConnection, PoolMetricsListener, create_client
+from metrics import registry
+
+
+class TestMongoConnection:
+    """Test client lifecycle"""
+
+    def test_connect_is_idempotent_and_close_resets(self):
+        """Test one client per connection owner"""
+        connection = MongoConnection()
+        first = connection.connect("mongodb://localhost:27017", "lifecycle_test")
+        client = connection.client
+        assert connection.connect() is first
+        assert connection.client is client
+        connection.close()
+        assert connection.client is None
+
+    def test_pool_settings_come_from_config(self):
+        """Test the factory applies pool options"""
+        client = create_client("mongodb://localhost:27017", maxPoolSize=7, minPoolSize=1)
+        try:
+            assert client.options.pool_options.max_pool_size == 7
+            assert client.options.pool_options.min_pool_size == 1
+        finally:
+            client.close()
+
+    def test_security_uses_shared_database(self):
+        """Test security.py no longer owns a separate client"""
+        assert security.db is database.db
+        assert not hasattr(security, "client")
+
+
+class TestPoolMetricsListener:
+    """Test checkout wait time recording"""
+
+    def setup_method(self):
+        registry.reset()
+
+    def test_checkout_wait_and_usage(self):
+        """Test a checkout records its wait and the checked-out gauge"""
+        listener = PoolMetricsListener()
+        event = SimpleNamespace(address=("localhost", 27017), connection_id=1, reason="timeout")
+        listener.connection_check_out_started(event)
+        listener.connection_checked_out(event)
+        assert registry.get("mongo_pool_checked_out") == 1
+        listener.connection_checked_in(event)
+        assert registry.get("mongo_pool_checked_out") == 0
+
+        waits = registry.snapshot()["histograms"]["mongo_pool_checkout_wait_seconds"][0]
+        assert waits["count"] == 1
+
+    def test_failed_checkout_is_counted(self):
+        """Test failed checkouts are counted by reason"""
+        listener = PoolMetricsListener()
+        event = SimpleNamespace(address=("localhost", 27017), reason="timeout")
+        listener.connection_check_out_started(event)
+        listener.connection_check_out_failed(event)
+        assert registry.get("mongo_pool_checkout_failures_total", reason="timeout") == 1
@@ -0,0 +1,182 @@
+"""
+Test the change-stream cache invalidation bus
+"""
+import asyncio
+import pytest
+from pymongo.errors import AutoReconnect, OperationFailure
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import invalidation
+from invalidation import InvalidationBus, invalidation_bus
+from database import catalog_cache, dashboard_stats_cache
+
+
+def change(collection, token, operation="update"):
+    return {"_id": {"_data": token}, "operationType": operation, "ns": {"db": "app", "coll": collection}}
+
+
+class FakeStream:
+    """Change stream replaying a script of changes, idle polls (None) and errors"""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.alive = True
+        self.resume_token = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def try_next(self):
+        if not self.script:
+            self.alive = False
+            return None
+        item = self.script.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        if item is not None:
+            self.resume_token = item["_id"]
+        return item
+
+
+class FakeDatabase:
+    """Hands out one FakeStream per watch() and records the resume tokens used"""
+
+    def __init__(self, *scripts):
+        self.scripts = list(scripts)
+        self.resumed_from = []
+
+    def watch(self, pipeline, full_document=None, resume_after=None):
+        self.resumed_from.append(resume_after)
+        if not self.scripts:
+            return FakeStream([OperationFailure("not a replica set", code=invalidation.NOT_A_REPLICA_SET)])
+        return FakeStream(self.scripts.pop(0))
+
+
+def recording_bus():
+    bus = InvalidationBus()
+    seen = []
+    for collection in bus.collections:
+        bus.subscribe(collection, lambda event, collection=collection: seen.append((collection, event)))
+    return bus, seen
+
+
+class TestDispatch:
+    """Test routing of change events to handlers"""
+
+    def test_routes_by_collection(self):
+        """Test only the changed collection's handlers run"""
+        bus, seen = recording_bus()
+        bus.dispatch(change("pricing_plans", "1"))
+        assert [collection for collection, _ in seen] == ["pricing_plans"]
+
+    def test_failing_handler_does_not_block_others(self):
+        """Test one broken handler doesn't stop eviction elsewhere"""
+        bus = InvalidationBus()
+        calls = []
+        bus.subscribe("users", lambda event: 1 / 0)
+        bus.subscribe("users", calls.append)
+        bus.dispatch(change("users", "1"))
+        assert len(calls) == 1
+
+    def test_unwatched_collection_rejected(self):
+        """Test subscribing to a collection the stream ignores is an error"""
+        with pytest.raises(ValueError):
+            InvalidationBus().subscribe("support_requests", lambda event: None)
+
+    def test_shared_caches_are_subscribed(self):
+        """Test a catalog change evicts this worker's cached responses"""
+        catalog_cache.set("game_servers", b"stale")
+        catalog_cache.set("pricing_plans", b"plans")
+        dashboard_stats_cache.set("stats", [])
+        invalidation_bus.dispatch(change("game_servers", "1"))
+        assert catalog_cache.get("game_servers") is None
+        assert dashboard_stats_cache.get("stats") is None
+        assert catalog_cache.get("pricing_plans") == b"plans"
+
+
+class TestStreamLifecycle:
+    """Test resuming, flushing and giving up"""
+
+    def setup_method(self):
+        invalidation.RETRY_DELAY_SECONDS = 0
+        self.bus, self.seen = recording_bus()
+
+    def teardown_method(self):
+        invalidation.RETRY_DELAY_SECONDS = 0.5
+
+    @pytest.mark.asyncio
+    async def test_resumes_after_disconnect_without_flushing(self):
+        """Test a dropped stream resumes from the last token"""
+        database = FakeDatabase(
+            [None, change("game_servers", "a"), AutoReconnect("connection reset")],
+            [change("testimonials", "b")],
+        )
+        await self.bus._run(database)
+
+        assert database.resumed_from[:2] == [None, {"_data": "a"}]
+        flushes = [collection for collection, event in self.seen if event is None]
+        # One flush when the first stream opened; the resumed stream missed nothing
+        assert len(flushes) == len(self.bus.collections)
+        assert [collection for collection, event in self.seen if event] == ["game_servers", "testimonials"]
+
+    @pytest.mark.asyncio
+    async def test_lost_history_flushes(self):
+        """Test an unusable resume token restarts from now and drops everything"""
+        self.bus.resume_token = {"_data": "old"}
+        database = FakeDatabase(
+            [OperationFailure("history lost", code=286)],
+            [None],
+        )
+        await self.bus._run(database)
+
+        assert database.resumed_from[:2] == [{"_data": "old"}, None]
+        assert any(event is None for _, event in self.seen)
+
+    @pytest.mark.asyncio
+    async def test_standalone_server_stops_the_bus(self):
+        """Test the bus gives up quietly without a replica set"""
+        database = FakeDatabase()
+        await asyncio.wait_for(self.bus._run(database), timeout=1)
+        assert database.resumed_from == [None]
+        assert self.seen == []
+
+
+class TestAgainstReplicaSet:
+    """Test against a real single-node replica set (see invalidation.py)"""
+
+    @pytest.mark.asyncio
+    async def test_write_reaches_subscribers_and_resumes(self, mongo_db):
+        """Test a write is seen by the stream, including one made while it was down"""
+        hello = await mongo_db.client.admin.command("hello")
+        if "setName" not in hello:
+            pytest.skip("MongoDB server is not a replica set")
+
+        bus, seen = recording_bus()
+
+        async def wait_for(predicate):
+            for _ in range(100):
+                if predicate():
+                    return
+                await asyncio.sleep(0.05)
+            raise AssertionError("timed out waiting for change stream")
+
+        bus.start(mongo_db)
+        await wait_for(lambda: bus.connected)
+        await mongo_db.game_servers.insert_one({"id": "s1", "name": "Rust"})
+        await wait_for(lambda: any(event and collection == "game_servers" for collection, event in seen))
+        await bus.stop()
+
+        seen.clear()
+        await mongo_db.pricing_plans.insert_one({"id": "p1", "name": "Apprentice"})
+        bus.start(mongo_db)
+        try:
+            await wait_for(lambda: any(event and collection == "pricing_plans" for collection, event in seen))
+        finally:
+            await bus.stop()
+        assert all(event is not None for _, event in seen)
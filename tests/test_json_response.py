@@ -0,0 +1,78 @@
+"""
+Test the app-wide orjson response class keeps response shapes unchanged
+"""
+import uuid
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from server import app
+from amp_client import instances_cache
+from models import GameServer, GameServerResponse
+from security import get_current_user
+from serialization import FastJSONResponse
+
+
+def default_render(content):
+    """What FastAPI's stock JSONResponse sends for the same route result"""
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+class TestFastJSONResponse:
+    """Test orjson rendering against jsonable_encoder + stdlib json"""
+
+    def test_app_uses_fast_response_class(self):
+        """Test the class is installed as the app default"""
+        assert app.router.default_response_class is FastJSONResponse
+
+    def test_bytes_match_stock_response(self):
+        """Test datetimes, UUIDs, unicode, sets and non-string keys encode identically"""
+        payloads = [
+            {"servers": [{"name": "Minecraft", "price": "R$ 15,90", "period": "/mês", "rating": 4.5}]},
+            {"created_at": datetime(2024, 1, 1, 12, 30, 15, 123456)},
+            {"expires_at": datetime(2024, 1, 1, tzinfo=timezone.utc)},
+            {"id": uuid.UUID(int=7), "tags": ["a", None, True]},
+            {1: "one", "nested": {"empty": [], "zero": 0}},
+        ]
+        for payload in payloads:
+            assert FastJSONResponse(payload).body == default_render(payload)
+
+    def test_model_dump_matches_response_model_path(self):
+        """Test a serialized response model renders the same bytes"""
+        server = GameServer(
+            name="Rust", players="10-200", price="R$ 29,90", ram="4GB",
+            storage="25GB SSD", image="rust.jpg", created_at=datetime(2024, 1, 1)
+        )
+        content = GameServerResponse(servers=[server]).model_dump(mode="json")
+        assert FastJSONResponse(content).body == default_render(content)
+
+    def test_amp_instance_list_shape(self):
+        """Test the AMP instance list keeps its envelope"""
+        instances = [{"InstanceID": "abc", "FriendlyName": "Survival", "Running": True, "Metrics": {"CPU": 12.5}}]
+        amp = MagicMock()
+        amp.get_instances.return_value = instances
+        instances_cache.invalidate()
+        app.dependency_overrides[get_current_user] = lambda: None
+        try:
+            with patch("routers.servers.get_amp_client", return_value=amp):
+                response = TestClient(app).get("/api/amp/instances")
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.headers["content-type"] == "application/json"
+        assert response.content == default_render(
+            {"success": True, "message": "Found 1 instances", "instances": instances}
+        )
+
+    def test_error_responses_unchanged(self):
+        """Test HTTPException bodies still use FastAPI's handler"""
+        with patch("database.Database.get_dashboard_stats", AsyncMock(side_effect=RuntimeError("down"))):
+            response = TestClient(app).get("/api/dashboard/stats")
+        assert response.status_code == 500
+        assert response.json() == {"detail": "Internal server error"}
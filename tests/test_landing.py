@@ -0,0 +1,90 @@
+"""
+Test the combined landing-page endpoint
+"""
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi.testclient import TestClient
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from server import app
+from database import Database, catalog_cache, dashboard_stats_cache
+
+
+SERVER = {
+    "id": "s1", "name": "Rust", "players": "10-200", "price": "R$ 29,90", "ram": "4GB",
+    "storage": "25GB SSD", "status": "online", "image": "rust.jpg", "created_at": datetime(2024, 1, 1),
+}
+PLAN = {
+    "id": "p1", "name": "Apprentice", "price": "R$ 19,90", "description": "Plano inicial",
+    "features": ["2GB RAM"], "created_at": datetime(2024, 1, 1),
+}
+TESTIMONIAL = {
+    "id": "t1", "name": "Pedro", "role": "Admin", "content": "Ótimo", "avatar": "a.png",
+    "approved": True, "created_at": datetime(2024, 1, 1),
+}
+STATS = [{"title": "Servidores Ativos", "value": "1", "change": "+0%", "trend": "up"}]
+
+
+def mock_collection(docs):
+    cursor = MagicMock()
+    cursor.sort.return_value = cursor
+    cursor.limit.return_value = cursor
+    cursor.to_list = AsyncMock(return_value=docs)
+    collection = MagicMock()
+    collection.find.return_value = cursor
+    return collection
+
+
+class TestLandingEndpoint:
+    """Test sections, cache metadata and partial failures"""
+
+    def setup_method(self):
+        catalog_cache.invalidate()
+        dashboard_stats_cache.invalidate()
+        self.client = TestClient(app)
+        self.servers_db = MagicMock()
+        self.servers_db.game_servers = mock_collection([SERVER])
+        self.general_db = MagicMock()
+        self.general_db.pricing_plans = mock_collection([PLAN])
+        self.general_db.feeds.find_one = AsyncMock(return_value={"items": [TESTIMONIAL]})
+
+    def get(self, stats=None, **kwargs):
+        stats = stats or AsyncMock(return_value={"online": 1})
+        with patch("routers.servers.db", self.servers_db), patch("routers.general.db", self.general_db), \
+                patch.object(Database, "count_servers_by_status", stats):
+            return self.client.get("/api/landing", **kwargs)
+
+    def test_sections_match_individual_routes(self):
+        """Test each section is what its own route returns"""
+        data = self.get().json()
+        with patch("routers.servers.db", self.servers_db), patch("routers.general.db", self.general_db):
+            assert data["servers"] == self.client.get("/api/servers").json()
+            assert data["pricing_plans"] == self.client.get("/api/pricing-plans").json()
+            assert data["testimonials"] == self.client.get("/api/testimonials").json()
+        assert data["dashboard_stats"]["stats"][0]["value"] == "1"
+
+    def test_cache_metadata(self):
+        """Test the first load reports misses and the second hits"""
+        first = self.get().json()["cache"]
+        second = self.get().json()["cache"]
+        assert not any(section["cached"] for section in first.values())
+        assert all(section["cached"] for section in second.values())
+        assert second["servers"]["etag"].startswith('"')
+        assert self.servers_db.game_servers.find.call_count == 1
+
+    def test_failed_section_does_not_fail_the_page(self):
+        """Test a broken section is null and flagged"""
+        data = self.get(stats=AsyncMock(side_effect=RuntimeError("down"))).json()
+        assert data["dashboard_stats"] is None
+        assert data["cache"]["dashboard_stats"] == {"error": True}
+        assert data["servers"]["servers"][0]["name"] == "Rust"
+
+    def test_not_modified(self):
+        """Test the bundle revalidates with its weak ETag"""
+        first = self.get()
+        second = self.get(headers={"If-None-Match": first.headers["etag"]})
+        assert first.headers["etag"].startswith('W/"')
+        assert second.status_code == 304
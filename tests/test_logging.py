@@ -0,0 +1,91 @@
+"""
+Test structured logging, sampling and request ID propagation
+"""
+import json
+import logging
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from config import LOG_SAMPLE_RATES
+from logging_config import (
+    JSONFormatter, SamplingFilter, RequestContextMiddleware,
+    get_request_id, parse_sample_rates
+)
+
+
+def make_record(name="amp_client", level=logging.INFO, msg="Getting status for %s", args=("abc",), **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+class TestJSONFormatter:
+    """Test JSON rendering of records"""
+
+    def test_format_includes_request_id_and_extras(self):
+        """Test the message is interpolated and extras are kept"""
+        record = make_record(request_id="req-1", duration_ms=12.5)
+        entry = json.loads(JSONFormatter().format(record))
+        assert entry["message"] == "Getting status for abc"
+        assert entry["request_id"] == "req-1"
+        assert entry["duration_ms"] == 12.5
+        assert entry["logger"] == "amp_client"
+
+
+class TestSamplingFilter:
+    """Test per-logger sampling"""
+
+    def test_parse_sample_rates(self):
+        """Test sample rate configuration parsing"""
+        assert parse_sample_rates("amp_client=0.1, access=1") == {"amp_client": 0.1, "access": 1.0}
+
+    def test_zero_rate_drops_info(self):
+        """Test a zero rate drops INFO records for the logger and its children"""
+        sampler = SamplingFilter({"amp_client": 0.0})
+        assert not sampler.filter(make_record())
+        assert not sampler.filter(make_record(name="amp_client.requests"))
+        assert sampler.filter(make_record(name="routers.auth"))
+
+    def test_warnings_are_never_sampled(self):
+        """Test WARNING and above always pass"""
+        sampler = SamplingFilter({"amp_client": 0.0})
+        assert sampler.filter(make_record(level=logging.WARNING))
+
+    def test_default_rates_keep_instance_actions(self):
+        """Test the default only samples AMP polling, not AMP INFO events"""
+        sampler = SamplingFilter(parse_sample_rates(LOG_SAMPLE_RATES))
+        with patch("logging_config.random.random", return_value=0.5):
+            assert sampler.filter(make_record(msg="Starting instance %s"))
+            assert not sampler.filter(make_record(name="amp_client.poll", level=logging.DEBUG))
+
+
+class TestRequestContextMiddleware:
+    """Test request ID assignment"""
+
+    def setup_method(self):
+        app = FastAPI()
+
+        @app.get("/whoami")
+        async def whoami():
+            return {"request_id": get_request_id()}
+
+        app.add_middleware(RequestContextMiddleware)
+        self.client = TestClient(app)
+
+    def test_generates_request_id(self):
+        """Test a new ID is generated and echoed"""
+        response = self.client.get("/whoami")
+        assert response.headers["x-request-id"] == response.json()["request_id"]
+        assert len(response.json()["request_id"]) == 32
+
+    def test_reuses_incoming_request_id(self):
+        """Test an upstream X-Request-ID is propagated"""
+        response = self.client.get("/whoami", headers={"X-Request-ID": "edge-123"})
+        assert response.json()["request_id"] == "edge-123"
+        assert response.headers["x-request-id"] == "edge-123"
@@ -0,0 +1,42 @@
+"""
+Test access to the metrics endpoint
+"""
+from fastapi.testclient import TestClient
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from server import app
+from metrics import registry
+from models import User
+from security import get_current_user
+
+
+class TestMetricsEndpoint:
+    """Test metrics are only served to admins"""
+
+    def setup_method(self):
+        registry.reset()
+        self.client = TestClient(app)
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+
+    def as_user(self, is_admin):
+        user = User(name="Ops", email="ops@example.com", is_admin=is_admin)
+        app.dependency_overrides[get_current_user] = lambda: user
+
+    def test_anonymous_and_non_admin_are_refused(self):
+        """Test traffic and internals are not public"""
+        assert self.client.get("/api/metrics").status_code == 401
+        self.as_user(is_admin=False)
+        assert self.client.get("/api/metrics").status_code == 403
+
+    def test_admin_gets_snapshot(self):
+        """Test admins read the registry snapshot"""
+        registry.inc("cache_requests_total", cache="users", result="hit")
+        self.as_user(is_admin=True)
+        response = self.client.get("/api/metrics")
+        assert response.status_code == 200
+        assert "cache_requests_total" in response.json()["counters"]
@@ -0,0 +1,158 @@
+"""
+Test index migrations and the query plans of hot lookups
+"""
+import pytest
+from datetime import datetime, timedelta
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from migrations import MIGRATIONS, MIGRATIONS_COLLECTION, applied_versions, run_migrations
+
+
+def plan_stages(plan):
+    """Yield every stage of an explain() winning plan"""
+    yield plan
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from plan_stages(child)
+
+
+async def used_index(collection, query):
+    """Name of the index the winning plan scans, or None for a collection scan"""
+    explained = await collection.find(query).explain()
+    winning = explained["queryPlanner"]["winningPlan"]
+    for stage in plan_stages(winning):
+        if stage.get("stage") == "IXSCAN":
+            return stage["indexName"]
+    return None
+
+
+class TestMigrationDeclarations:
+    """Test the migration list itself"""
+
+    def test_versions_are_unique_and_increasing(self):
+        """Test migrations are declared in version order"""
+        versions = [migration.version for migration in MIGRATIONS]
+        assert versions == sorted(set(versions))
+
+    def test_users_email_is_unique(self):
+        """Test users.email is declared unique"""
+        users_indexes = MIGRATIONS[0].indexes["users"]
+        email_index = next(index for index in users_indexes if index.document["name"] == "email_unique")
+        assert email_index.document["unique"] is True
+
+
+class TestMigrationRunner:
+    """Test migrations against a real MongoDB server"""
+
+    @pytest.mark.asyncio
+    async def test_run_is_idempotent(self, mongo_db):
+        """Test a second run applies nothing"""
+        first = await run_migrations(mongo_db)
+        second = await run_migrations(mongo_db)
+        assert first == [migration.version for migration in MIGRATIONS]
+        assert second == []
+        assert await applied_versions(mongo_db) == first
+        assert await mongo_db[MIGRATIONS_COLLECTION].count_documents({}) == len(MIGRATIONS)
+
+    @pytest.mark.asyncio
+    async def test_hot_queries_use_indexes(self, mongo_db):
+        """Test hot lookups are index scans, not collection scans"""
+        await run_migrations(mongo_db)
+        now = datetime.utcnow()
+        await mongo_db.users.insert_one({"id": "u1", "email": "a@example.com"})
+        await mongo_db.game_servers.insert_one({"id": "s1", "name": "Rust"})
+        await mongo_db.password_reset_tokens.insert_one(
+            {"token": "t1", "user_id": "u1", "used": False, "expires_at": now + timedelta(hours=1)}
+        )
+        await mongo_db.email_verification_tokens.insert_one(
+            {"token": "t2", "user_id": "u1", "expires_at": now + timedelta(hours=1)}
+        )
+
+        assert await used_index(mongo_db.users, {"email": "a@example.com"}) == "email_unique"
+        assert await used_index(mongo_db.users, {"id": "u1"}) == "id_unique"
+        assert await used_index(mongo_db.game_servers, {"id": "s1"}) == "id_unique"
+        assert await used_index(
+            mongo_db.password_reset_tokens,
+            {"token": "t1", "used": False, "expires_at": {"$gt": now}}
+        ) == "token_unique"
+        assert await used_index(
+            mongo_db.email_verification_tokens, {"token": "t2", "expires_at": {"$gt": now}}
+        ) == "token_unique"
+        assert await used_index(
+            mongo_db.password_reset_tokens, {"user_id": "u1", "used": False}
+        ) == "user_id_used"
+
+    @pytest.mark.asyncio
+    async def test_seed_natural_keys_use_indexes(self, mongo_db):
+        """Test every seed upsert filter is an index lookup"""
+        await run_migrations(mongo_db)
+        await mongo_db.pricing_plans.insert_one({"id": "p1", "name": "Sorcerer"})
+        await mongo_db.testimonials.insert_one({"id": "t1", "name": "Ana", "role": "Admin"})
+
+        assert await used_index(mongo_db.pricing_plans, {"name": "Sorcerer"}) == "name"
+        assert await used_index(mongo_db.testimonials, {"name": "Ana", "role": "Admin"}) == "name_role"
+        assert await used_index(mongo_db.game_servers, {"name": "Rust"}) == "name_id"
+
+    @pytest.mark.asyncio
+    async def test_catalog_pages_use_keyset_indexes(self, mongo_db):
+        """Test filtered catalog pages are index scans sorted by the index"""
+        await run_migrations(mongo_db)
+        await mongo_db.game_servers.insert_many(
+            [{"id": f"s{i}", "name": f"Server {i}", "status": "online"} for i in range(50)]
+        )
+        query = {"status": "online", "name": {"$regex": "^Server"}}
+        explained = await mongo_db.game_servers.find(query).sort([("name", 1), ("id", 1)]).limit(10).explain()
+        stages = [stage.get("stage") for stage in plan_stages(explained["queryPlanner"]["winningPlan"])]
+        assert "IXSCAN" in stages
+        assert "SORT" not in stages
+
+    @pytest.mark.asyncio
+    async def test_numeric_backfill_and_range_query(self, mongo_db):
+        """Test legacy documents get numeric fields and range queries use an index"""
+        await mongo_db.game_servers.insert_many([
+            {"id": "s1", "name": "ARK", "price": "R$ 25,90", "ram": "6GB", "storage": "50GB SSD", "players": "2-70"},
+            {"id": "s2", "name": "Rust", "price": "R$ 35,90", "ram": "8GB", "storage": "40GB SSD", "players": "10-200"},
+            {"id": "s3", "name": "Terraria", "price": "R$ 9,90", "ram": "1GB", "storage": "5GB SSD", "players": "1-8"},
+        ])
+        await mongo_db.pricing_plans.insert_one({"id": "p1", "name": "Apprentice", "price": "R$ 19,90"})
+        await run_migrations(mongo_db)
+
+        ark = await mongo_db.game_servers.find_one({"id": "s1"})
+        assert (ark["price_cents"], ark["ram_mb"], ark["storage_gb"]) == (2590, 6144, 50)
+        assert (ark["players_min"], ark["players_max"]) == (2, 70)
+        plan = await mongo_db.pricing_plans.find_one({"id": "p1"})
+        assert plan["price_cents"] == 1990
+
+        query = {"price_cents": {"$lte": 3000}, "ram_mb": {"$gte": 4096}}
+        assert await mongo_db.game_servers.distinct("id", query) == ["s1"]
+        assert await used_index(mongo_db.game_servers, query) is not None
+
+    @pytest.mark.asyncio
+    async def test_token_expiry_ttl_and_used_token_purge(self, mongo_db):
+        """Test token collections get a TTL index and used tokens are purged"""
+        await mongo_db.password_reset_tokens.insert_many([
+            {"token": "used", "used": True, "expires_at": datetime.utcnow() + timedelta(hours=1)},
+            {"token": "live", "used": False, "expires_at": datetime.utcnow() + timedelta(hours=1)},
+        ])
+        await run_migrations(mongo_db)
+
+        for collection in (mongo_db.password_reset_tokens, mongo_db.email_verification_tokens):
+            indexes = await collection.index_information()
+            assert indexes["expires_at_ttl"]["expireAfterSeconds"] == 0
+        remaining = await mongo_db.password_reset_tokens.distinct("token")
+        assert remaining == ["live"]
+
+    @pytest.mark.asyncio
+    async def test_duplicate_email_is_rejected(self, mongo_db):
+        """Test the unique email index blocks duplicate registrations"""
+        from pymongo.errors import DuplicateKeyError
+
+        await run_migrations(mongo_db)
+        await mongo_db.users.insert_one({"id": "u1", "email": "dup@example.com"})
+        with pytest.raises(DuplicateKeyError):
+            await mongo_db.users.insert_one({"id": "u2", "email": "dup@example.com"})
@@ -0,0 +1,210 @@
+"""
+Test MongoDB command monitoring, per-request DB time and scan detection
+"""
+import asyncio
+import contextvars
+import os
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from database import create_client
+from logging_config import RequestContextMiddleware
+from metrics import registry
+from mongo_monitoring import (
+    CollectionScanDetector, CommandMetricsListener, RequestDbStats,
+    db_stats_var, docs_returned, query_shape
+)
+
+CONNECTION = ("localhost", 27017)
+
+
+def run_command(listener, command_name, command, duration_ms=1.0, reply=None, request_id=1, fail=False):
+    """Feed the listener the events the driver emits for one command"""
+    listener.started(SimpleNamespace(
+        command_name=command_name, command=command, database_name="app",
+        connection_id=CONNECTION, request_id=request_id
+    ))
+    finished = SimpleNamespace(
+        command_name=command_name, connection_id=CONNECTION, request_id=request_id,
+        duration_micros=int(duration_ms * 1000), reply=reply or {"ok": 1}
+    )
+    (listener.failed if fail else listener.succeeded)(finished)
+
+
+def find_reply(count):
+    return {"cursor": {"firstBatch": [{}] * count, "id": 0}, "ok": 1}
+
+
+class TestCommandHelpers:
+    """Test filter shapes and reply parsing"""
+
+    def test_query_shape_hides_values(self):
+        """Test values become "?" while fields and operators stay"""
+        query = {"status": "online", "$or": [{"price_cents": {"$lt": 1000}}, {"name": "Rust"}], "id": {"$in": ["a", "b"]}}
+        assert query_shape(query) == {
+            "status": "?", "$or": [{"price_cents": {"$lt": "?"}}, {"name": "?"}], "id": {"$in": "?"}
+        }
+
+    def test_docs_returned(self):
+        """Test documents are counted from cursor batches and distinct values"""
+        assert docs_returned("find", find_reply(3)) == 3
+        assert docs_returned("getMore", {"cursor": {"nextBatch": [{}, {}]}}) == 2
+        assert docs_returned("distinct", {"values": ["a", "b"]}) == 2
+        assert docs_returned("insert", {"n": 5}) == 0
+
+
+class TestCommandMetricsListener:
+    """Test metrics, request accumulation and the slow-query log"""
+
+    def setup_method(self):
+        registry.reset()
+        self.listener = CommandMetricsListener(slow_query_ms=50, detector=CollectionScanDetector())
+
+    def test_records_command_metrics(self):
+        """Test duration, outcome and docs returned are recorded per collection"""
+        run_command(self.listener, "find", {"find": "game_servers", "filter": {}}, reply=find_reply(4))
+        run_command(self.listener, "insert", {"insert": "support_requests"}, request_id=2, fail=True)
+
+        assert registry.get("mongo_commands_total", command="find", collection="game_servers", outcome="ok") == 1
+        assert registry.get("mongo_commands_total", command="insert", collection="support_requests", outcome="error") == 1
+        assert registry.get("mongo_docs_returned_total", collection="game_servers") == 4
+        histograms = registry.snapshot()["histograms"]["mongo_command_duration_seconds"]
+        assert {entry["labels"]["collection"] for entry in histograms} == {"game_servers", "support_requests"}
+
+    def test_accumulates_into_request_stats(self):
+        """Test commands add to the stats of the context they run in"""
+        stats = RequestDbStats()
+        token = db_stats_var.set(stats)
+        try:
+            run_command(self.listener, "find", {"find": "users", "filter": {"id": "u1"}}, duration_ms=2)
+            run_command(self.listener, "count", {"count": "users"}, duration_ms=3, request_id=2)
+        finally:
+            db_stats_var.reset(token)
+        run_command(self.listener, "find", {"find": "users"}, request_id=3)
+
+        assert stats.queries == 2
+        assert stats.seconds == pytest.approx(0.005)
+        assert stats.server_timing() == 'db;dur=5.00;desc="2 queries"'
+
+    def test_slow_query_logged_with_shape(self, caplog):
+        """Test slow commands log the filter shape, not its values"""
+        with caplog.at_level("WARNING", logger="mongo.slow"):
+            run_command(self.listener, "find", {"find": "users", "filter": {"email": "a@b.c"}}, duration_ms=80)
+            run_command(self.listener, "find", {"find": "users", "filter": {"id": "x"}}, duration_ms=5, request_id=2)
+
+        slow = [record for record in caplog.records if record.name == "mongo.slow"]
+        assert len(slow) == 1
+        assert slow[0].filter_shape == '{"email": "?"}'
+        assert "a@b.c" not in slow[0].getMessage()
+        assert slow[0].collection == "users"
+
+    def test_change_stream_polls_ignored(self, caplog):
+        """Test idle change stream getMores are neither logged nor timed"""
+        stats = RequestDbStats()
+        token = db_stats_var.set(stats)
+        try:
+            with caplog.at_level("WARNING", logger="mongo.slow"):
+                run_command(
+                    self.listener, "getMore", {"getMore": 123, "collection": "$cmd.aggregate"},
+                    duration_ms=1000, reply={"cursor": {"nextBatch": [], "id": 123}, "ok": 1}
+                )
+        finally:
+            db_stats_var.reset(token)
+
+        assert not [record for record in caplog.records if record.name == "mongo.slow"]
+        assert "mongo_command_duration_seconds" not in registry.snapshot()["histograms"]
+        assert registry.get("mongo_commands_total", command="getMore", collection="$cmd.aggregate") == 0
+        assert stats.queries == 0
+
+
+class TestRequestDbTiming:
+    """Test DB time reaches the response headers"""
+
+    def test_server_timing_header(self):
+        """Test commands run on executor threads are attributed to their request"""
+        listener = CommandMetricsListener(detector=CollectionScanDetector())
+        app = FastAPI()
+
+        @app.get("/queries")
+        async def queries():
+            loop = asyncio.get_running_loop()
+            for request_id in (1, 2):
+                # What Motor does for every operation
+                context = contextvars.copy_context()
+                await loop.run_in_executor(None, context.run, run_command, listener, "find",
+                                           {"find": "game_servers"}, 1.5, None, request_id)
+            return {}
+
+        app.add_middleware(RequestContextMiddleware)
+        response = TestClient(app).get("/queries")
+        assert response.headers["server-timing"] == 'db;dur=3.00;desc="2 queries"'
+
+
+class TestCollectionScanDetector:
+    """Test the dev-mode collection scan check"""
+
+    @pytest.mark.asyncio
+    async def test_flags_collection_scans_once_per_shape(self, caplog):
+        """Test each shape is explained once and scans are reported"""
+        registry.reset()
+        plan = {"queryPlanner": {"winningPlan": {"stage": "PROJECTION", "inputStage": {"stage": "COLLSCAN"}}}}
+        database = MagicMock()
+        database.command = AsyncMock(return_value=plan)
+        client = MagicMock()
+        client.__getitem__.return_value = database
+        detector = CollectionScanDetector()
+        detector.start(client)
+        try:
+            for value in ("a", "b"):
+                detector.submit("app", "find", {"find": "testimonials", "filter": {"role": value}, "lsid": {}, "$db": "app"})
+            detector.submit("app", "insert", {"insert": "testimonials"})
+            with caplog.at_level("WARNING", logger="mongo_monitoring"):
+                for _ in range(20):
+                    await asyncio.sleep(0)
+        finally:
+            await detector.stop()
+
+        database.command.assert_awaited_once_with({
+            "explain": {"find": "testimonials", "filter": {"role": "a"}},
+            "verbosity": "queryPlanner",
+        })
+        assert registry.get("mongo_collection_scans_total", collection="testimonials") == 1
+        assert any("Collection scan" in record.getMessage() for record in caplog.records)
+
+    @pytest.mark.asyncio
+    async def test_indexed_plan_not_flagged(self):
+        """Test an IXSCAN plan is not reported"""
+        database = MagicMock()
+        database.command = AsyncMock(return_value={"queryPlanner": {"winningPlan": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}}})
+        detector = CollectionScanDetector()
+        detector._client = {"app": database}
+        assert await detector.check("app", ("app", "users", "find", "{}"), {"find": "users"}) is False
+
+    @pytest.mark.asyncio
+    async def test_against_mongo(self, mongo_db):
+        """Test a real unindexed query is detected through the listener"""
+        registry.reset()
+        detector = CollectionScanDetector()
+        client = create_client(
+            os.environ.get("TEST_MONGO_URL", "mongodb://localhost:27017"),
+            event_listeners=[CommandMetricsListener(detector=detector)]
+        )
+        detector.start(client)
+        try:
+            collection = client[mongo_db.name].scan_probe
+            await collection.insert_one({"role": "admin"})
+            await collection.find_one({"role": "admin"})
+            for _ in range(50):
+                if registry.get("mongo_collection_scans_total", collection="scan_probe"):
+                    break
+                await asyncio.sleep(0.05)
+        finally:
+            await detector.stop()
+            client.close()
+        assert registry.get("mongo_collection_scans_total", collection="scan_probe") == 1
@@ -0,0 +1,99 @@
+"""
+Test bcrypt runs on the bounded password hashing pool
+"""
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi.testclient import TestClient
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from server import app
+from metrics import registry
+from password_hashing import PasswordHasher, PasswordHashingBusy
+from security import hash_password, verify_password
+
+
+class TestPasswordHasher:
+    """Test offloading, bounds and metrics"""
+
+    def setup_method(self):
+        registry.reset()
+
+    @pytest.mark.asyncio
+    async def test_hash_and_verify(self):
+        """Test hashes made on the pool verify"""
+        hashed = await hash_password("s3cret")
+        assert hashed.startswith("$2")
+        assert await verify_password("s3cret", hashed)
+        assert not await verify_password("wrong", hashed)
+
+    @pytest.mark.asyncio
+    async def test_event_loop_keeps_running(self):
+        """Test other coroutines progress while an operation runs"""
+        hasher = PasswordHasher(max_workers=1, max_queue=0)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        try:
+            await hasher.run("verify", time.sleep, 0.2)
+        finally:
+            task.cancel()
+            hasher.shutdown()
+        assert ticks >= 5
+        durations = registry.snapshot()["histograms"]["password_hash_seconds"]
+        assert durations[0]["labels"] == {"operation": "verify"}
+        assert durations[0]["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects(self):
+        """Test operations beyond workers + queue fail fast and are counted"""
+        hasher = PasswordHasher(max_workers=1, max_queue=1)
+        release = threading.Event()
+        running = [asyncio.create_task(hasher.run("hash", release.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0)
+        try:
+            assert hasher.queued == 1
+            with pytest.raises(PasswordHashingBusy):
+                await hasher.run("hash", release.wait, 5)
+        finally:
+            release.set()
+            await asyncio.gather(*running)
+            hasher.shutdown()
+        assert registry.get("password_hash_rejected_total", operation="hash") == 1
+        assert hasher.queued == 0
+
+    @pytest.mark.asyncio
+    async def test_usable_after_shutdown(self):
+        """Test a pool shut down by one app lifespan serves the next"""
+        hasher = PasswordHasher(max_workers=1)
+        assert await hasher.run("hash", len, "abc") == 3
+        hasher.shutdown()
+        assert await hasher.run("hash", len, "abcd") == 4
+        hasher.shutdown()
+
+
+class TestLoginWhenBusy:
+    """Test saturation reaches clients as 503"""
+
+    def test_busy_pool_is_503(self):
+        """Test a login the pool can't take gets Retry-After"""
+        db = MagicMock()
+        db.users.find_one = AsyncMock(return_value={
+            "id": "u1", "name": "Ana", "email": "ana@example.com", "password_hash": "$2b$12$abc"
+        })
+        with patch("routers.auth.db", db), \
+                patch("routers.auth.verify_password", AsyncMock(side_effect=PasswordHashingBusy("full"))):
+            response = TestClient(app).post("/api/auth/login", json={"email": "ana@example.com", "password": "x"})
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
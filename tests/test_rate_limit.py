@@ -0,0 +1,188 @@
+"""
+Test sliding-window rate limiting of auth and public write routes
+"""
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi.testclient import TestClient
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from server import app
+from migrations import run_migrations
+from rate_limit import (
+    DEFAULT_RULES, MemoryBackend, MongoBackend, RateLimit, RateLimiter, RouteRule,
+    apply_overrides, body_key, parse_rate_limits, rate_limiter, sliding_window
+)
+
+CONTACT = {"name": "Ana", "email": "ana@example.com", "subject": "Lag", "message": "Servidor lento"}
+
+
+class TestSlidingWindow:
+    """Test the sliding-window counter arithmetic"""
+
+    def test_previous_window_is_weighted(self):
+        """Test the previous window counts in proportion to its overlap"""
+        limit = RateLimit(10, 60)
+        # 30s into the window: half of the previous 10 requests still count
+        assert sliding_window(limit, 30, previous=10, current=4) == (True, 0.0)
+        allowed, retry_after = sliding_window(limit, 30, previous=10, current=5)
+        assert not allowed
+        assert retry_after == pytest.approx(6)
+
+    def test_full_current_window_waits_for_the_next(self):
+        """Test a full current window retries after it has slid far enough"""
+        allowed, retry_after = sliding_window(RateLimit(5, 60), 50, previous=0, current=5)
+        assert not allowed
+        assert retry_after == pytest.approx(10 + 12)
+
+    @pytest.mark.asyncio
+    async def test_memory_backend_counts_allowed_requests(self):
+        """Test only allowed requests are counted and windows roll over"""
+        backend, limit = MemoryBackend(), RateLimit(2, 10)
+        results = [(await backend.hit("k", limit, now))[0] for now in (0, 1, 2, 3)]
+        assert results == [True, True, False, False]
+        # Next window, 9.5s in: 2 * 0.05 + 0 + 1 <= 2
+        assert (await backend.hit("k", limit, 19.5))[0]
+        # Two windows later the old counts are gone
+        assert (await backend.hit("k", limit, 40))[0]
+
+    @pytest.mark.asyncio
+    async def test_memory_backend_is_bounded(self):
+        """Test the least recently used keys are dropped beyond max_keys"""
+        backend = MemoryBackend(max_keys=2)
+        for key in ("a", "b", "c"):
+            await backend.hit(key, RateLimit(1, 60), 0)
+        assert list(backend._counters) == ["b", "c"]
+
+
+class TestConfiguration:
+    """Test limit overrides from the environment"""
+
+    def test_parse_rate_limits(self):
+        """Test overrides parse into limits, "off" disables"""
+        assert parse_rate_limits(" login.ip=20/60 , testimonials.ip=off,") == {
+            "login.ip": RateLimit(20, 60),
+            "testimonials.ip": None,
+        }
+
+    def test_apply_overrides(self):
+        """Test overrides replace only the named limits"""
+        rules = {rule.name: rule for rule in apply_overrides(DEFAULT_RULES, {"login.key": RateLimit(1, 5)})}
+        assert rules["login"].key == RateLimit(1, 5)
+        assert rules["login"].ip == next(rule.ip for rule in DEFAULT_RULES if rule.name == "login")
+
+    def test_unknown_override_is_rejected(self):
+        """Test a typo in RATE_LIMITS fails loudly"""
+        with pytest.raises(ValueError):
+            apply_overrides(DEFAULT_RULES, {"logn.ip": RateLimit(1, 5)})
+
+    def test_body_key(self):
+        """Test keys are normalized and garbage bodies yield none"""
+        assert body_key(b'{"email": " Ana@Example.com "}', "email") == "ana@example.com"
+        assert body_key(b'{"email": 5}', "email") is None
+        assert body_key(b'not json', "email") is None
+        assert body_key(b'[1]', "email") is None
+
+
+class TestRateLimitMiddleware:
+    """Test rejections through the app"""
+
+    def setup_method(self):
+        self.client = TestClient(app)
+        self.rules = list(rate_limiter.rules.values())
+
+    def teardown_method(self):
+        rate_limiter.configure(self.rules)
+
+    def limit(self, **limits):
+        rate_limiter.configure(apply_overrides(self.rules, limits))
+
+    def test_ip_limit_rejects_before_validation(self):
+        """Test over-limit requests get 429 with Retry-After and never reach the route"""
+        self.limit(**{"login.ip": RateLimit(2, 60), "login.key": None})
+        db = MagicMock()
+        db.users.find_one = AsyncMock(return_value=None)
+        with patch("routers.auth.db", db):
+            statuses = [
+                self.client.post("/api/auth/login", json={"email": f"u{i}@example.com", "password": "x"}).status_code
+                for i in range(2)
+            ]
+            rejected = self.client.post("/api/auth/login", content=b"not even json")
+
+        assert statuses == [401, 401]
+        assert rejected.status_code == 429
+        assert int(rejected.headers["retry-after"]) >= 1
+        assert db.users.find_one.await_count == 2
+
+    def test_key_limit_is_per_email(self):
+        """Test one email is throttled while others from the same IP are not"""
+        self.limit(**{"forgot_password.key": RateLimit(1, 900)})
+        db = MagicMock()
+        db.users.find_one = AsyncMock(return_value=None)
+        with patch("routers.auth.db", db):
+            first = self.client.post("/api/auth/forgot-password", json={"email": "ana@example.com"})
+            again = self.client.post("/api/auth/forgot-password", json={"email": "ANA@example.com"})
+            other = self.client.post("/api/auth/forgot-password", json={"email": "bia@example.com"})
+        assert [first.status_code, again.status_code, other.status_code] == [200, 429, 200]
+
+    def test_body_is_replayed_to_the_route(self):
+        """Test the route still sees the body the middleware read"""
+        buffer = MagicMock(running=True)
+        with patch("routers.general.support_requests_buffer", buffer):
+            response = self.client.post("/api/support/contact", json=CONTACT)
+        assert response.status_code == 200
+        assert buffer.submit.call_args.args[0]["subject"] == "Lag"
+
+    def test_other_routes_are_not_limited(self):
+        """Test GETs and unlisted routes pass through untouched"""
+        self.limit(**{"testimonials.ip": RateLimit(0, 60)})
+        with patch("routers.general.catalog_cache") as cache:
+            cache.get_or_load = AsyncMock(side_effect=RuntimeError("down"))
+            assert self.client.get("/api/testimonials").status_code == 500
+        assert self.client.post("/api/testimonials", json={}).status_code == 429
+
+    @pytest.mark.asyncio
+    async def test_backend_errors_fail_open(self):
+        """Test a broken backend lets requests through"""
+        backend = MagicMock()
+        backend.hit = AsyncMock(side_effect=RuntimeError("mongo down"))
+        rule = RouteRule("r", "POST", "/x", ip=RateLimit(1, 60))
+        limiter = RateLimiter([rule], backend=backend)
+        assert await limiter.check(rule, "ip", "1.2.3.4", rule.ip) is None
+
+    def test_forwarded_ip_only_when_trusted(self):
+        """Test X-Forwarded-For is ignored unless proxies are configured"""
+        scope = {"client": ("10.0.0.1", 1234), "headers": [(b"x-forwarded-for", b"203.0.113.9")]}
+        assert RateLimiter().client_ip(scope) == "10.0.0.1"
+        assert RateLimiter(trusted_proxies=1).client_ip(scope) == "203.0.113.9"
+
+    def test_spoofed_forwarded_ip_through_appending_proxy(self):
+        """Test entries the client sent ahead of the proxy's are not used"""
+        limiter = RateLimiter(trusted_proxies=1)
+        for spoofed in ("1.1.1.1", "2.2.2.2, 3.3.3.3"):
+            # The proxy appends the address it saw to whatever the client sent
+            header = f"{spoofed}, 203.0.113.9".encode()
+            scope = {"client": ("10.0.0.1", 1234), "headers": [(b"x-forwarded-for", header)]}
+            assert limiter.client_ip(scope) == "203.0.113.9"
+
+        # Two proxies: CDN appends the client, the load balancer appends the CDN
+        scope = {"client": ("10.0.0.1", 1234), "headers": [(b"x-forwarded-for", b"1.1.1.1, 203.0.113.9, 198.51.100.7")]}
+        assert RateLimiter(trusted_proxies=2).client_ip(scope) == "203.0.113.9"
+
+
+class TestMongoBackend:
+    """Test shared counters against a real MongoDB server"""
+
+    @pytest.mark.asyncio
+    async def test_counters_are_shared(self, mongo_db):
+        """Test two backends (two workers) see each other's requests"""
+        await run_migrations(mongo_db)
+        limit = RateLimit(3, 60)
+        workers = [MongoBackend(mongo_db), MongoBackend(mongo_db)]
+        results = [(await workers[i % 2].hit("login:ip:1.2.3.4", limit, 600 + i))[0] for i in range(4)]
+        assert results == [True, True, True, False]
+        doc = await mongo_db.rate_limits.find_one({"_id": "login:ip:1.2.3.4:10"})
+        assert doc["count"] == 4
+        assert "expires_at" in doc
@@ -0,0 +1,173 @@
+"""
+Test catalog search ranking and its Mongo queries
+"""
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi.testclient import TestClient
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from server import app
+from catalog_fields import name_trigrams, with_search_fields
+from routers.search import FUZZY_THRESHOLD, fuzzy_bounds, fuzzy_candidate_trigrams
+from migrations import run_migrations
+
+
+def server_doc(name, server_id):
+    return with_search_fields({
+        "id": server_id,
+        "name": name,
+        "players": "2-100",
+        "price": "R$ 15,90",
+        "ram": "2GB",
+        "storage": "10GB SSD",
+        "status": "online",
+        "image": "server.jpg",
+    })
+
+
+def plan_doc(name, plan_id, description="Plano", features=()):
+    return with_search_fields({
+        "id": plan_id,
+        "name": name,
+        "price": "R$ 19,90",
+        "description": description,
+        "features": list(features),
+    })
+
+
+def mock_cursor(docs):
+    cursor = MagicMock()
+    cursor.sort.return_value = cursor
+    cursor.limit.return_value = cursor
+    cursor.to_list = AsyncMock(return_value=list(docs))
+    return cursor
+
+
+def mock_collection(text_docs=(), prefix_docs=(), fuzzy_docs=()):
+    collection = MagicMock()
+    collection.find.side_effect = lambda query, projection: mock_cursor(
+        text_docs if "$text" in query else prefix_docs
+    )
+    collection.aggregate.return_value.to_list = AsyncMock(return_value=list(fuzzy_docs))
+    return collection
+
+
+def mock_search_db(game_servers, pricing_plans):
+    mock_db = MagicMock()
+    mock_db.__getitem__.side_effect = {"game_servers": game_servers, "pricing_plans": pricing_plans}.__getitem__
+    return mock_db
+
+
+class TestSearchEndpoint:
+    """Test query validation, merging and the fuzzy fallback"""
+
+    def setup_method(self):
+        self.client = TestClient(app)
+
+    def test_query_is_validated(self):
+        """Test missing, short and over-limit queries are rejected"""
+        assert self.client.get("/api/search").status_code == 422
+        assert self.client.get("/api/search", params={"q": "a"}).status_code == 422
+        assert self.client.get("/api/search", params={"q": "ark", "limit": 51}).status_code == 422
+
+    def test_matches_are_merged_and_ranked(self):
+        """Test a document matched by text and prefix outranks a text-only match"""
+        minecraft = server_doc("Minecraft Java", "s1")
+        plan = {**plan_doc("Sorcerer", "p1", "Para comunidades Minecraft"), "score": 2.0}
+        servers = mock_collection(text_docs=[{**minecraft, "score": 1.1}], prefix_docs=[minecraft])
+        plans = mock_collection(text_docs=[plan])
+        with patch("routers.search.db", mock_search_db(servers, plans)):
+            response = self.client.get("/api/search", params={"q": "Minecraft", "limit": 2})
+
+        data = response.json()
+        assert [result["type"] for result in data["results"]] == ["server", "plan"]
+        assert data["results"][0]["matched_by"] == ["text", "prefix"]
+        assert data["results"][0]["score"] == pytest.approx(1.1 + 1.5)
+        assert "name_trigrams" not in data["results"][0]["server"]
+        # Enough exact matches: the trigram scan is skipped
+        servers.aggregate.assert_not_called()
+
+    def test_typos_fall_back_to_trigrams(self):
+        """Test too few exact matches run the trigram similarity pipeline"""
+        fuzzy = {**server_doc("Minecraft Java", "s1"), "similarity": 0.5}
+        servers = mock_collection(fuzzy_docs=[fuzzy])
+        plans = mock_collection()
+        with patch("routers.search.db", mock_search_db(servers, plans)):
+            response = self.client.get("/api/search", params={"q": "mincraft"})
+
+        results = response.json()["results"]
+        assert [(result["server"]["name"], result["matched_by"]) for result in results] == [
+            ("Minecraft Java", ["fuzzy"])
+        ]
+        pipeline = servers.aggregate.call_args[0][0]
+        assert "min" in pipeline[0]["$match"]["name_trigrams"]["$in"]
+        # Only the top-limit sort keeps documents out; nothing is cut in storage order
+        stages = [next(iter(stage)) for stage in pipeline]
+        assert stages.index("$limit") == stages.index("$sort") + 1
+
+    def test_fuzzy_candidates_skip_common_trigrams(self):
+        """Test word-start padding is left out of the candidate lookup when the threshold allows"""
+        candidates = fuzzy_candidate_trigrams(name_trigrams("minecarft"))
+        assert "  m" not in candidates and " mi" not in candidates
+        # Any name at the threshold still contains one of them
+        assert len(candidates) == len(name_trigrams("minecarft")) - 3 + 1
+
+    def test_fuzzy_bounds_keep_every_match(self):
+        """Test names at the similarity threshold always pass the candidate filters"""
+        names = ["Minecraft", "Minecraft Java", "Mine", "Rust", "Rustt", "Valheim", "V Rising", "ARK Survival"]
+        for query in ("minecarft", "rustt", "valhem", "ark"):
+            trigrams = set(name_trigrams(query))
+            shared, most = fuzzy_bounds(len(trigrams))
+            for name in names:
+                own = set(name_trigrams(name))
+                common = own & trigrams
+                if len(common) / len(own | trigrams) >= FUZZY_THRESHOLD:
+                    assert len(common) >= shared and len(own) <= most
+                    assert common & set(fuzzy_candidate_trigrams(sorted(trigrams)))
+
+
+class TestSearchAgainstMongo:
+    """Test search indexes and relevance on a real MongoDB server"""
+
+    @pytest.mark.asyncio
+    async def test_search_relevance(self, mongo_db):
+        """Test text, prefix and typo-tolerant matches on migrated collections"""
+        await run_migrations(mongo_db)
+        await mongo_db.game_servers.insert_many([
+            server_doc("Minecraft Java", "s1"),
+            server_doc("Minecraft Bedrock", "s2"),
+            server_doc("Rust", "s3"),
+        ])
+        await mongo_db.pricing_plans.insert_one(
+            plan_doc("Sorcerer", "p1", "Para comunidades Minecraft", ["4GB RAM"])
+        )
+
+        from httpx import ASGITransport, AsyncClient
+        with patch("routers.search.db", mongo_db):
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                exact = (await client.get("/api/search", params={"q": "minecraft java"})).json()
+                typo = (await client.get("/api/search", params={"q": "rustt"})).json()
+                prefix = (await client.get("/api/search", params={"q": "Minec"})).json()
+
+        assert exact["results"][0]["server"]["id"] == "s1"
+        assert {result["type"] for result in exact["results"]} == {"server", "plan"}
+        assert [result["server"]["id"] for result in typo["results"]] == ["s3"]
+        assert {result["server"]["id"] for result in prefix["results"]} == {"s1", "s2"}
+
+    @pytest.mark.asyncio
+    async def test_closest_typo_match_among_many_decoys(self, mongo_db):
+        """Test the closest name wins however many names share the query's common trigrams"""
+        await run_migrations(mongo_db)
+        # Stored first, so any cut in storage order would keep only decoys
+        await mongo_db.game_servers.insert_many([server_doc(f"Mine Decoy {i}", f"d{i}") for i in range(600)])
+        await mongo_db.game_servers.insert_one(server_doc("Minecraft", "target"))
+
+        from httpx import ASGITransport, AsyncClient
+        with patch("routers.search.db", mongo_db):
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                typo = (await client.get("/api/search", params={"q": "minecarft", "limit": 5})).json()
+
+        assert typo["results"][0]["server"]["id"] == "target"
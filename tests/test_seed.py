@@ -0,0 +1,78 @@
+"""
+Test idempotent seeding and synthetic datasets
+"""
+import asyncio
+import pytest
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import database
+from migrations import run_migrations
+from seed import (
+    SEED_SERVERS, SEED_PLANS, SEED_TESTIMONIALS,
+    natural_id, seed_fixtures, seed_synthetic, synthetic_servers, upsert_operations
+)
+
+
+class TestUpsertOperations:
+    """Test the bulk operations seeding sends"""
+
+    def test_keyed_on_natural_key_and_insert_only(self):
+        """Test upserts filter on the natural key and never overwrite"""
+        operation = upsert_operations("testimonials", SEED_TESTIMONIALS[:1])[0]
+        assert operation._filter == {"name": "Pedro Silva", "role": "Admin do servidor MineCraft Brasil"}
+        assert list(operation._doc) == ["$setOnInsert"]
+        assert operation._upsert is True
+
+    def test_ids_are_derived_from_natural_keys(self):
+        """Test every worker derives the same id for the same document"""
+        first = upsert_operations("game_servers", SEED_SERVERS[:1])[0]._doc["$setOnInsert"]
+        second = upsert_operations("game_servers", SEED_SERVERS[:1])[0]._doc["$setOnInsert"]
+        assert first["id"] == second["id"] == natural_id("game_servers", {"name": "Minecraft Java"})
+        assert first["price_cents"] == 1590
+        assert first["search_name"] == "minecraft java"
+
+    def test_synthetic_data_is_deterministic(self):
+        """Test reruns generate the same natural keys"""
+        assert list(synthetic_servers(5)) == list(synthetic_servers(5))
+        names = [server["name"] for server in synthetic_servers(1000)]
+        assert len(set(names)) == 1000
+
+    def test_startup_does_no_seeding(self):
+        """Test seeding is no longer part of the app"""
+        assert not hasattr(database.Database, "initialize_data")
+
+
+class TestSeedAgainstMongo:
+    """Test seeding against a real MongoDB server"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_seeds_do_not_duplicate(self, mongo_db):
+        """Test parallel seeders and reruns insert each document once"""
+        await run_migrations(mongo_db)
+        results = await asyncio.gather(*(seed_fixtures(mongo_db) for _ in range(4)))
+        assert sum(result["game_servers"] for result in results) == len(SEED_SERVERS)
+        assert await seed_fixtures(mongo_db) == {"game_servers": 0, "pricing_plans": 0, "testimonials": 0}
+        assert await mongo_db.game_servers.count_documents({}) == len(SEED_SERVERS)
+        assert await mongo_db.pricing_plans.count_documents({}) == len(SEED_PLANS)
+        assert await mongo_db.testimonials.count_documents({}) == len(SEED_TESTIMONIALS)
+
+    @pytest.mark.asyncio
+    async def test_existing_documents_are_kept(self, mongo_db):
+        """Test a document already present under the natural key is not touched"""
+        await run_migrations(mongo_db)
+        await mongo_db.game_servers.insert_one({"id": "legacy", "name": "Rust", "price": "R$ 1,00"})
+        await seed_fixtures(mongo_db)
+        assert await mongo_db.game_servers.count_documents({"name": "Rust"}) == 1
+        assert (await mongo_db.game_servers.find_one({"name": "Rust"}))["id"] == "legacy"
+
+    @pytest.mark.asyncio
+    async def test_synthetic_batches(self, mongo_db):
+        """Test synthetic data is inserted in batches and reruns are no-ops"""
+        await run_migrations(mongo_db)
+        first = await seed_synthetic(mongo_db, servers=250, testimonials=10, batch_size=100)
+        second = await seed_synthetic(mongo_db, servers=250, testimonials=10, batch_size=100)
+        assert first == {"game_servers": 250, "pricing_plans": 0, "testimonials": 10}
+        assert second == {"game_servers": 0, "pricing_plans": 0, "testimonials": 0}
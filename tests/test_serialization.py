@@ -0,0 +1,65 @@
+"""
+Test the trusted-document fast path to JSON bytes
+"""
+import json
+from datetime import datetime
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from models import GameServer, GameServerResponse, User
+from serialization import construct, construct_many, projection, to_json_bytes
+
+
+SERVER_DOC = {
+    "_id": "mongo-id",
+    "id": "s1",
+    "name": "Rust",
+    "players": "10-200",
+    "price": "R$ 29,90",
+    "ram": "4GB",
+    "storage": "25GB SSD",
+    "status": "online",
+    "image": "rust.jpg",
+    "created_at": datetime(2024, 1, 1),
+    "updated_at": datetime(2024, 1, 2),
+    "price_cents": 2990,
+    "ram_mb": 4096,
+    "storage_gb": 25,
+    "players_min": 10,
+    "players_max": 200,
+    "search_name": "rust",
+    "name_trigrams": ["  r", " ru", "rus", "st ", "ust"],
+}
+
+
+class TestTrustedFastPath:
+    """Test projections, construction and byte serialization"""
+
+    def test_projection_matches_model_fields(self):
+        """Test only declared fields are requested and _id is excluded"""
+        fields = projection(User)
+        assert fields["_id"] == 0
+        assert set(fields) - {"_id"} == set(User.model_fields)
+        assert projection(User) is fields
+
+    def test_construct_ignores_unknown_fields(self):
+        """Test storage-only fields never reach the model"""
+        server = construct(GameServer, SERVER_DOC)
+        assert not hasattr(server, "name_trigrams")
+        assert "_id" not in server.model_dump()
+
+    def test_projected_documents_are_adopted(self):
+        """Test a document with exactly the model's fields becomes the instance dict"""
+        doc = {key: value for key, value in SERVER_DOC.items() if projection(GameServer).get(key) == 1}
+        server = construct(GameServer, doc)
+        assert server.__dict__ is doc
+        assert server.model_fields_set == set(GameServer.model_fields)
+
+    def test_bytes_match_validated_output(self):
+        """Test the fast path produces the same JSON as full validation"""
+        validated = GameServerResponse(servers=[GameServer(**SERVER_DOC)], next_cursor="c")
+        fast = GameServerResponse.model_construct(servers=construct_many(GameServer, [SERVER_DOC]), next_cursor="c")
+        assert to_json_bytes(fast) == validated.model_dump_json().encode()
+        assert json.loads(to_json_bytes(fast))["servers"][0]["created_at"] == "2024-01-01T00:00:00"
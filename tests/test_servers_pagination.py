@@ -0,0 +1,114 @@
+"""
+Test keyset pagination and filters on GET /api/servers
+"""
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi.testclient import TestClient
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from server import app
+from database import catalog_cache
+from models import GameServer
+from routers.servers import _decode_cursor, _encode_cursor
+
+
+def server_doc(name, server_id):
+    return {
+        "id": server_id,
+        "name": name,
+        "players": "2-100",
+        "price": "R$ 15,90",
+        "ram": "2GB",
+        "storage": "10GB SSD",
+        "status": "online",
+        "image": "server.jpg",
+    }
+
+
+def mock_servers_db(docs):
+    cursor = MagicMock()
+    cursor.sort.return_value = cursor
+    cursor.limit.return_value = cursor
+    cursor.to_list = AsyncMock(return_value=docs)
+    mock_db = MagicMock()
+    mock_db.game_servers.find.return_value = cursor
+    return mock_db
+
+
+class TestServersPagination:
+    """Test cursors, filters and page bounds"""
+
+    def setup_method(self):
+        catalog_cache.invalidate()
+        self.client = TestClient(app)
+
+    def test_cursor_round_trip(self):
+        """Test cursors decode to the (name, id) they were built from"""
+        server = GameServer(**server_doc("Rust", "s3"))
+        assert _decode_cursor(_encode_cursor(server)) == ("Rust", "s3")
+
+    def test_invalid_cursor_is_rejected(self):
+        """Test malformed cursors return 400"""
+        response = self.client.get("/api/servers", params={"after": "not-a-cursor"})
+        assert response.status_code == 400
+
+    def test_limit_is_bounded(self):
+        """Test page size limits are validated"""
+        assert self.client.get("/api/servers", params={"limit": 0}).status_code == 422
+        assert self.client.get("/api/servers", params={"limit": 501}).status_code == 422
+
+    def test_next_cursor_when_more_pages(self):
+        """Test an extra document yields a next cursor and is not returned"""
+        mock_db = mock_servers_db([server_doc("ARK", "s1"), server_doc("Rust", "s2")])
+        with patch("routers.servers.db", mock_db):
+            response = self.client.get("/api/servers", params={"limit": 1})
+
+        data = response.json()
+        assert [server["name"] for server in data["servers"]] == ["ARK"]
+        assert _decode_cursor(data["next_cursor"]) == ("ARK", "s1")
+        mock_db.game_servers.find.return_value.limit.assert_called_with(2)
+
+    def test_filters_and_keyset_query(self):
+        """Test status, anchored name prefix and cursor build one query"""
+        after = _encode_cursor(GameServer(**server_doc("Mine", "s1")))
+        mock_db = mock_servers_db([])
+        with patch("routers.servers.db", mock_db):
+            response = self.client.get(
+                "/api/servers",
+                params={"status": "online", "name_prefix": "Mine.", "after": after}
+            )
+
+        assert response.json() == {"servers": [], "next_cursor": None}
+        query = mock_db.game_servers.find.call_args[0][0]
+        assert query == {"$and": [
+            {"status": "online", "name": {"$regex": "^Mine\\."}},
+            {"$or": [{"name": {"$gt": "Mine"}}, {"name": "Mine", "id": {"$gt": "s1"}}]},
+        ]}
+
+    def test_price_sort_with_ranges(self):
+        """Test numeric ranges and price order run as one indexed query"""
+        after = _encode_cursor(GameServer(**server_doc("ARK", "s1")), "price")
+        assert _decode_cursor(after, "price") == (1590, "s1")
+        mock_db = mock_servers_db([])
+        with patch("routers.servers.db", mock_db):
+            response = self.client.get(
+                "/api/servers",
+                params={"sort": "price", "max_price_cents": 3000, "min_ram_mb": 4096, "after": after}
+            )
+
+        assert response.status_code == 200
+        query = mock_db.game_servers.find.call_args[0][0]
+        assert query == {"$and": [
+            {"price_cents": {"$lte": 3000, "$type": "number"}, "ram_mb": {"$gte": 4096}},
+            {"$or": [{"price_cents": {"$gt": 1590}}, {"price_cents": 1590, "id": {"$gt": "s1"}}]},
+        ]}
+        mock_db.game_servers.find.return_value.sort.assert_called_with([("price_cents", 1), ("id", 1)])
+
+    def test_cursor_from_another_sort_is_rejected(self):
+        """Test a name cursor cannot be replayed against the price order"""
+        after = _encode_cursor(GameServer(**server_doc("ARK", "s1")))
+        response = self.client.get("/api/servers", params={"sort": "price", "after": after})
+        assert response.status_code == 400
+        assert self.client.get("/api/servers", params={"sort": "players"}).status_code == 422
@@ -0,0 +1,240 @@
+"""
+Test the admin support ticket listing, counts and status transitions
+"""
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi.testclient import TestClient
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from server import app
+from models import User
+from migrations import run_migrations
+from security import get_current_user
+from routers import support
+from routers.support import LISTING_KEY_FIELDS, _decode_cursor, _encode_cursor, _listing_query
+
+CREATED = datetime(2024, 5, 1, 12, 0, 0)
+
+
+def ticket_doc(ticket_id, status="open", priority="medium", created_at=CREATED):
+    return {
+        "id": ticket_id,
+        "name": "Ana",
+        "email": "ana@example.com",
+        "subject": "Lag",
+        "message": "Servidor lento",
+        "priority": priority,
+        "status": status,
+        "created_at": created_at,
+    }
+
+
+def mock_support_db(docs=(), groups=()):
+    cursor = MagicMock()
+    cursor.sort.return_value = cursor
+    cursor.limit.return_value = cursor
+    cursor.to_list = AsyncMock(return_value=list(docs))
+    aggregation = MagicMock()
+    aggregation.to_list = AsyncMock(return_value=list(groups))
+    mock_db = MagicMock()
+    mock_db.support_requests.find.return_value = cursor
+    mock_db.support_requests.aggregate.return_value = aggregation
+    return mock_db
+
+
+def find_plan_stages(plan, stage):
+    """Every stage of a given type anywhere in an explain plan"""
+    found = []
+    if isinstance(plan, dict):
+        if plan.get("stage") == stage:
+            found.append(plan)
+        for value in plan.values():
+            found.extend(find_plan_stages(value, stage))
+    elif isinstance(plan, list):
+        for item in plan:
+            found.extend(find_plan_stages(item, stage))
+    return found
+
+
+class TestListingQuery:
+    """Test cursors and the shape of listing queries"""
+
+    def test_cursor_round_trip(self):
+        """Test cursors decode to the (created_at, id) they were built from"""
+        assert _decode_cursor(_encode_cursor(CREATED, "t1")) == (CREATED, "t1")
+
+    def test_invalid_cursor(self):
+        """Test malformed cursors raise ValueError"""
+        with pytest.raises(ValueError):
+            _decode_cursor("not-a-cursor")
+
+    def test_unfiltered_query_pins_every_value(self):
+        """Test status and priority are always $in lists so the index prefix is used"""
+        query = _listing_query(None, None, None)
+        assert query == {
+            "status": {"$in": ["open", "in_progress", "resolved"]},
+            "priority": {"$in": ["low", "medium", "high"]},
+        }
+
+    def test_keyset_query(self):
+        """Test the cursor bounds created_at and breaks ties on id"""
+        query = _listing_query("open", "high", (CREATED, "t5"))
+        assert query["status"] == {"$in": ["open"]}
+        assert query["priority"] == {"$in": ["high"]}
+        assert query["created_at"] == {"$lte": CREATED}
+        assert query["$nor"] == [{"created_at": CREATED, "id": {"$gte": "t5"}}]
+
+
+class TestSupportTicketRoutes:
+    """Test the admin HTTP endpoints"""
+
+    def setup_method(self):
+        self.client = TestClient(app)
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+
+    def as_user(self, is_admin):
+        user = User(name="Ops", email="ops@example.com", is_admin=is_admin)
+        app.dependency_overrides[get_current_user] = lambda: user
+
+    def test_requires_admin(self):
+        """Test anonymous and non-admin callers are refused"""
+        assert self.client.get("/api/support/requests").status_code == 401
+        self.as_user(is_admin=False)
+        assert self.client.get("/api/support/requests").status_code == 403
+        assert self.client.get("/api/support/requests/counts").status_code == 403
+
+    def test_page_and_next_cursor(self):
+        """Test an extra document yields a next cursor and is not returned"""
+        self.as_user(is_admin=True)
+        mock_db = mock_support_db([ticket_doc("t2"), ticket_doc("t1")])
+        with patch("routers.support.db", mock_db):
+            response = self.client.get("/api/support/requests", params={"limit": 1, "status": "open"})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [ticket["id"] for ticket in data["requests"]] == ["t2"]
+        assert _decode_cursor(data["next_cursor"]) == (CREATED, "t2")
+        cursor = mock_db.support_requests.find.return_value
+        cursor.sort.assert_called_with([("created_at", -1), ("id", -1)])
+        cursor.limit.assert_called_with(2)
+        # Page picked from index keys, then only its tickets loaded by id
+        (listing, keys), (load, _) = [call.args for call in mock_db.support_requests.find.call_args_list]
+        assert keys == LISTING_KEY_FIELDS
+        assert load == {"id": {"$in": ["t2"]}}
+
+    def test_invalid_filters(self):
+        """Test unknown statuses, priorities and cursors are rejected"""
+        self.as_user(is_admin=True)
+        assert self.client.get("/api/support/requests", params={"status": "closed"}).status_code == 422
+        assert self.client.get("/api/support/requests", params={"priority": "urgent"}).status_code == 422
+        assert self.client.get("/api/support/requests", params={"after": "bad"}).status_code == 400
+
+    def test_counts_are_zero_filled(self):
+        """Test statuses and priorities without tickets are reported as zero"""
+        self.as_user(is_admin=True)
+        groups = [
+            {"_id": {"status": "open", "priority": "high"}, "count": 3},
+            {"_id": {"status": "open", "priority": "low"}, "count": 1},
+            {"_id": {"status": "resolved", "priority": "medium"}, "count": 2},
+        ]
+        mock_db = mock_support_db(groups=groups)
+        with patch("routers.support.db", mock_db):
+            response = self.client.get("/api/support/requests/counts")
+
+        data = response.json()
+        assert data["total"] == 6
+        assert data["by_status"] == {"open": 4, "in_progress": 0, "resolved": 2}
+        assert data["by_priority"]["open"] == {"low": 1, "medium": 0, "high": 3}
+        assert mock_db.support_requests.aggregate.call_count == 1
+
+    def test_invalid_transition_is_409(self):
+        """Test a move the current status doesn't allow is refused"""
+        self.as_user(is_admin=True)
+        mock_db = MagicMock()
+        mock_db.support_requests.find_one_and_update = AsyncMock(return_value=None)
+        mock_db.support_requests.find_one = AsyncMock(return_value={"status": "in_progress"})
+        with patch("routers.support.db", mock_db):
+            response = self.client.put("/api/support/requests/t1/status", json={"status": "in_progress"})
+
+        assert response.status_code == 409
+        update_filter = mock_db.support_requests.find_one_and_update.call_args.args[0]
+        assert update_filter == {"id": "t1", "status": {"$in": ["open"]}}
+
+    def test_transition_of_missing_ticket_is_404(self):
+        """Test a ticket that doesn't exist is 404, not 409"""
+        self.as_user(is_admin=True)
+        mock_db = MagicMock()
+        mock_db.support_requests.find_one_and_update = AsyncMock(return_value=None)
+        mock_db.support_requests.find_one = AsyncMock(return_value=None)
+        with patch("routers.support.db", mock_db):
+            response = self.client.put("/api/support/requests/nope/status", json={"status": "resolved"})
+        assert response.status_code == 404
+
+    def test_contact_priority_is_validated(self):
+        """Test the contact form only accepts known priorities"""
+        response = self.client.post("/api/support/contact", json={
+            "name": "Ana", "email": "ana@example.com", "subject": "Lag",
+            "message": "Servidor lento", "priority": "urgent"
+        })
+        assert response.status_code == 422
+
+
+class TestSupportTicketsAgainstMongo:
+    """Test paging, counts and index use against a real MongoDB server"""
+
+    @pytest.mark.asyncio
+    async def test_pages_counts_and_plans(self, mongo_db):
+        """Test keyset pages cover every ticket once, in order, without an in-memory sort"""
+        await run_migrations(mongo_db)
+        statuses = ["open", "in_progress", "resolved"]
+        priorities = ["low", "medium", "high"]
+        # Shared timestamps exercise the id tie-break
+        docs = [
+            ticket_doc(f"t{i:03d}", statuses[i % 3], priorities[i % 2 * 2], CREATED - timedelta(minutes=i // 4))
+            for i in range(90)
+        ]
+        await mongo_db.support_requests.insert_many([dict(doc) for doc in docs])
+
+        with patch("routers.support.db", mongo_db):
+            seen, after = [], None
+            while True:
+                page = await support._load_tickets_page(7, after, status_filter="open")
+                seen.extend(ticket.id for ticket in page.requests)
+                if not page.next_cursor:
+                    break
+                after = _decode_cursor(page.next_cursor)
+            counts = await support.count_tickets()
+
+        expected = sorted(
+            (doc for doc in docs if doc["status"] == "open"),
+            key=lambda doc: (doc["created_at"], doc["id"]), reverse=True
+        )
+        assert seen == [doc["id"] for doc in expected]
+        assert counts.total == 90
+        assert counts.by_status == {"open": 30, "in_progress": 30, "resolved": 30}
+
+        explain = await mongo_db.support_requests.find(
+            _listing_query(None, "high", (CREATED, "t050")), LISTING_KEY_FIELDS
+        ).sort([("created_at", -1), ("id", -1)]).limit(51).explain()
+        winning = explain["queryPlanner"]["winningPlan"]
+        assert not find_plan_stages(winning, "SORT")
+        assert not find_plan_stages(winning, "FETCH")
+        assert find_plan_stages(winning, "IXSCAN")
+        assert explain["executionStats"]["totalDocsExamined"] == 0
+
+        explain = await mongo_db.command(
+            "aggregate", "support_requests",
+            pipeline=[
+                {"$match": {"status": {"$in": statuses}, "priority": {"$in": priorities}}},
+                {"$group": {"_id": {"status": "$status", "priority": "$priority"}, "count": {"$sum": 1}}},
+            ],
+            explain=True
+        )
+        assert not find_plan_stages(explain, "FETCH")
+        assert not find_plan_stages(explain, "COLLSCAN")
@@ -0,0 +1,183 @@
+"""
+Test testimonial moderation and the materialized public feed
+"""
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi.testclient import TestClient
+from pymongo.errors import DuplicateKeyError
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from server import app
+from database import catalog_cache
+from feeds import PUBLIC_TESTIMONIALS_QUERY, PUBLIC_TESTIMONIALS_SORT, rebuild_testimonials_feed
+from invalidation import invalidation_bus
+from migrations import run_migrations
+from models import Testimonial, User
+from security import get_current_user
+from routers import general
+
+SUBMISSION = {"name": "Pedro", "role": "Admin", "content": "Ótimo suporte", "avatar": "a.png", "rating": 5}
+
+
+def review_doc(testimonial_id, approved=False, created_at=datetime(2024, 1, 1)):
+    return {**SUBMISSION, "id": testimonial_id, "approved": approved, "rejected": False,
+            "moderated_at": None, "created_at": created_at}
+
+
+def mock_feed_db(before=None, items=()):
+    cursor = MagicMock()
+    cursor.sort.return_value = cursor
+    cursor.limit.return_value = cursor
+    cursor.to_list = AsyncMock(return_value=list(items))
+    mock_db = MagicMock()
+    mock_db.testimonials.find.return_value = cursor
+    mock_db.testimonials.insert_one = AsyncMock()
+    mock_db.testimonials.find_one_and_update = AsyncMock(return_value=before)
+    mock_db.feeds.update_one = AsyncMock()
+    mock_db.feeds.find_one = AsyncMock(return_value=None)
+    return mock_db
+
+
+class TestFeedRebuild:
+    """Test building and storing the feed document"""
+
+    @pytest.mark.asyncio
+    async def test_feed_query_and_document(self):
+        """Test the newest approved testimonials are stored as one capped document"""
+        mock_db = mock_feed_db(items=[review_doc("t1", approved=True)])
+        items = await rebuild_testimonials_feed(mock_db, size=10)
+
+        assert [item["id"] for item in items] == ["t1"]
+        assert mock_db.testimonials.find.call_args.args[0] == {"approved": True, "rejected": False}
+        cursor = mock_db.testimonials.find.return_value
+        cursor.sort.assert_called_with(PUBLIC_TESTIMONIALS_SORT)
+        cursor.limit.assert_called_with(10)
+        feed_filter, update = mock_db.feeds.update_one.call_args.args
+        assert feed_filter["_id"] == "testimonials"
+        assert update["$set"]["items"] == items
+        assert mock_db.feeds.update_one.call_args.kwargs == {"upsert": True}
+
+    @pytest.mark.asyncio
+    async def test_newer_feed_is_kept(self):
+        """Test a rebuild losing the race to a newer one doesn't fail"""
+        mock_db = mock_feed_db(items=[])
+        mock_db.feeds.update_one = AsyncMock(side_effect=DuplicateKeyError("newer feed"))
+        assert await rebuild_testimonials_feed(mock_db) == []
+
+    def test_feed_change_evicts_testimonials(self):
+        """Test only feed changes, not pending submissions, evict the cached list"""
+        catalog_cache.set("testimonials", b"feed")
+        invalidation_bus.dispatch({"_id": {"_data": "1"}, "ns": {"coll": "testimonials"}})
+        assert catalog_cache.get("testimonials") == b"feed"
+        invalidation_bus.dispatch({"_id": {"_data": "2"}, "ns": {"coll": "feeds"}})
+        assert catalog_cache.get("testimonials") is None
+
+
+class TestModerationRoutes:
+    """Test submission, moderation and public reads over HTTP"""
+
+    def setup_method(self):
+        catalog_cache.invalidate()
+        self.client = TestClient(app)
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+
+    def as_admin(self):
+        admin = User(name="Ops", email="ops@example.com", is_admin=True)
+        app.dependency_overrides[get_current_user] = lambda: admin
+
+    def test_submissions_are_pending(self):
+        """Test a new testimonial is stored unapproved and leaves the public cache alone"""
+        catalog_cache.set("testimonials", b"feed")
+        mock_db = mock_feed_db()
+        with patch("routers.general.db", mock_db):
+            response = self.client.post("/api/testimonials", json=SUBMISSION)
+        assert response.json()["approved"] is False
+        assert mock_db.testimonials.insert_one.await_args.args[0]["approved"] is False
+        assert catalog_cache.get("testimonials") == b"feed"
+
+    def test_moderation_requires_admin(self):
+        """Test anonymous and non-admin callers are refused"""
+        assert self.client.post("/api/testimonials/t1/approve").status_code == 401
+        user = User(name="Ana", email="ana@example.com")
+        app.dependency_overrides[get_current_user] = lambda: user
+        assert self.client.post("/api/testimonials/t1/reject").status_code == 403
+        assert self.client.get("/api/testimonials/pending").status_code == 403
+
+    def test_approval_publishes_the_feed(self):
+        """Test approving rebuilds the feed and serves it from memory"""
+        self.as_admin()
+        approved = review_doc("t1", approved=True)
+        mock_db = mock_feed_db(before=review_doc("t1"), items=[approved])
+        with patch("routers.general.db", mock_db):
+            response = self.client.post("/api/testimonials/t1/approve")
+            public = self.client.get("/api/testimonials")
+
+        assert response.status_code == 200
+        assert response.json()["approved"] is True
+        assert response.json()["moderated_at"] is not None
+        assert mock_db.feeds.update_one.await_count == 1
+        assert [item["id"] for item in public.json()["testimonials"]] == ["t1"]
+        # Served from the entry set on approval, without reading the feed document
+        assert mock_db.feeds.find_one.await_count == 0
+
+    def test_unchanged_feed_is_not_rebuilt(self):
+        """Test approving an approved or rejecting a pending testimonial skips the rebuild"""
+        self.as_admin()
+        mock_db = mock_feed_db(before=review_doc("t1", approved=True))
+        with patch("routers.general.db", mock_db):
+            assert self.client.post("/api/testimonials/t1/approve").status_code == 200
+        mock_db = mock_feed_db(before=review_doc("t2"))
+        with patch("routers.general.db", mock_db):
+            response = self.client.post("/api/testimonials/t2/reject")
+        assert response.json()["rejected"] is True
+        assert mock_db.feeds.update_one.await_count == 0
+
+    def test_missing_testimonial_is_404(self):
+        """Test moderating an unknown id is 404"""
+        self.as_admin()
+        with patch("routers.general.db", mock_feed_db(before=None)):
+            assert self.client.post("/api/testimonials/nope/approve").status_code == 404
+
+    def test_public_read_builds_a_missing_feed(self):
+        """Test the first read after deploy builds the feed document"""
+        mock_db = mock_feed_db(items=[review_doc("t1", approved=True)])
+        with patch("routers.general.db", mock_db):
+            response = self.client.get("/api/testimonials")
+        assert [item["id"] for item in response.json()["testimonials"]] == ["t1"]
+        assert mock_db.feeds.update_one.await_count == 1
+
+
+class TestFeedAgainstMongo:
+    """Test moderation and the feed against a real MongoDB server"""
+
+    @pytest.mark.asyncio
+    async def test_pending_items_never_reach_the_feed(self, mongo_db):
+        """Test the feed holds only approved testimonials, newest first and capped"""
+        await run_migrations(mongo_db)
+        now = datetime(2024, 6, 1)
+        docs = [Testimonial(**SUBMISSION, created_at=now - timedelta(minutes=i)).model_dump() for i in range(30)]
+        for doc in docs[::3]:
+            doc["approved"] = True
+        await mongo_db.testimonials.insert_many([dict(doc) for doc in docs])
+
+        items = await rebuild_testimonials_feed(mongo_db, size=5)
+        expected = [doc["id"] for doc in docs[::3]][:5]
+        assert [item["id"] for item in items] == expected
+        stored = await mongo_db.feeds.find_one({"_id": "testimonials"})
+        assert [item["id"] for item in stored["items"]] == expected
+
+        explain = await mongo_db.testimonials.find(PUBLIC_TESTIMONIALS_QUERY).sort(
+            PUBLIC_TESTIMONIALS_SORT
+        ).limit(5).explain()
+        assert "SORT" not in str(explain["queryPlanner"]["winningPlan"])
+
+        with patch("routers.general.db", mongo_db):
+            await general._moderate_testimonial(docs[1]["id"], approved=True)
+        stored = await mongo_db.feeds.find_one({"_id": "testimonials"})
+        assert docs[1]["id"] in [item["id"] for item in stored["items"]]
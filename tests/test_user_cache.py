@@ -0,0 +1,86 @@
+"""
+Test the authenticated user cache behind get_current_user
+"""
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi.testclient import TestClient
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from server import app
+from database import Database, user_cache
+from invalidation import invalidation_bus
+from metrics import registry
+from security import create_jwt_token
+
+USER = {"id": "u1", "name": "Ana", "email": "ana@example.com", "provider": "email", "is_verified": False}
+
+
+def users_change(operation, user_id=None):
+    change = {"_id": {"_data": "1"}, "operationType": operation, "ns": {"coll": "users"}}
+    if user_id:
+        change["fullDocument"] = {"id": user_id}
+    return change
+
+
+class TestUserCache:
+    """Test hits, invalidation and metrics"""
+
+    def setup_method(self):
+        registry.reset()
+        self.client = TestClient(app)
+        self.headers = {"Authorization": f"Bearer {create_jwt_token('u1', 'ana@example.com')}"}
+        self.db = MagicMock()
+        self.db.users.find_one = AsyncMock(return_value=dict(USER))
+
+    def me(self):
+        with patch("security.db", self.db):
+            return self.client.get("/api/auth/me", headers=self.headers)
+
+    def test_repeated_requests_hit_the_cache(self):
+        """Test one lookup serves every request until invalidated"""
+        assert self.me().json()["user"]["email"] == "ana@example.com"
+        assert self.me().status_code == 200
+        assert self.db.users.find_one.await_count == 1
+
+        Database.invalidate_user("u1")
+        self.me()
+        assert self.db.users.find_one.await_count == 2
+        durations = registry.snapshot()["histograms"]["auth_seconds"]
+        assert durations[0]["count"] == 3
+
+    def test_deleted_user_is_cached_as_missing(self):
+        """Test a token for a missing user is refused without a lookup per request"""
+        self.db.users.find_one = AsyncMock(return_value=None)
+        assert self.me().status_code == 401
+        assert self.me().status_code == 401
+        assert self.db.users.find_one.await_count == 1
+
+    def test_change_stream_evicts_one_user(self):
+        """Test an update elsewhere evicts that user only; a delete evicts everyone"""
+        user_cache.set("u1", "ana")
+        user_cache.set("u2", "bia")
+        invalidation_bus.dispatch(users_change("update", "u1"))
+        assert user_cache.get("u1") is None
+        assert user_cache.get("u2") == "bia"
+        invalidation_bus.dispatch(users_change("delete"))
+        assert user_cache.get("u2") is None
+
+    def test_email_verification_evicts_the_user(self):
+        """Test verifying an email is visible on the next authenticated request"""
+        self.me()
+        auth_db = MagicMock()
+        auth_db.email_verification_tokens.find_one = AsyncMock(return_value={
+            "_id": "oid", "user_id": "u1", "email": "ana@example.com", "token": "tok",
+            "expires_at": datetime.utcnow() + timedelta(hours=1),
+        })
+        auth_db.email_verification_tokens.delete_one = AsyncMock()
+        auth_db.users.find_one = AsyncMock(return_value=dict(USER))
+        auth_db.users.replace_one = AsyncMock()
+        with patch("routers.auth.db", auth_db):
+            assert self.client.get("/api/auth/verify-email/tok").status_code == 200
+
+        self.db.users.find_one = AsyncMock(return_value={**USER, "is_verified": True})
+        assert self.me().json()["user"]["is_verified"] is True
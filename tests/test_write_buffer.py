@@ -0,0 +1,210 @@
+"""
+Test the write-behind buffer used for support requests
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi.testclient import TestClient
+from pymongo.errors import AutoReconnect, BulkWriteError, DocumentTooLarge
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from server import app
+from metrics import registry
+from migrations import run_migrations
+from write_buffer import BufferFull, WriteBehindBuffer
+
+CONTACT = {"name": "Ana", "email": "ana@example.com", "subject": "Lag", "message": "Servidor lento"}
+
+
+def mock_database(insert_many=None):
+    collection = MagicMock()
+    collection.insert_many = insert_many or AsyncMock()
+    database = MagicMock()
+    database.__getitem__.return_value = collection
+    return database, collection
+
+
+def docs(count, start=0):
+    return [{"id": f"r{i}"} for i in range(start, start + count)]
+
+
+def inserted_ids(collection):
+    return [doc["id"] for call in collection.insert_many.call_args_list for doc in call.args[0]]
+
+
+async def settle(condition, timeout=1.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.005)
+
+
+class TestWriteBehindBuffer:
+    """Test batching, backpressure, retries and shutdown"""
+
+    def setup_method(self):
+        registry.reset()
+
+    @pytest.mark.asyncio
+    async def test_flushes_when_batch_is_full(self):
+        """Test a full batch is written without waiting for the interval"""
+        database, collection = mock_database()
+        buffer = WriteBehindBuffer(database, "support_requests", batch_size=3, flush_interval_ms=60000)
+        buffer.start()
+        try:
+            for doc in docs(3):
+                buffer.submit(doc)
+            await settle(lambda: collection.insert_many.await_count == 1)
+        finally:
+            await buffer.stop()
+        assert inserted_ids(collection) == ["r0", "r1", "r2"]
+        assert collection.insert_many.call_args.kwargs == {"ordered": False}
+
+    @pytest.mark.asyncio
+    async def test_flushes_on_interval(self):
+        """Test a partial batch is written after flush_interval_ms"""
+        database, collection = mock_database()
+        buffer = WriteBehindBuffer(database, "support_requests", batch_size=100, flush_interval_ms=10)
+        buffer.start()
+        try:
+            buffer.submit({"id": "r0"})
+            await settle(lambda: collection.insert_many.await_count == 1)
+        finally:
+            await buffer.stop()
+        assert inserted_ids(collection) == ["r0"]
+
+    def test_rejects_when_full(self):
+        """Test submit raises once max_pending documents are queued"""
+        buffer = WriteBehindBuffer(MagicMock(), "support_requests", batch_size=100, max_pending=2)
+        buffer.submit({"id": "a"})
+        buffer.submit({"id": "b"})
+        with pytest.raises(BufferFull):
+            buffer.submit({"id": "c"})
+        assert len(buffer) == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_is_retried_in_order(self):
+        """Test a batch that failed is requeued ahead of newer documents"""
+        database, collection = mock_database(AsyncMock(side_effect=[AutoReconnect("down"), None, None]))
+        buffer = WriteBehindBuffer(database, "support_requests", batch_size=2)
+        for doc in docs(3):
+            buffer._pending.append(doc)
+
+        await buffer.flush()
+        assert len(buffer) == 3
+        await buffer.flush()
+        assert len(buffer) == 0
+        assert inserted_ids(collection) == ["r0", "r1", "r0", "r1", "r2"]
+
+    @pytest.mark.asyncio
+    async def test_duplicates_from_a_retry_are_ignored(self):
+        """Test a retried batch whose documents partly got in counts as written"""
+        duplicate = BulkWriteError({"writeErrors": [{"index": 0, "code": 11000, "errmsg": "dup"}]})
+        database, collection = mock_database(AsyncMock(side_effect=duplicate))
+        buffer = WriteBehindBuffer(database, "support_requests")
+        buffer._pending.extend(docs(2))
+        await buffer.flush()
+        assert len(buffer) == 0
+
+    @pytest.mark.asyncio
+    async def test_refused_document_is_dropped_after_max_attempts(self):
+        """Test a document named in writeErrors is retried alone, then dropped, without blocking the rest"""
+        async def insert_many(batch, ordered):
+            bad = [i for i, doc in enumerate(batch) if doc["id"] == "r1"]
+            if bad:
+                raise BulkWriteError({"writeErrors": [{"index": bad[0], "code": 121, "errmsg": "invalid"}]})
+
+        database, collection = mock_database(AsyncMock(side_effect=insert_many))
+        buffer = WriteBehindBuffer(database, "support_requests", batch_size=2, max_attempts=2)
+        buffer._pending.extend(docs(3))
+
+        await buffer.flush()
+        assert [doc["id"] for doc in buffer._pending] == ["r1", "r2"]
+        await buffer.flush()
+        assert len(buffer) == 0
+        assert registry.get("write_buffer_dropped_total", collection="support_requests") == 1
+        assert registry.get("write_buffer_flushed_total", collection="support_requests") == 2
+
+    @pytest.mark.asyncio
+    async def test_unattributed_error_isolates_the_document(self):
+        """Test an error that names no document is narrowed down by writing one at a time"""
+        async def insert_many(batch, ordered):
+            if any(doc["id"] == "big" for doc in batch):
+                raise DocumentTooLarge("BSON document too large")
+
+        database, collection = mock_database(AsyncMock(side_effect=insert_many))
+        buffer = WriteBehindBuffer(database, "support_requests", batch_size=3, max_attempts=1)
+        buffer._pending.extend([{"id": "r0"}, {"id": "big"}, {"id": "r2"}])
+
+        await buffer.flush()
+        assert len(buffer) == 0
+        assert registry.get("write_buffer_dropped_total", collection="support_requests") == 1
+        assert registry.get("write_buffer_flushed_total", collection="support_requests") == 2
+
+    @pytest.mark.asyncio
+    async def test_stop_drains_and_rejects(self):
+        """Test shutdown writes everything queued and refuses new documents"""
+        database, collection = mock_database()
+        buffer = WriteBehindBuffer(database, "support_requests", batch_size=2, flush_interval_ms=60000)
+        buffer.start()
+        buffer.submit({"id": "r0"})
+        await buffer.stop()
+        assert inserted_ids(collection) == ["r0"]
+        assert not buffer.running
+        with pytest.raises(BufferFull):
+            buffer.submit({"id": "late"})
+
+
+class TestSupportContactRoute:
+    """Test the contact form goes through the buffer"""
+
+    def setup_method(self):
+        self.client = TestClient(app)
+
+    def test_returns_generated_id_immediately(self):
+        """Test the queued document carries the id returned to the client"""
+        buffer = MagicMock(running=True)
+        with patch("routers.general.support_requests_buffer", buffer):
+            response = self.client.post("/api/support/contact", json=CONTACT)
+        assert response.status_code == 200
+        queued = buffer.submit.call_args.args[0]
+        assert queued["id"] == response.json()["request_id"]
+        assert queued["status"] == "open"
+
+    def test_full_buffer_is_503(self):
+        """Test backpressure reaches the client with Retry-After"""
+        buffer = MagicMock(running=True)
+        buffer.submit.side_effect = BufferFull("full")
+        with patch("routers.general.support_requests_buffer", buffer):
+            response = self.client.post("/api/support/contact", json=CONTACT)
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "5"
+
+    def test_direct_insert_without_lifespan(self):
+        """Test requests are still stored when the buffer isn't running"""
+        db = MagicMock()
+        db.support_requests.insert_one = AsyncMock()
+        with patch("routers.general.db", db):
+            response = self.client.post("/api/support/contact", json=CONTACT)
+        assert response.status_code == 200
+        db.support_requests.insert_one.assert_awaited_once()
+
+
+class TestWriteBufferAgainstMongo:
+    """Test batching against a real MongoDB server"""
+
+    @pytest.mark.asyncio
+    async def test_everything_submitted_is_stored_once(self, mongo_db):
+        """Test batches, a replayed batch and the shutdown flush store each document once"""
+        await run_migrations(mongo_db)
+        buffer = WriteBehindBuffer(mongo_db, "support_requests", batch_size=50, flush_interval_ms=20)
+        await mongo_db.support_requests.insert_many(docs(10))
+        buffer._pending.extend(docs(10))
+        buffer.start()
+        for doc in docs(240, start=10):
+            buffer.submit(doc)
+        await buffer.stop()
+        assert await mongo_db.support_requests.count_documents({}) == 250